@@ -0,0 +1,98 @@
+'''
+    Synthetic data of realistic sizes for the benchmarks, nothing is read from the DB or the network.
+
+    python -m pytest benchmarks --benchmark-autosave
+'''
+
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import pytest
+from project.ingestion import MAJORATION_PRICES
+from project.models.product import Product
+from project.models.service import Service
+
+# A night of sales, the menu of a bar and the services of three years
+SALES_LINES_PER_SERVICE = 1500
+MENU_SIZE = 300
+SERVICES_COUNT = 1000
+
+DRINK_NAMES = sorted({name for names in MAJORATION_PRICES.values() for name in names})
+FOOD_NAMES = ['Frites', 'Burger', 'Planche mixte', 'Croque', 'Salade']
+
+
+@pytest.fixture(scope="session")
+def rng() -> random.Random:
+    return random.Random(2022)
+
+
+@pytest.fixture(scope="session")
+def laddition_sales_lines(rng: random.Random) -> List[Dict[str, Any]]:
+    '''
+        SalesDocumentLines of L'Addition for a night, as returned by its API
+    '''
+    opening = datetime(2022, 1, 15, 18)
+    sales_lines = []
+    for _ in range(SALES_LINES_PER_SERVICE):
+        is_drink = rng.random() < 0.8
+        product_name = rng.choice(DRINK_NAMES if is_drink else FOOD_NAMES)
+        sales_lines.append({
+            "timestamp_locale": (opening + timedelta(seconds=rng.randrange(10 * 3600))).strftime('%Y-%m-%d %H:%M:%S'),
+            "id_product": product_name.lower(),
+            "product_name": product_name,
+            "product_type": "Bière" if is_drink else "Cuisine",
+            "category_name": rng.choice(("CONCERT", "BAR")),
+            "amount_total_evat": rng.choice((2.0, 3.5, 4.0, 5.5, 6.5, 8.0)),
+            "category1": "liquid" if is_drink else "solid",
+        })
+    return sales_lines
+
+
+@pytest.fixture(scope="session")
+def services(rng: random.Random, laddition_sales_lines: List[Dict[str, Any]]) -> List[Service]:
+    return [
+        Service(
+            id=service_id,
+            company_id=1,
+            date=datetime(2020, 1, 1) + timedelta(days=service_id),
+            CA=round(rng.uniform(500, 5000), 2),
+            solid=round(rng.uniform(100, 1000), 2),
+            liquid=round(rng.uniform(400, 4000), 2),
+            majoration=float(rng.randrange(50)),
+            top_liquids={name: rng.randrange(200) for name in DRINK_NAMES[:5]},
+            concert="Sans concert",
+            concert_infos={'title': 'Sans concert', 'facebook': '#', 'style': '', 'free': 'true', 'picture': '#'},
+            version=1,
+        )
+        for service_id in range(1, SERVICES_COUNT + 1)
+    ]
+
+
+def synthetic_product(rng: random.Random, index: int, **overrides: Any) -> Product:
+    values = dict(
+        company_id=1,
+        uniq_id_product=f"product_{index}",
+        product_name=f"Product {index}",
+        product_price=rng.choice((2.0, 3.5, 4.0, 5.5, 6.5, 8.0)),
+        id_product_type=index % 20,
+        product_type=f"type_{index % 20}",
+        id_category=f"category_{index % 10}",
+        category_name=f"Category {index % 10}",
+        category1=rng.choice(("liquid", "solid")),
+        category2=None,
+        tax_name="20%",
+        place_send_name=None,
+        visible=True,
+        removed=False,
+    )
+    values.update(overrides)
+    return Product(**values)
+
+
+@pytest.fixture(scope="session")
+def menu_products(rng: random.Random) -> List[Product]:
+    '''
+        The products of the DB and the same products from L'Addition, one in ten has a new price
+    '''
+    return [synthetic_product(rng, index) for index in range(MENU_SIZE)]
@@ -0,0 +1,61 @@
+# counting.py
+'''
+    Counting the drinks of a service, with the former list.count based function
+    and with utils.utils (hash counting and heap top k), on synthetic lists of drink names.
+
+    python -m benchmarks.counting
+'''
+
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from utils.utils import count_elements, list_to_element_counted_and_sorted_dict, top_k
+
+DRINKS_COUNT = 120
+SIZES = (100, 1000, 5000, 10000)
+
+
+def quadratic_counted_and_sorted_dict(my_raw_list: List[str]) -> Dict:
+    '''
+        The former utils.list_to_element_counted_and_sorted_dict, a list.count per element
+    '''
+    my_counted_list = {
+        element: my_raw_list.count(element)
+        for element in my_raw_list
+    }
+    return {
+        key: value
+        for key, value in sorted(my_counted_list.items(), key=lambda item: item[1], reverse=True)
+    }
+
+
+def synthetic_drinks(size: int, seed: int = 2022) -> List[str]:
+    rng = random.Random(seed)
+    # A few drinks make most of the sales
+    weights = [1 / (rank + 1) for rank in range(DRINKS_COUNT)]
+    return rng.choices([f"Drink {rank}" for rank in range(DRINKS_COUNT)], weights=weights, k=size)
+
+
+def timed(function: Callable[[], Any], repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    print(f"{'sales':>8} {'list.count':>12} {'Counter':>12} {'top 5 heap':>12} {'speedup':>8}")
+    for size in SIZES:
+        drinks = synthetic_drinks(size)
+        assert quadratic_counted_and_sorted_dict(drinks) == list_to_element_counted_and_sorted_dict(drinks)
+
+        quadratic = timed(lambda: quadratic_counted_and_sorted_dict(drinks))
+        linear = timed(lambda: list_to_element_counted_and_sorted_dict(drinks))
+        top_5 = timed(lambda: top_k(count_elements(iter(drinks)), 5))
+        print(
+            f"{size:>8} {quadratic * 1000:>10.2f}ms {linear * 1000:>10.2f}ms {top_5 * 1000:>10.2f}ms"
+            f" {quadratic / linear:>7.0f}x"
+        )
@@ -0,0 +1,38 @@
+import random
+from typing import Any, Dict, List
+
+import pytest
+from project.ingestion import SalesAggregation
+from utils.utils import count_elements, list_to_element_counted_and_sorted_dict, top_k
+
+from .conftest import DRINK_NAMES
+
+
+@pytest.mark.parametrize("sales_count", [100, 1000, 5000])
+def test_benchmark_list_to_element_counted_and_sorted_dict(benchmark, rng: random.Random, sales_count: int):
+    drinks = rng.choices(DRINK_NAMES, k=sales_count)
+
+    result = benchmark(list_to_element_counted_and_sorted_dict, drinks)
+
+    assert sum(result.values()) == sales_count
+
+
+def test_benchmark_top_k_from_stream(benchmark, laddition_sales_lines: List[Dict[str, Any]]):
+    result = benchmark(
+        lambda: top_k(count_elements(sales_line["product_name"] for sales_line in laddition_sales_lines), 5)
+    )
+
+    assert len(result) == 5
+
+
+def test_benchmark_sales_aggregation(benchmark, laddition_sales_lines: List[Dict[str, Any]]):
+    def aggregate() -> SalesAggregation:
+        aggregation = SalesAggregation()
+        for sales_line in laddition_sales_lines:
+            aggregation.add_sales_line(sales_line, category=sales_line["category1"])
+        aggregation.top_liquids()
+        return aggregation
+
+    aggregation = benchmark(aggregate)
+
+    assert len(aggregation.sales_lines) == len(laddition_sales_lines)
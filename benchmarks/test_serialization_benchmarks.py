@@ -0,0 +1,22 @@
+from typing import List
+
+from project.models.service import Service
+from project.serializers import SERVICE_SERIALIZER
+
+
+def test_benchmark_service_serialize(benchmark, services: List[Service]):
+    result = benchmark(services[0].serialize)
+
+    assert result.startswith('{"id": 1')
+
+
+def test_benchmark_service_serializer_iter_json_chunks(benchmark, services: List[Service]):
+    result = benchmark(lambda: b"".join(SERVICE_SERIALIZER.iter_json_chunks([services])))
+
+    assert result.startswith(b"[")
+
+
+def test_benchmark_service_serializer_dumps(benchmark, services: List[Service]):
+    result = benchmark(lambda: SERVICE_SERIALIZER.dumps(SERVICE_SERIALIZER.to_dicts(services)))
+
+    assert result.startswith(b"[")
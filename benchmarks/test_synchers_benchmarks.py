@@ -0,0 +1,77 @@
+import random
+from typing import List
+from unittest.mock import patch
+
+from project.models.product import Product
+from project.synchers import ProductSyncher, unpack_and_check_sowprog_data
+
+from .conftest import synthetic_product
+
+SOWPROG_CONCERT = {
+    "eventDescriptionSplitByDate": [
+        {
+            "freeAdmission": True,
+            "event": {
+                "title": "Jazzapapa",
+                "eventStyle": {"label": "Jazz"},
+                "facebookFanPage": "https://facebook.com/jazzapapa",
+                "picture": "https://sowprog.com/jazzapapa.jpg",
+            },
+        },
+    ],
+}
+
+
+def remote_products(rng: random.Random, menu_products: List[Product]) -> List[Product]:
+    # The same products, one in ten has a new price
+    return [
+        synthetic_product(
+            rng,
+            index,
+            product_price=product.product_price + (1 if index % 10 == 0 else 0),
+            category1=product.category1,
+        )
+        for index, product in enumerate(menu_products)
+    ]
+
+
+def test_benchmark_compare_products(benchmark, rng: random.Random, menu_products: List[Product]):
+    products_pairs = list(zip(menu_products, remote_products(rng, menu_products)))
+
+    diffs = benchmark(lambda: [
+        ProductSyncher._compare_products(old_product=old_product, new_product=new_product)
+        for old_product, new_product in products_pairs
+    ])
+
+    assert sum(diff is not None for diff in diffs) == len(menu_products) // 10
+
+
+def test_benchmark_batch_update_products_from_products(benchmark, rng: random.Random, menu_products: List[Product]):
+    def setup():
+        # Both lists are updated in place, each round gets its own copies
+        first_party_products = [synthetic_product(rng, index, **{
+            column_name: getattr(product, column_name)
+            for column_name in ProductSyncher.product_column_names
+            if column_name not in ("id", "uniq_id_product")
+        }) for index, product in enumerate(menu_products)]
+        return (first_party_products, remote_products(rng, menu_products)), {}
+
+    # Only the comparison is measured, the updated products are not written to a DB
+    with patch.object(ProductSyncher, "batch_save_products"):
+        updated_products, products_to_create = benchmark.pedantic(
+            lambda first_party_products, third_party_products: ProductSyncher.batch_update_products_from_products(
+                first_party_products=first_party_products,
+                third_party_products=third_party_products,
+            ),
+            setup=setup,
+            rounds=50,
+        )
+
+    assert len(updated_products) == len(menu_products) // 10
+    assert products_to_create == []
+
+
+def test_benchmark_unpack_and_check_sowprog_data(benchmark):
+    concert_name, _, error = benchmark(unpack_and_check_sowprog_data, SOWPROG_CONCERT)
+
+    assert (concert_name, error) == ("Jazzapapa", None)
@@ -0,0 +1,82 @@
+# api.py
+
+from typing import Any
+
+from flask import Blueprint, Response, request
+from flask_login import current_user, login_required
+from sqlalchemy.orm import load_only
+from werkzeug.exceptions import BadRequest
+from project.main import PAGES_NUM_TO_LOAD, SERVICES_FILTERS, company_services, filter_services
+from project.models.service import Service
+from project.serializers import SERVICE_CONCERT_SERIALIZER, SERVICE_SERIALIZER, ModelSerializer
+from utils.pagination import paginate_by_keyset
+
+# Read only JSON views of the services, select fields with `?fields=id,date,CA`
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+def json_response(payload: Any) -> Response:
+    return Response(ModelSerializer.dumps(payload), mimetype='application/json')
+
+
+@api.route('/services', methods=['GET'])
+@login_required
+def list_services():
+    filters = {
+        filter_name: request.args[filter_name]
+        for filter_name in SERVICES_FILTERS
+        if request.args.get(filter_name)
+    }
+    try:
+        fields = SERVICE_SERIALIZER.select_fields(request.args.get('fields'))
+    except ValueError as exc:
+        return BadRequest(description=str(exc))
+    try:
+        # The page cursors are made of the date and id of the services
+        services_query = filter_services(
+            Service.query.options(load_only(*{'id', 'date', *fields})),
+            current_user.company_id,
+            filters,
+        )
+    except ValueError:
+        return BadRequest(description="Wrong date format, use : YEAR-MONTH-DAY")
+
+    try:
+        services = paginate_by_keyset(
+            query=services_query,
+            date_column=Service.date,
+            id_column=Service.id,
+            per_page=PAGES_NUM_TO_LOAD,
+            after=request.args.get('after'),
+            before=request.args.get('before'),
+        )
+    except ValueError:
+        return BadRequest(description="Invalid page cursor")
+
+    return json_response({
+        "services": SERVICE_SERIALIZER.to_dicts(services.items, fields),
+        "prev_cursor": services.prev_cursor if services.has_prev else None,
+        "next_cursor": services.next_cursor if services.has_next else None,
+    })
+
+
+@api.route('/services/<int:service_id>', methods=['GET'])
+@login_required
+def get_service(service_id):
+    try:
+        fields = SERVICE_SERIALIZER.select_fields(request.args.get('fields'))
+    except ValueError as exc:
+        return BadRequest(description=str(exc))
+    service = company_services().options(load_only(*fields)).filter(Service.id == service_id).first_or_404()
+    return json_response(SERVICE_SERIALIZER.to_dict(service, fields))
+
+
+@api.route('/services/<int:service_id>/concert', methods=['GET'])
+@login_required
+def get_service_concert(service_id):
+    try:
+        fields = SERVICE_CONCERT_SERIALIZER.select_fields(request.args.get('fields'))
+    except ValueError as exc:
+        return BadRequest(description=str(exc))
+    service = company_services().options(load_only(*fields)).filter(Service.id == service_id).first_or_404()
+    return json_response(SERVICE_CONCERT_SERIALIZER.to_dict(service, fields))
@@ -2,12 +2,16 @@ import logging
 import os
 
 from flask import Flask
+from flask.logging import default_handler
 from flask_login import LoginManager
 from flask_migrate import Migrate
-from project.auth import auth as auth_blueprint
+from project.api import api as api_blueprint
+from project.auth import auth as auth_blueprint, load_user
+from project.commands import companies_cli, concerts_cli, partitions_cli, services_cli
+from project.exports import exports as exports_blueprint
 from project.main import main as main_blueprint
-from project.models.auth import User
 from project.settings import DB_ORM, FLASK_ENV, SQLALCHEMY_DATABASE_URI
+from utils.logs import start_queue_logging
 
 
 def initialize_db(app: Flask) -> None:
@@ -23,6 +27,10 @@ def initialize_app(testing: bool = False) -> Flask:
         app.logger.setLevel(level=logging.INFO)
     else:
         app.logger.setLevel(level=logging.DEBUG)
+    # Records are formatted and written to stderr by a listener thread, not by the request's thread
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(default_handler.formatter)
+    start_queue_logging(app.logger, handler=log_handler)
 
     app.config['SECRET_KEY'] = os.getenv("FLASK_SECRET_KEY")
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -34,10 +42,8 @@ def initialize_app(testing: bool = False) -> Flask:
     login_manager.login_view = 'auth.login'
     login_manager.init_app(app)
 
-    @login_manager.user_loader
-    def load_user(user_id: int):
-        # since the user_id is just the primary key of our user table, use it in the query for the user
-        return User.query.filter_by(id=user_id).first()
+    # Users are cached by the loader, see project.auth.USERS_CACHE
+    login_manager.user_loader(load_user)
 
     # blueprint for auth routes in our app
     app.register_blueprint(auth_blueprint)
@@ -45,6 +51,20 @@ def initialize_app(testing: bool = False) -> Flask:
     # blueprint for non-auth parts of app
     app.register_blueprint(main_blueprint)
 
+    # blueprint for the JSON API
+    app.register_blueprint(api_blueprint)
+
+    # blueprint for the CSV and Parquet exports
+    app.register_blueprint(exports_blueprint)
+
+    # flask CLI commands, ex: `Flask concerts import 2022-01-01 2022-06-30`
+    app.cli.add_command(concerts_cli)
+    # `Flask partitions create`, to run monthly
+    app.cli.add_command(partitions_cli)
+    app.cli.add_command(companies_cli)
+    # `Flask services backfill-timelines`, once after the migrations adding the timeline columns
+    app.cli.add_command(services_cli)
+
     return app
 
 
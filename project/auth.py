@@ -1,24 +1,81 @@
 # auth.py
 
+from typing import Optional
 from flask import Blueprint, flash, redirect, render_template, request, url_for
 from flask_login import login_required, login_user, logout_user, current_user
 from werkzeug.security import check_password_hash, generate_password_hash
-from werkzeug.exceptions import Forbidden
-from project.settings import DB_ORM, FLASK_ENV
+from werkzeug.exceptions import BadRequest, Forbidden
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from project.settings import DB_ORM, FLASK_ENV, USERS_CACHE_SIZE, USERS_CACHE_TTL
+from utils.cache import TTLCache
 import os
 
 from project.models.auth import User
+from project.models.company import Company
 
 auth = Blueprint('auth', __name__)
 
 RETRY_MESSAGE = 'Please check your login details and try again.'
+UNKNOWN_COMPANY_MESSAGE = 'Please pick the company of the user.'
 EXISTING_USER_MESSAGE = 'A user with that email already exists.'
 NOT_IMPLEMENTED_ERROR_MESSAGE = "Route not implemented in production"
+MISSING_SUPER_USER_SETTINGS_MESSAGE = "Set {} to create the super user"
+# Settings of the super user created on the first login in production
+SUPER_USER_SETTINGS = ("SUPER_USER_EMAIL", "SUPER_USER_PASSWORD", "SUPER_USER_COMPANY")
+
+# Users of the authenticated requests by id, detached from any session, see `load_user`
+USERS_CACHE = TTLCache(maxsize=USERS_CACHE_SIZE, ttl=USERS_CACHE_TTL)
+# Keys of `Session.info` collecting the changes to drop from USERS_CACHE on commit
+CHANGED_USER_IDS_KEY = 'changed_user_ids'
+CHANGED_COMPANY_KEY = 'changed_company'
+
+
+def load_user(user_id: str) -> Optional[User]:
+    '''
+        Flask-Login user loader, runs on every authenticated request.
+        Users are read from USERS_CACHE and copied into the request's session without querying the DB.
+        The entry of a user is dropped when this process commits a change of them or of a company,
+        other processes see the change after the TTL.
+    '''
+    cached_user = USERS_CACHE.get(int(user_id))
+    if cached_user is None:
+        # Loaded from its own session, the cached user is never changed nor expired by a request
+        with Session(DB_ORM.engine) as session:
+            cached_user = session.query(User).filter_by(id=user_id).first()
+        if cached_user is None:
+            return None
+        USERS_CACHE.set(cached_user.id, cached_user)
+    return DB_ORM.session.merge(cached_user, load=False)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def collect_changed_user(mapper, connection, user: User) -> None:
+    # Dropped from the cache once committed, a request loading the user before would cache the former values
+    object_session(user).info.setdefault(CHANGED_USER_IDS_KEY, set()).add(user.id)
+
+
+@event.listens_for(Company, 'after_update')
+def collect_changed_company(mapper, connection, company: Company) -> None:
+    # Cached users hold their company
+    object_session(company).info[CHANGED_COMPANY_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_cached_users(session: Session) -> None:
+    if session.info.pop(CHANGED_COMPANY_KEY, False):
+        USERS_CACHE.clear()
+    for user_id in session.info.pop(CHANGED_USER_IDS_KEY, ()):
+        USERS_CACHE.delete(user_id)
 
 
 @auth.route('/login', methods=['GET'])
 def login():
     if FLASK_ENV == "production":
+        missing_settings = [setting for setting in SUPER_USER_SETTINGS if not os.getenv(setting)]
+        if missing_settings:
+            return BadRequest(description=MISSING_SUPER_USER_SETTINGS_MESSAGE.format(", ".join(missing_settings)))
         admin_user = User.query.filter_by(email=os.getenv("SUPER_USER_EMAIL")).first()
         if admin_user is None:
             # create super user
@@ -29,7 +86,7 @@ def login():
                     os.getenv("SUPER_USER_PASSWORD"),
                     method='sha256'
                 ),
-                company="La Petite Halle",
+                company=Company.get_or_create(os.getenv("SUPER_USER_COMPANY")),
                 super_user=True,
             )
             DB_ORM.session.add(admin_user)
@@ -61,7 +118,7 @@ def signup():
         FLASK_ENV == "development"
         or (current_user.is_authenticated and current_user.super_user is True)
     ):
-        return render_template('signup.html')
+        return render_template('signup.html', companies=Company.query.order_by(Company.name).all())
     else:
         return Forbidden(description=NOT_IMPLEMENTED_ERROR_MESSAGE)
 
@@ -72,7 +129,7 @@ def signup_post():
         email = request.form.get('email')
         name = request.form.get('name')
         password = request.form.get('password')
-        company = request.form.get('company')
+        company = Company.query.filter_by(name=request.form.get('company')).first()
 
         # if this returns a user, then the email already exists in database
         user = User.query.filter_by(email=email).first()
@@ -81,6 +138,10 @@ def signup_post():
             flash(EXISTING_USER_MESSAGE)
             return redirect(url_for('auth.signup'))
 
+        if company is None:
+            flash(UNKNOWN_COMPANY_MESSAGE)
+            return redirect(url_for('auth.signup'))
+
         # create new user with the form data. Hash the password so plaintext version isn't saved.
         new_user = User(
             email=email,
@@ -0,0 +1,128 @@
+# commands.py
+
+from datetime import date
+
+import click
+from flask.cli import AppGroup
+
+from project.ingestion import IMPORT_BATCH_SIZE, backfill_timeline_columns
+from project.models.company import Company
+from project.models.service import Service
+from project.settings import DB_ORM
+from project.synchers import SOWPROG_IMPORT_MAX_WORKERS, import_sowprog_season
+from utils.partitions import (
+    add_months,
+    create_month_partitions,
+    detach_month_partition,
+    list_partitions,
+    month_start
+)
+
+# Monthly partitions are created this many months ahead, so services never land in the default partition
+SERVICE_PARTITIONS_MONTHS_AHEAD = 3
+
+concerts_cli = AppGroup('concerts', help="Manage the local index of Sowprog concerts.")
+partitions_cli = AppGroup('partitions', help="Manage the monthly partitions of the services table.")
+companies_cli = AppGroup('companies', help="Manage the companies sharing the app.")
+services_cli = AppGroup('services', help="Maintain the services and the data derived from their sales.")
+
+
+@concerts_cli.command('import')
+@click.argument('start_date', type=click.DateTime(formats=['%Y-%m-%d']))
+@click.argument('end_date', type=click.DateTime(formats=['%Y-%m-%d']))
+@click.option(
+    '--max-workers',
+    default=SOWPROG_IMPORT_MAX_WORKERS,
+    show_default=True,
+    help="Maximum number of concurrent requests to Sowprog API.",
+)
+def import_concerts(start_date, end_date, max_workers):
+    """
+    Import every Sowprog event between START_DATE and END_DATE (YYYY-MM-DD, included).
+    """
+    if end_date < start_date:
+        raise click.BadParameter("END_DATE must be after START_DATE")
+
+    imported_dates, failed_dates = import_sowprog_season(
+        start_date=start_date.date(),
+        end_date=end_date.date(),
+        max_workers=max_workers,
+    )
+
+    click.echo(f"Imported {len(imported_dates)} dates into the concert index")
+    for failed_date, reason in sorted(failed_dates.items()):
+        click.echo(f"Failed {failed_date}: {reason}", err=True)
+
+
+@partitions_cli.command('list')
+def list_service_partitions():
+    """
+    List the partitions of the services table and their bounds.
+    """
+    for partition_name, bounds in list_partitions(DB_ORM.session.connection(), Service.__tablename__):
+        click.echo(f"{partition_name}: {bounds}")
+
+
+@partitions_cli.command('create')
+@click.option(
+    '--months-ahead',
+    default=SERVICE_PARTITIONS_MONTHS_AHEAD,
+    show_default=True,
+    help="Number of months after the current one to create partitions for.",
+)
+def create_service_partitions(months_ahead):
+    """
+    Create the missing monthly partitions of the services table, up to MONTHS_AHEAD months from now.
+    """
+    current_month = month_start(date.today())
+    created_partitions = create_month_partitions(
+        DB_ORM.session.connection(),
+        table_name=Service.__tablename__,
+        column_name='date',
+        first_month=current_month,
+        last_month=add_months(current_month, months_ahead),
+    )
+    DB_ORM.session.commit()
+
+    click.echo(f"Created {len(created_partitions)} partitions")
+    for partition_name in created_partitions:
+        click.echo(partition_name)
+
+
+@partitions_cli.command('detach')
+@click.argument('month', type=click.DateTime(formats=['%Y-%m']))
+def detach_service_partition(month):
+    """
+    Detach the partition of MONTH (YYYY-MM) from the services table, its services are kept in a standalone table.
+    """
+    partition_name = detach_month_partition(DB_ORM.session.connection(), Service.__tablename__, month.date())
+    DB_ORM.session.commit()
+
+    click.echo(f"Detached {partition_name}")
+
+
+@companies_cli.command('create')
+@click.argument('name')
+def create_company(name):
+    """
+    Create the company NAME, its users can then be signed up.
+    """
+    company = Company.get_or_create(name)
+    DB_ORM.session.commit()
+    click.echo(f"Company {company.name} has id {company.id}")
+
+
+@services_cli.command('backfill-timelines')
+@click.option(
+    '--batch-size',
+    default=IMPORT_BATCH_SIZE,
+    show_default=True,
+    help="Number of services saved by transaction.",
+)
+def backfill_service_timelines(batch_size):
+    """
+    Build the timeline index and the revenue by 15 minutes, read by the timeline tools and the sales charts,
+    of the services ingested before they existed.
+    """
+    backfilled_count = backfill_timeline_columns(batch_size=batch_size)
+    click.echo(f"Backfilled the timelines of {backfilled_count} services")
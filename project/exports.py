@@ -0,0 +1,151 @@
+# exports.py
+
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+from flask import Blueprint, Response, request, stream_with_context
+from flask_login import current_user, login_required
+from werkzeug.exceptions import BadRequest
+from project.main import SERVICES_FILTERS, filter_services
+from project.models.sales import SalesLine
+from project.models.service import Service
+from project.serializers import SERVICE_SERIALIZER
+from project.settings import DB_ORM
+from utils.table_stream import TableColumns, iter_csv_chunks, iter_parquet_chunks
+
+# Downloads of the services of the user's company over a date range, eg: `/exports/services.csv?start_date=2022-01-01`
+exports = Blueprint('exports', __name__, url_prefix='/exports')
+
+# Rows fetched from the server-side cursor at once, and encoded as one CSV chunk or Parquet row group
+EXPORT_BATCH_SIZE = 5000
+
+EXPORT_FORMATS: Dict[str, Callable[..., Iterator[bytes]]] = {
+    'csv': iter_csv_chunks,
+    'parquet': iter_parquet_chunks,
+}
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+SERVICES_EXPORT_COLUMNS: TableColumns = (
+    ('id', 'int64'),
+    ('date', 'timestamp'),
+    ('CA', 'float64'),
+    ('solid', 'float64'),
+    ('liquid', 'float64'),
+    ('majoration', 'float64'),
+    ('concert', 'string'),
+)
+SALES_LINES_EXPORT_COLUMNS: TableColumns = (
+    ('service_id', 'int64'),
+    ('service_date', 'timestamp'),
+    ('timestamp', 'timestamp'),
+    ('uniq_id_product', 'string'),
+    ('product_name', 'string'),
+    ('amount', 'float64'),
+    ('category', 'string'),
+)
+
+
+def stream_batches(query) -> Iterator[Sequence[Sequence[Any]]]:
+    '''
+        Rows of a query by batches of EXPORT_BATCH_SIZE, read from a server-side cursor
+    '''
+    result = DB_ORM.session.execute(
+        query.statement,
+        execution_options={"stream_results": True, "max_row_buffer": EXPORT_BATCH_SIZE},
+    )
+    try:
+        yield from result.partitions(EXPORT_BATCH_SIZE)
+    finally:
+        result.close()
+
+
+def export_filters() -> Dict[str, str]:
+    return {
+        filter_name: request.args[filter_name]
+        for filter_name in SERVICES_FILTERS
+        if request.args.get(filter_name)
+    }
+
+
+def attachment_response(chunks: Iterator[bytes], file_name: str, export_format: str) -> Response:
+    return Response(
+        # Rows are read and encoded while the response is sent
+        stream_with_context(chunks),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{file_name}.{export_format}"'},
+    )
+
+
+def export_response(query, columns: TableColumns, table_name: str, export_format: str) -> Response:
+    filters = export_filters()
+    try:
+        query = filter_services(query, current_user.company_id, filters)
+    except ValueError:
+        return BadRequest(description="Wrong date format, use : YEAR-MONTH-DAY")
+
+    return attachment_response(
+        EXPORT_FORMATS[export_format](columns, stream_batches(query)),
+        file_name="_".join([table_name, *filters.values()]),
+        export_format=export_format,
+    )
+
+
+@exports.route('/services.<any(csv, parquet):export_format>', methods=['GET'])
+@login_required
+def export_services(export_format):
+    query = DB_ORM.session.query(
+        *[getattr(Service, name) for name, _ in SERVICES_EXPORT_COLUMNS]
+    ).order_by(Service.date, Service.id)
+    return export_response(query, SERVICES_EXPORT_COLUMNS, 'services', export_format)
+
+
+@exports.route('/services.<any(json, ndjson):export_format>', methods=['GET'])
+@login_required
+def export_services_json(export_format):
+    try:
+        fields = SERVICE_SERIALIZER.select_fields(request.args.get('fields'))
+    except ValueError as exc:
+        return BadRequest(description=str(exc))
+    filters = export_filters()
+    try:
+        query = filter_services(
+            DB_ORM.session.query(*[getattr(Service, field) for field in fields]),
+            current_user.company_id,
+            filters,
+        )
+    except ValueError:
+        return BadRequest(description="Wrong date format, use : YEAR-MONTH-DAY")
+
+    return attachment_response(
+        SERVICE_SERIALIZER.iter_json_chunks(
+            stream_batches(query.order_by(Service.date, Service.id)),
+            fields=fields,
+            ndjson=export_format == 'ndjson',
+        ),
+        file_name="_".join(['services', *filters.values()]),
+        export_format=export_format,
+    )
+
+
+@exports.route('/sales_lines.<any(csv, parquet):export_format>', methods=['GET'])
+@login_required
+def export_sales_lines(export_format):
+    columns: List[Any] = [
+        SalesLine.service_id,
+        Service.date.label('service_date'),
+        SalesLine.timestamp,
+        SalesLine.uniq_id_product,
+        SalesLine.product_name,
+        SalesLine.amount,
+        SalesLine.category,
+    ]
+    query = (
+        DB_ORM.session.query(*columns)
+        .join(Service, Service.id == SalesLine.service_id)
+        .order_by(Service.date, SalesLine.service_id, SalesLine.timestamp)
+    )
+    return export_response(query, SALES_LINES_EXPORT_COLUMNS, 'sales_lines', export_format)
@@ -0,0 +1,564 @@
+# ingestion.py
+
+import csv
+import io
+import json
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, text
+
+from project.models.rollup import ROLLUP_PERIODS
+from project.models.sales import ProductTotal, SalesLine
+from project.models.service import Service
+from project.settings import DB_ORM
+from project.synchers import NO_CONCERT_INFOS, NO_CONCERT_NAME
+from utils.cache import LRUCache
+from utils.json_stream import JSONRow
+from utils.timeline import TimeBuckets, TimelineIndex
+from utils.utils import top_k
+
+SalesLineRow = Tuple[
+    str,  # timestamp
+    Optional[str],  # uniq_id_product
+    str,  # product_name
+    float,  # amount
+    Optional[str],  # category
+]
+
+SALES_LINE_COPY_COLUMNS = (
+    "service_id",
+    "timestamp",
+    "uniq_id_product",
+    "product_name",
+    "amount",
+    "category",
+)
+
+PRODUCT_TOTALS_QUERY = text(
+    """
+    INSERT INTO product_total (service_id, product_name, sales_count, revenue, first_sale_at, last_sale_at)
+    SELECT service_id, product_name, COUNT(*), SUM(amount), MIN(timestamp), MAX(timestamp)
+    FROM sales_line
+    WHERE service_id = ANY(:service_ids)
+    GROUP BY service_id, product_name
+    """
+)
+
+# Recompute the rollup of the period holding `service_date`, from the services of that period only
+REVENUE_ROLLUP_REFRESH_QUERY = text(
+    """
+    WITH rollup_period AS (
+        SELECT date_trunc(:period, CAST(:service_date AS timestamp)) AS period_start
+    )
+    INSERT INTO revenue_rollup (company_id, period, period_start, services_count, "CA", solid, liquid, majoration)
+    SELECT
+        :company_id,
+        :period,
+        rollup_period.period_start::date,
+        COUNT(service.id),
+        COALESCE(SUM(service."CA"), 0),
+        COALESCE(SUM(service.solid), 0),
+        COALESCE(SUM(service.liquid), 0),
+        COALESCE(SUM(service.majoration), 0)
+    FROM rollup_period
+    LEFT JOIN service
+        ON service.company_id = :company_id
+        AND service.date >= rollup_period.period_start
+        AND service.date < rollup_period.period_start + CAST('1 ' || :period AS interval)
+    GROUP BY rollup_period.period_start
+    ON CONFLICT (company_id, period, period_start) DO UPDATE SET
+        services_count = excluded.services_count,
+        "CA" = excluded."CA",
+        solid = excluded.solid,
+        liquid = excluded.liquid,
+        majoration = excluded.majoration
+    """
+)
+EMPTY_REVENUE_ROLLUPS_QUERY = text(
+    """
+    DELETE FROM revenue_rollup WHERE company_id = :company_id AND services_count = 0
+    """
+)
+# Ids of the services of an import, taken from the sequence before the INSERT so that each one is known by its values
+NEXT_SERVICE_IDS_QUERY = text(
+    """
+    SELECT nextval(pg_get_serial_sequence('service', 'id')) FROM generate_series(1, :count)
+    """
+)
+
+MAJORATION_PRICES = {
+    0: [
+        'Bière Bouteille',
+        'SHOT ',
+        'SHOT supp',
+        'APPIE BRUT',
+        'APPIE POIRE',
+        'APPIE ROSE',
+        'CAIPI',
+        'TI PUNCH',
+        'CORONA',
+        'CORONA',
+        'GIN FIZZ',
+        'CUBA LIBRE',
+        'COCKTAILS  dimanche',
+    ],
+    0.5: [
+        'V Chardonnay ',
+        'Demi Blonde',
+        'Demi Péroni',
+        'Demi grolsch',
+        'Demi IPA',
+    ],
+    1: [
+        'SOFT verse',
+        'Alcool PREM + Soft',
+        'Alcool+Soft',
+        'Virgin cocktails',
+        'DEMI Autre',
+        'Blonde pinte',
+        'Pinte grolsch',
+        'Pinte peroni',
+        'Pinte IPA',
+        'DEMI Blanche',
+        'Demi St stef',
+        'BUNDABERG',
+        'MOSCOW MULE',
+        'BUNDABERG',
+        'DARK & STORMY',
+        'REDBULL',
+        'PINTE Autre',
+    ],
+    1.5: [
+        'V Syrah',
+        'V Rose',
+        'Lemonaid',
+        'Charitea ',
+    ],
+    2: [
+        'BTL CHARDONAY ',
+        'PINTE Blanche',
+        'Pinte st stef',
+        'MOJITO',
+        'Weizen Pinte',
+    ],
+    3: [
+        'SPRITZ ST GERMAIN',
+        'COCKTAILS  classique'
+    ],
+    4: [
+        'SPRITZ',
+        'SPRITZ FIERO',
+    ],
+    7: [
+        'BTL SYRAH ',
+        'BTL Rose',
+    ],
+}
+
+# Timeline indexes never change once built, keep the most used ones in memory
+TIMELINE_INDEX_CACHE = LRUCache(maxsize=256)
+
+# Services inserted by each multi-row INSERT of an import, and errors reported before giving up
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_ERRORS = 1000
+IMPORT_NUMBER_FIELDS = ('CA', 'solid', 'liquid', 'majoration')
+IMPORT_TEXT_FIELDS = ('concert',)
+IMPORT_JSON_FIELDS = ('top_liquids', 'all_products_list_by_name', 'all_products_timeline', 'concert_infos')
+
+
+class SalesAggregation():
+    """
+    Totals of a service, accumulated from its L'Addition sales lines one line at a time.
+    """
+
+    def __init__(self) -> None:
+        self.solids_no_tva: float = 0
+        self.liquids_no_tva: float = 0
+        self.liquids_quantity = 0
+        self.notfound_no_tva: float = 0
+        self.markup_amount: float = 0
+        self.markup_quantity = 0
+        # Product names counted as the sales are read
+        self.products_with_markup: Counter = Counter()
+        self.products_without_markup: Counter = Counter()
+        self.products_lacking_markup: Counter = Counter()
+        self.drinks_sold: Counter = Counter()
+        self.all_products_by_timeline: Dict[str, List[float]] = defaultdict(list)
+        self.all_products_by_name: Dict[str, List[Dict[str, float]]] = defaultdict(list)
+        self.sales_lines: List[SalesLineRow] = []
+
+    def add_sales_line(self, service_data: Dict[str, Any], category: Optional[str]) -> None:
+        """
+        Add a sales line of L'Addition, `category` is the category1 of its product.
+        """
+        # ALL PRODUCTS
+        self.all_products_by_timeline[
+            service_data["timestamp_locale"]
+        ].append(
+            service_data["amount_total_evat"]
+        )
+        self.all_products_by_name[
+            service_data["product_name"]
+        ].append(
+            {
+                service_data["timestamp_locale"]: service_data["amount_total_evat"]
+            }
+        )
+        self.sales_lines.append(
+            (
+                service_data["timestamp_locale"],
+                service_data["id_product"],
+                service_data["product_name"],
+                service_data["amount_total_evat"],
+                category,
+            )
+        )
+
+        # SOLIDES HT
+        if category == "solid":
+            self.solids_no_tva += service_data["amount_total_evat"]
+
+        # LIQUIDES HT
+        elif category == "liquid":
+            self.drinks_sold[service_data["product_name"]] += 1
+            self.liquids_no_tva += service_data["amount_total_evat"]
+            self.liquids_quantity += 1
+
+            # MAJORATION
+            if service_data["category_name"] == "CONCERT":
+                product_hasnt_found_his_match = True
+                not_in_majoration_list = True
+                for price, name in MAJORATION_PRICES.items():
+                    if service_data["product_name"] in name:
+                        product_hasnt_found_his_match = False
+                        not_in_majoration_list = False
+                        self.markup_amount += price
+                        self.markup_quantity += 1
+                        self.products_with_markup[service_data["product_name"]] += 1
+                        break
+
+                # THIS MIGHT BE OPTIONNAL, to investigate
+                if product_hasnt_found_his_match is True:
+                    for price, name in MAJORATION_PRICES.items():
+                        if service_data["product_type"] in name:
+                            raise ValueError("Entered this logical branch that is probably not usefull")
+                # ABOVE MAY BE OPTIONNAL
+
+                if not_in_majoration_list is True:
+                    self.products_lacking_markup[service_data["product_name"]] += 1
+
+            else:
+                self.products_without_markup[service_data["product_name"]] += 1
+        else:
+            self.notfound_no_tva += service_data["amount_total_evat"]
+
+    def top_liquids(self, k: int = 5) -> Dict[str, int]:
+        """
+        The k most sold drinks and their sales count
+        """
+        return dict(top_k(self.drinks_sold, k))
+
+
+def copy_sales_lines(service_id: int, sales_lines: Iterable[SalesLineRow]) -> None:
+    """
+    Bulk load the sales lines of a service with COPY, inside the current session transaction.
+    Commit is left to the caller.
+    """
+    copy_services_sales_lines([(service_id, sales_lines)])
+
+
+def copy_services_sales_lines(services_sales_lines: Iterable[Tuple[int, Iterable[SalesLineRow]]]) -> None:
+    """
+    Bulk load the sales lines of many services with a single COPY, from (service id, sales lines) pairs.
+    Commit is left to the caller.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for service_id, sales_lines in services_sales_lines:
+        for sales_line in sales_lines:
+            # csv writes None as an empty unquoted field, which COPY reads as NULL
+            writer.writerow((service_id, *sales_line))
+    buffer.seek(0)
+
+    # Raw DBAPI cursor of the connection used by the session, COPY is not exposed by SQLAlchemy
+    cursor = DB_ORM.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)".format(
+                table=SalesLine.__tablename__,
+                columns=", ".join(SALES_LINE_COPY_COLUMNS),
+            ),
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def sales_lines_from_products_by_name(
+    all_products_list_by_name: Dict[str, List[Dict[str, float]]],
+) -> Iterator[SalesLineRow]:
+    """
+    Rebuild sales lines from a {"product name": [{"timestamp": amount}, ...]} mapping,
+    for services that were not ingested from L'Addition (product reference and category are unknown).
+    """
+    for product_name, product_sales in all_products_list_by_name.items():
+        for product_sale in product_sales:
+            for timestamp, amount in product_sale.items():
+                yield (timestamp, None, product_name, amount, None)
+
+
+def save_product_totals(service_id: int) -> None:
+    """
+    Aggregate the sales lines of a service per product, in the DB. Commit is left to the caller.
+    """
+    save_services_product_totals([service_id])
+
+
+def save_services_product_totals(service_ids: List[int]) -> None:
+    """
+    Aggregate the sales lines of many services per product, in one query. Commit is left to the caller.
+    """
+    DB_ORM.session.execute(PRODUCT_TOTALS_QUERY, {"service_ids": service_ids})
+
+
+def delete_service_sales(service_id: int) -> None:
+    """
+    Delete the sales lines and product totals of a service, to call along the service deletion.
+    Commit is left to the caller.
+    """
+    SalesLine.query.filter_by(service_id=service_id).delete(synchronize_session=False)
+    ProductTotal.query.filter_by(service_id=service_id).delete(synchronize_session=False)
+
+
+def _refresh_revenue_rollup_periods(company_id: int, rollup_periods: Iterable[Tuple[str, Any]]) -> None:
+    for period, service_date in rollup_periods:
+        DB_ORM.session.execute(
+            REVENUE_ROLLUP_REFRESH_QUERY,
+            {
+                "company_id": company_id,
+                "period": period,
+                "service_date": service_date,
+            }
+        )
+    DB_ORM.session.execute(EMPTY_REVENUE_ROLLUPS_QUERY, {"company_id": company_id})
+
+
+def refresh_revenue_rollups(company_id: int, service_date: datetime) -> None:
+    """
+    Refresh the day, week and month rollups of a company holding `service_date`.
+    To be called once a service is added, edited or deleted. Commit is left to the caller.
+    """
+    _refresh_revenue_rollup_periods(
+        company_id=company_id,
+        rollup_periods=[(period, service_date) for period in ROLLUP_PERIODS],
+    )
+
+
+def rollup_period_start(period: str, service_date: date) -> date:
+    """
+    First day of the rollup period holding `service_date`, as `date_trunc` computes it (weeks start on monday)
+    """
+    if period == 'week':
+        return service_date - timedelta(days=service_date.weekday())
+    if period == 'month':
+        return service_date.replace(day=1)
+    return service_date
+
+
+def refresh_revenue_rollups_of_dates(company_id: int, service_dates: Iterable[datetime]) -> None:
+    """
+    Refresh the rollups of a company holding any of `service_dates`, each period is refreshed once
+    however many services it holds. Commit is left to the caller.
+    """
+    service_days = {service_date.date() for service_date in service_dates}
+    _refresh_revenue_rollup_periods(
+        company_id=company_id,
+        rollup_periods=sorted({
+            (period, rollup_period_start(period, service_day))
+            for period in ROLLUP_PERIODS
+            for service_day in service_days
+        }),
+    )
+
+
+def timeline_columns(timeline: Optional[Dict[str, List[float]]]) -> Dict[str, bytes]:
+    """
+    Values of the service columns built from its sales timeline at ingestion:
+    its timeline index and its revenue by 15 minutes, both empty without sales.
+    """
+    timeline_index = TimelineIndex.from_timeline(timeline or {})
+    return {
+        'timeline_index': timeline_index.to_bytes(),
+        'time_buckets': TimeBuckets.from_timeline_index(timeline_index).to_bytes(),
+    }
+
+
+def get_timeline_index(service_id: int) -> TimelineIndex:
+    """
+    Return the timeline index of a service, from memory if possible.
+    Services ingested before the index existed have none until `flask services backfill-timelines`,
+    their index is empty meanwhile.
+    """
+    timeline_index = TIMELINE_INDEX_CACHE.get(service_id)
+    if timeline_index is not None:
+        return timeline_index
+
+    raw_timeline_index = (
+        DB_ORM.session.query(Service.timeline_index)
+        .filter(Service.id == service_id)
+        .scalar()
+    )
+    if raw_timeline_index is None:
+        return TimelineIndex.from_timeline({})
+
+    timeline_index = TimelineIndex.from_bytes(raw_timeline_index)
+    TIMELINE_INDEX_CACHE.set(service_id, timeline_index)
+    return timeline_index
+
+
+def backfill_timeline_columns(batch_size: int = IMPORT_BATCH_SIZE) -> int:
+    """
+    Build the timeline index and the revenue by 15 minutes of the services ingested before they existed,
+    see `timeline_columns`. Committed by batches of `batch_size` services, return the number of services backfilled.
+    """
+    backfilled_count = 0
+    while True:
+        services = (
+            DB_ORM.session.query(Service.id, Service.all_products_timeline)
+            .filter(or_(Service.timeline_index.is_(None), Service.time_buckets.is_(None)))
+            .order_by(Service.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not services:
+            return backfilled_count
+
+        for service_id, timeline in services:
+            (
+                DB_ORM.session.query(Service)
+                .filter(Service.id == service_id)
+                .update(
+                    {getattr(Service, column): value for column, value in timeline_columns(timeline).items()},
+                    synchronize_session=False,
+                )
+            )
+        DB_ORM.session.commit()
+        backfilled_count += len(services)
+
+
+def service_values_from_json(company_id: int, data: Any) -> Dict[str, Any]:
+    """
+    Column values of a service of an import, from a JSON object shaped like the `/add_service` payloads.
+    Its "company" is ignored, imported services belong to `company_id`. Raises ValueError on an invalid object.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    missing_fields = [field for field in ('date', *IMPORT_NUMBER_FIELDS) if data.get(field) is None]
+    if missing_fields:
+        raise ValueError(f"Missing fields {missing_fields}")
+
+    try:
+        service_date = datetime.fromisoformat(data['date'])
+    except (TypeError, ValueError):
+        raise ValueError(f"Wrong date format {data['date']!r}, use : YEAR-MONTH-DAY")
+    values: Dict[str, Any] = {"company_id": company_id, "date": service_date}
+
+    for field in IMPORT_NUMBER_FIELDS:
+        if isinstance(data[field], bool) or not isinstance(data[field], (int, float)):
+            raise ValueError(f"{field} must be a number")
+        values[field] = data[field]
+    for field in IMPORT_TEXT_FIELDS:
+        if not isinstance(data.get(field), (str, type(None))):
+            raise ValueError(f"{field} must be a string")
+        values[field] = data.get(field)
+    for field in IMPORT_JSON_FIELDS:
+        value = data.get(field)
+        # JSON columns used to be sent as JSON encoded strings
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                raise ValueError(f"{field} is not valid JSON")
+        if not isinstance(value, (dict, type(None))):
+            raise ValueError(f"{field} must be a JSON object")
+        values[field] = value
+
+    # The service pages read every concert info, services without one are stored as the ones without a concert
+    if values['concert_infos'] is None:
+        values['concert_infos'] = dict(NO_CONCERT_INFOS)
+        values['concert'] = values['concert'] or NO_CONCERT_NAME
+    missing_concert_infos = [key for key in NO_CONCERT_INFOS if key not in values['concert_infos']]
+    if missing_concert_infos:
+        raise ValueError(f"Missing concert_infos fields {missing_concert_infos}")
+
+    values.update(timeline_columns(values['all_products_timeline']))
+    return values
+
+
+def insert_services(services_values: List[Dict[str, Any]]) -> None:
+    """
+    Insert services with a single multi-row INSERT, along with their sales lines and product totals.
+    Commit is left to the caller.
+    """
+    # RETURNING does not follow the order of the VALUES, so ids are given to the services before the INSERT
+    service_ids = DB_ORM.session.execute(NEXT_SERVICE_IDS_QUERY, {"count": len(services_values)}).scalars().all()
+    DB_ORM.session.execute(
+        Service.__table__.insert().values([
+            {**values, "id": service_id}
+            for service_id, values in zip(service_ids, services_values)
+        ])
+    )
+    copy_services_sales_lines(
+        (service_id, sales_lines_from_products_by_name(values['all_products_list_by_name'] or {}))
+        for service_id, values in zip(service_ids, services_values)
+    )
+    save_services_product_totals(service_ids)
+
+
+def import_services(
+    company_id: int,
+    rows: Iterable[JSONRow],
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Validate services rows as they are read, and insert the valid ones by batches, in the current transaction.
+    Once a row is invalid nothing more is inserted, the remaining rows are only validated for the report.
+    Returns the report {"imported": count, "errors": [{"row": number, "error": message}, ...]},
+    the transaction must be committed only if there is no error, rolled back otherwise.
+    """
+    imported_count = 0
+    errors: List[Dict[str, Any]] = []
+    batch: List[Dict[str, Any]] = []
+    service_dates: Set[datetime] = set()
+
+    for row_number, data, error in rows:
+        if error is None:
+            try:
+                values = service_values_from_json(company_id, data)
+            except ValueError as exc:
+                error = str(exc)
+        if error is not None:
+            errors.append({"row": row_number, "error": error})
+            if len(errors) >= IMPORT_MAX_ERRORS:
+                break
+            continue
+        if errors:
+            continue
+
+        batch.append(values)
+        service_dates.add(values['date'])
+        if len(batch) >= batch_size:
+            insert_services(batch)
+            imported_count += len(batch)
+            batch = []
+
+    if errors:
+        return {"imported": 0, "errors": errors}
+
+    if batch:
+        insert_services(batch)
+        imported_count += len(batch)
+    refresh_revenue_rollups_of_dates(company_id=company_id, service_dates=service_dates)
+    return {"imported": imported_count, "errors": errors}
@@ -4,22 +4,48 @@ import json
 import logging
 import requests
 
-from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from flask import Blueprint, Response, flash, render_template, request
+from typing import Any, Callable, Dict, Optional, Tuple
+from flask import Blueprint, Response, abort, flash, make_response, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
-from ImageCharts import ImageCharts
 from requests.auth import HTTPBasicAuth
 from requests.structures import CaseInsensitiveDict
-from utils.utils import list_to_element_counted_and_sorted_dict
+from sqlalchemy import func
+from utils.cache import build_cache
+from utils.charts import chart_digest, render_bar_chart_svg, render_heatmap_svg, render_pie_chart_svg
+from utils.json_stream import iter_json_array, iter_ndjson
+from utils.logs import LazyLogValue
+from utils.pagination import estimate_query_row_count, paginate_by_keyset
+from utils.timeline import TimeBuckets, TimelineIndex, weekday_hour_heatmap
 from werkzeug.exceptions import BadRequest, NotFound, Conflict, Forbidden
+from project.ingestion import (
+    TIMELINE_INDEX_CACHE,
+    SalesAggregation,
+    copy_sales_lines,
+    delete_service_sales,
+    get_timeline_index,
+    import_services,
+    refresh_revenue_rollups,
+    sales_lines_from_products_by_name,
+    save_product_totals,
+    timeline_columns
+)
+from project.models.company import Company
 from project.models.service import Service
 from project.models.product import Product
+from project.models.rollup import ROLLUP_PERIODS, RevenueRollup
+from project.models.sales import ProductTotal
 from project.settings import (
     APP_NAME,
+    CHARTS_CACHE_BACKEND,
+    CHARTS_CACHE_DIR,
+    CHARTS_CACHE_SIZE,
     DB_ORM,
     LADDITION_AUTH_TOKEN,
     LADDITION_CUSTOMER_ID,
+    SERVICE_PAGES_CACHE_BACKEND,
+    SERVICE_PAGES_CACHE_DIR,
+    SERVICE_PAGES_CACHE_SIZE,
     SOWPROG_EMAIL_CREDENTIAL,
     SOWPROG_PASSWORD
 )
@@ -28,76 +54,33 @@ from project.synchers import sowprog_syncher, ProductSyncher
 main = Blueprint('main', __name__)
 logger = logging.getLogger(APP_NAME)
 PAGES_NUM_TO_LOAD = 10
+LEADERBOARD_DEFAULT_SIZE = 10
+IMPORT_CHUNK_SIZE = 64 * 1024
+
+# Template contexts of the service pages, keyed by (page name, service id, service version)
+SERVICE_PAGES = ('service', 'graph', 'concert')
+SERVICE_PAGES_CACHE = build_cache(
+    backend=SERVICE_PAGES_CACHE_BACKEND,
+    maxsize=SERVICE_PAGES_CACHE_SIZE,
+    directory=SERVICE_PAGES_CACHE_DIR,
+)
+
+SERVICE_CHART_TITLE = "LIQUIDES HT (TOP 5)"
+SERVICE_CHART_MAX_AGE = 365 * 24 * 3600
+WEEKDAYS = ('Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim')
+CHARTS_CACHE = build_cache(
+    backend=CHARTS_CACHE_BACKEND,
+    maxsize=CHARTS_CACHE_SIZE,
+    directory=CHARTS_CACHE_DIR,
+)
 
 ADMIN_ONLY_MESSAGE = 'Only a possessor of the True Force can enter this zone.'
-MAJORATION_PRICES = {
-    0: [
-        'Bière Bouteille',
-        'SHOT ',
-        'SHOT supp',
-        'APPIE BRUT',
-        'APPIE POIRE',
-        'APPIE ROSE',
-        'CAIPI',
-        'TI PUNCH',
-        'CORONA',
-        'CORONA',
-        'GIN FIZZ',
-        'CUBA LIBRE',
-        'COCKTAILS  dimanche',
-    ],
-    0.5: [
-        'V Chardonnay ',
-        'Demi Blonde',
-        'Demi Péroni',
-        'Demi grolsch',
-        'Demi IPA',
-    ],
-    1: [
-        'SOFT verse',
-        'Alcool PREM + Soft',
-        'Alcool+Soft',
-        'Virgin cocktails',
-        'DEMI Autre',
-        'Blonde pinte',
-        'Pinte grolsch',
-        'Pinte peroni',
-        'Pinte IPA',
-        'DEMI Blanche',
-        'Demi St stef',
-        'BUNDABERG',
-        'MOSCOW MULE',
-        'BUNDABERG',
-        'DARK & STORMY',
-        'REDBULL',
-        'PINTE Autre',
-    ],
-    1.5: [
-        'V Syrah',
-        'V Rose',
-        'Lemonaid',
-        'Charitea ',
-    ],
-    2: [
-        'BTL CHARDONAY ',
-        'PINTE Blanche',
-        'Pinte st stef',
-        'MOJITO',
-        'Weizen Pinte',
-    ],
-    3: [
-        'SPRITZ ST GERMAIN',
-        'COCKTAILS  classique'
-    ],
-    4: [
-        'SPRITZ',
-        'SPRITZ FIERO',
-    ],
-    7: [
-        'BTL SYRAH ',
-        'BTL Rose',
-    ],
-}
+SERVICE_JSON_FIELDS = (
+    'top_liquids',
+    'all_products_list_by_name',
+    'all_products_timeline',
+    'concert_infos',
+)
 
 
 @main.route('/')
@@ -121,37 +104,65 @@ def admin():
         return render_template('profile.html', user=current_user)
 
 
-# SERVICE INDEX
-@main.route('/services', methods=['GET', 'POST'], defaults={"page": 1})
-@main.route('/services/<int:page>', methods=['GET', 'POST'])
-@login_required
-def handle_services(page):
-    page = page
-    pages = PAGES_NUM_TO_LOAD
-    if request.method == 'GET':
-        services = (
-            Service.query
-            .order_by(Service.id.desc())
-            .paginate(page, pages, error_out=False)
+SERVICES_FILTERS = ('start_date', 'end_date')
+
+
+def filter_services(services_query, company_id: int, filters: Dict[str, str]):
+    '''
+        Restrict a services query to a company and to the date range (inclusive, YEAR-MONTH-DAY) of `filters`.
+        Raises ValueError on a wrong date format.
+    '''
+    services_query = services_query.filter(Service.company_id == company_id)
+    if 'start_date' in filters:
+        services_query = services_query.filter(
+            Service.date >= datetime.strptime(filters['start_date'], '%Y-%m-%d')
         )
-    elif request.method == 'POST':
-        # TODO RECUPERER DATE POUR FILTRE + RIEN EN FRONT
-
-        services = (
-            Service.query.filter(Service.date <= '2022-01-25')
-            .filter(Service.date >= '2022-01-15')
-            .paginate(
-                page,
-                pages,
-                error_out=False,
-            )
+    if 'end_date' in filters:
+        services_query = services_query.filter(
+            Service.date < datetime.strptime(filters['end_date'], '%Y-%m-%d') + timedelta(days=1)
         )
+    return services_query
 
-        # FIXME: Dates should be serialized, and not set as a string.
-    else:
+
+# SERVICE INDEX
+@main.route('/services', methods=['GET', 'POST'])
+@login_required
+def handle_services():
+    # Pages are linked by cursors of the (date, id) of their first and last services
+    after = request.args.get('after')
+    before = request.args.get('before')
+    if request.method not in ('GET', 'POST'):
         return BadRequest(f"Only POST and GET method are allowed, received {request.method}")
 
-    return render_template('list_services.html', services=services)
+    # Filters are posted by the filter form, then carried by the pagination links as arguments
+    filters = {
+        filter_name: request.values[filter_name]
+        for filter_name in SERVICES_FILTERS
+        if request.values.get(filter_name)
+    }
+    try:
+        services_query = filter_services(
+            Service.query.options(Service.load_profile('list')),
+            current_user.company_id,
+            filters,
+        )
+    except ValueError:
+        return BadRequest(description="Wrong date format, use : YEAR-MONTH-DAY")
+
+    try:
+        services = paginate_by_keyset(
+            query=services_query,
+            date_column=Service.date,
+            id_column=Service.id,
+            per_page=PAGES_NUM_TO_LOAD,
+            after=after,
+            before=before,
+        )
+    except ValueError:
+        return BadRequest(description="Invalid page cursor")
+    services.estimated_total = estimate_query_row_count(DB_ORM.session, services_query)
+
+    return render_template('list_services.html', services=services, filters=filters)
 
 
 @main.route('/add_service', methods=['POST'])
@@ -159,21 +170,35 @@ def add_service():
     if request.method == 'POST':
         if request.is_json:
             data = request.get_json()
+            # JSON columns used to be sent as JSON encoded strings, store them as JSON objects
+            for json_field in SERVICE_JSON_FIELDS:
+                if isinstance(data.get(json_field), str):
+                    data[json_field] = json.loads(data[json_field])
+            company = Company.query.filter_by(name=data['company']).first()
+            if company is None:
+                return BadRequest(description=f"Unknown company {data['company']}")
             new_service = Service(
-                company=data['company'],
+                company_id=company.id,
                 date=data['date'],
                 CA=data['CA'],
                 solid=data['solid'],
                 liquid=data['liquid'],
                 majoration=data['majoration'],
-                graph_url=data['graph_url'],
                 top_liquids=data['top_liquids'],
                 all_products_list_by_name=data['all_products_list_by_name'],
                 all_products_timeline=data['all_products_timeline'],
                 concert=data['concert'],
-                concert_infos=data['concert_infos']
+                concert_infos=data['concert_infos'],
+                **timeline_columns(data['all_products_timeline']),
             )
             DB_ORM.session.add(new_service)
+            DB_ORM.session.flush()
+            copy_sales_lines(
+                service_id=new_service.id,
+                sales_lines=sales_lines_from_products_by_name(new_service.all_products_list_by_name or {}),
+            )
+            save_product_totals(service_id=new_service.id)
+            refresh_revenue_rollups(company_id=new_service.company_id, service_date=new_service.date)
             DB_ORM.session.commit()
             return {"message": f"service {new_service.date} has been created successfully."}
         else:
@@ -182,6 +207,30 @@ def add_service():
         return {"error": "The request is not a POST request"}
 
 
+@main.route('/import_services', methods=['POST'])
+@login_required
+def import_services_view():
+    '''
+        Import many services into the company of the user, from a JSON array of `/add_service` payloads
+        or from one payload per line (Content-Type: application/x-ndjson).
+        Nothing is imported unless every row is valid, the invalid rows are reported by number.
+    '''
+    if request.mimetype == 'application/x-ndjson':
+        rows = iter_ndjson(request.stream)
+    elif request.mimetype == 'application/json':
+        rows = iter_json_array(iter(lambda: request.stream.read(IMPORT_CHUNK_SIZE), b""))
+    else:
+        return BadRequest(description="Send a JSON array or NDJSON (application/x-ndjson) of services")
+
+    report = import_services(company_id=current_user.company_id, rows=rows)
+    if report["errors"]:
+        DB_ORM.session.rollback()
+        return report, 400
+    DB_ORM.session.commit()
+    logger.info(msg=f"Imported {report['imported']} services", extra={"company_id": current_user.company_id})
+    return report
+
+
 @main.route('/add_menu', methods=['GET', 'POST', 'DELETE'])
 @login_required
 def add_menu():
@@ -191,7 +240,7 @@ def add_menu():
 
     elif request.method == 'POST':
 
-        products_added, updated_products = ProductSyncher.sync_products()
+        products_added, updated_products = ProductSyncher.sync_products(company_id=current_user.company_id)
 
         return render_template(
             'menu.html',
@@ -209,12 +258,108 @@ def add_menu():
             return render_template('menu.html')
 
 
+def company_services():
+    '''
+        Services query scoped to the company of the current user
+    '''
+    return Service.query.filter(Service.company_id == current_user.company_id)
+
+
+def service_page_etag(page_name: str, service_id: int, service_version: int) -> str:
+    # The navigation bar depends on the user, so does the page
+    return f"{page_name}-{service_id}-{service_version}-{current_user.get_id()}"
+
+
+def render_service_page(
+    page_name: str,
+    service_id: int,
+    template_name: str,
+    build_context: Callable[[Service], Dict[str, Any]],
+    service: Service = None,
+) -> Response:
+    '''
+        Render a service page from its cached template context, built by `build_context` on a miss.
+        The messages listed under the "flash_messages" key of the context are flashed on each render.
+        Browsers revalidate with the page ETag, answered by a 304 while the service is unchanged.
+    '''
+    if service is None:
+        service_version = (
+            DB_ORM.session.query(Service.version)
+            .filter_by(id=service_id, company_id=current_user.company_id)
+            .scalar()
+        )
+        if service_version is None:
+            abort(404)
+    else:
+        service_version = service.version
+
+    etag = service_page_etag(page_name, service_id, service_version)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        cache_key = (page_name, service_id, service_version)
+        context = SERVICE_PAGES_CACHE.get(cache_key)
+        if context is None:
+            if service is None:
+                service = (
+                    company_services()
+                    .options(Service.load_profile(page_name))
+                    .filter(Service.id == service_id)
+                    .first_or_404()
+                )
+            context = build_context(service)
+            SERVICE_PAGES_CACHE.set(cache_key, context)
+        for message in context.get("flash_messages", ()):
+            flash(message)
+        response = make_response(render_template(template_name, **context))
+
+    response.set_etag(etag)
+    # Cached by the browser, but always revalidated
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def invalidate_service_pages(service_id: int, service_version: int) -> None:
+    for page_name in SERVICE_PAGES:
+        SERVICE_PAGES_CACHE.delete((page_name, service_id, service_version))
+
+
+def build_service_details_context(service: Service) -> Dict[str, Any]:
+    # FIXME could youse service.serialize() to output a Json
+    return {
+        "service": {
+            "id": service.id,
+            "company": service.company.name,
+            "date": service.date.strftime('%d-%m-%Y'),
+            "CA": service.CA,
+            "solid": service.solid,
+            "liquid": service.liquid,
+            "majoration": service.majoration,
+            "graph_url": service_chart_url(service),
+            "top_liquids": service.top_liquids,
+            "all_products_list_by_name": service.all_products_list_by_name,
+            "all_products_timeline": service.all_products_timeline,
+            "concert": service.concert,
+            "title": service.concert_infos['title'],
+            "facebook": service.concert_infos['facebook'],
+            "style": service.concert_infos['style'],
+            "free": service.concert_infos['free'],
+            "picture": service.concert_infos['picture']
+        },
+    }
+
+
 @main.route('/service/<int:service_id>', methods=['GET', 'POST', 'DELETE'])
 @login_required
 def handle_service(service_id):
     # return {"message": "TEST"} -> DELETEME
-    service = Service.query.get_or_404(service_id)
-    concert_dict = json.loads(service.concert_infos)
+    if request.method == 'GET':
+        return render_service_page('service', service_id, 'service_details.html', build_service_details_context)
+
+    service = company_services().filter(Service.id == service_id).first_or_404()
+    service_version = service.version
+    concert_dict = service.concert_infos
     concert_json = {
         "title": concert_dict.get("title"),
         "facebook": concert_dict.get("facebook"),
@@ -239,77 +384,237 @@ def handle_service(service_id):
             service.majoration = input_value
         elif select_concert_info == "title" or select_concert_info == "style" or select_concert_info == "facebook":
             concert_json.update({select_concert_info: select_concert_value})
-            service.concert_infos = json.dumps(concert_json)
+            service.concert_infos = concert_json
         elif select_concert_info == "free":
             if not select_is_free:
                 select_is_free = False
             concert_json.update({select_concert_info: select_is_free})
-            service.concert_infos = json.dumps(concert_json)
+            service.concert_infos = concert_json
         else:
             return {"message": "ERROR"}  # use one of werkzeug.exceptions and include information in description
 
+        # Flushing an update bumps the service version
         DB_ORM.session.add(service)
+        DB_ORM.session.flush()
+        refresh_revenue_rollups(company_id=service.company_id, service_date=service.date)
         DB_ORM.session.commit()
+        invalidate_service_pages(service_id, service_version)
 
     elif request.method == 'DELETE':
+        delete_service_sales(service_id)
         DB_ORM.session.delete(service)
+        DB_ORM.session.flush()
+        refresh_revenue_rollups(company_id=service.company_id, service_date=service.date)
         DB_ORM.session.commit()
+        invalidate_service_pages(service_id, service_version)
         return {"message": f"Service {service.date} successfully deleted."}
 
-    service = Service.query.get_or_404(service_id)
-    # FIXME could youse service.serialize() to output a Json
-    response = {
-        "id": service.id,
-        "company": service.company,
-        "date": service.date.strftime('%d-%m-%Y'),
-        "CA": service.CA,
-        "solid": service.solid,
-        "liquid": service.liquid,
-        "majoration": service.majoration,
-        "graph_url": service.graph_url,
-        "top_liquids": service.top_liquids,
-        "all_products_list_by_name": service.all_products_list_by_name,
-        "all_products_timeline": service.all_products_timeline,
-        "concert": service.concert,
-        # vvv please don't json.loads multiple time. loads the dict in one hit.
-        "title": json.loads(service.concert_infos)['title'],
-        "facebook": json.loads(service.concert_infos)['facebook'],
-        "style": json.loads(service.concert_infos)['style'],
-        "free": json.loads(service.concert_infos)['free'],
-        "picture": json.loads(service.concert_infos)['picture']
-    }
-    return render_template('service_details.html', service=response)
+    return render_service_page(
+        'service', service_id, 'service_details.html', build_service_details_context, service=service,
+    )
 
 
-@main.route('/service/<int:service_id>/graph')
-@login_required
-def handle_graph(service_id):
-    service = Service.query.get_or_404(service_id)
-    if not service.graph_url:
-        flash('No graph generated for this service.')
-        response = {
-            "date": service.date.strftime('%d %m %Y'),
-            "graph_url": ""
+def build_graph_context(service: Service) -> Dict[str, Any]:
+    if not service.top_liquids:
+        return {
+            "flash_messages": ['No graph generated for this service.'],
+            "service": {
+                "date": service.date.strftime('%d %m %Y'),
+                "graph_url": ""
+            },
         }
-        return render_template('graph.html', service=response)
-    else:
-        response = {
+    return {
+        "service": {
             "id": service.id,
-            "company": service.company,
+            "company": service.company.name,
             "date": service.date.strftime('%d-%m-%Y'),
             "CA": service.CA,
             "liquid": service.liquid,
-            "graph_url": service.graph_url,
+            "graph_url": service_chart_url(service),
+            "sales_per_hour_url": service_chart_url(service, 'sales_per_hour'),
+            "sales_per_15_minutes_url": service_chart_url(service, 'sales_per_15_minutes'),
             "top_liquids": service.top_liquids
-        }
-        return render_template('graph.html', service=response)
+        },
+    }
+
+
+@main.route('/service/<int:service_id>/graph')
+@login_required
+def handle_graph(service_id):
+    return render_service_page('graph', service_id, 'graph.html', build_graph_context)
+
+
+def service_time_buckets(service: Service) -> TimeBuckets:
+    # Services ingested before the buckets existed have none until `flask services backfill-timelines`
+    if service.time_buckets is None:
+        return TimeBuckets.empty()
+    return TimeBuckets.from_bytes(service.time_buckets)
+
+
+def top_liquids_chart_arguments(service: Service) -> Optional[Dict[str, Any]]:
+    if not service.top_liquids:
+        return None
+    return {
+        # Sorted as JSONB does not keep the order of the keys
+        "values": dict(sorted(service.top_liquids.items(), key=lambda item: (-item[1], item[0]))),
+        "title": SERVICE_CHART_TITLE,
+        "center_label": f"{service.liquid} €",
+    }
+
+
+def sales_per_hour_chart_arguments(service: Service) -> Optional[Dict[str, Any]]:
+    sales_per_hour = service_time_buckets(service).per_hour()
+    if not sales_per_hour:
+        return None
+    return {
+        "bars": [(hour.strftime('%Hh'), round(amount, 2)) for hour, amount in sales_per_hour],
+        "title": "CA HT PAR HEURE",
+    }
+
+
+def sales_per_15_minutes_chart_arguments(service: Service) -> Optional[Dict[str, Any]]:
+    sales_per_15_minutes = service_time_buckets(service).per_15_minutes()
+    if not sales_per_15_minutes:
+        return None
+    return {
+        "bars": [(quarter.strftime('%H:%M'), round(amount, 2)) for quarter, amount in sales_per_15_minutes],
+        "title": "CA HT PAR 15 MINUTES",
+        # One label by hour
+        "labels_every": 4,
+    }
+
+
+# Charts of a service, by name: the function rendering the chart
+# and the function giving its arguments, None for a service without the data of the chart
+SERVICE_CHARTS: Dict[str, Tuple[Callable[..., str], Callable[[Service], Optional[Dict[str, Any]]]]] = {
+    'top_liquids': (render_pie_chart_svg, top_liquids_chart_arguments),
+    'sales_per_hour': (render_bar_chart_svg, sales_per_hour_chart_arguments),
+    'sales_per_15_minutes': (render_bar_chart_svg, sales_per_15_minutes_chart_arguments),
+}
+
+
+def service_chart_digest(service: Service, chart_name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    '''
+        Digest and arguments of a chart of a service, an empty digest and None without the data of the chart
+    '''
+    _, chart_arguments = SERVICE_CHARTS[chart_name]
+    arguments = chart_arguments(service)
+    if arguments is None:
+        return "", None
+    return chart_digest([chart_name, arguments]), arguments
+
+
+def service_chart_url(service: Service, chart_name: str = 'top_liquids') -> str:
+    '''
+        URL of a chart of a service (see SERVICE_CHARTS), rendered when it is first requested.
+        The URL holds the digest of the chart arguments, it changes with the numbers of the service.
+        Empty for a service without the data of the chart.
+    '''
+    digest, arguments = service_chart_digest(service, chart_name)
+    if arguments is None:
+        return ""
+    return url_for('main.service_chart', service_id=service.id, chart_name=chart_name, digest=digest)
+
+
+@main.route('/service/<int:service_id>/chart/<any(top_liquids, sales_per_hour, sales_per_15_minutes):chart_name>/'
+            '<digest>.svg')
+@login_required
+def service_chart(service_id, chart_name, digest):
+    service = (
+        company_services()
+        .options(Service.load_profile('graph'))
+        .filter(Service.id == service_id)
+        .first_or_404()
+    )
+    current_digest, arguments = service_chart_digest(service, chart_name)
+    if arguments is None:
+        return NotFound(description="No data for this chart")
+    if digest != current_digest:
+        # Former URL of a chart whose numbers changed since
+        return redirect(
+            url_for('main.service_chart', service_id=service_id, chart_name=chart_name, digest=current_digest)
+        )
+
+    # Services with the same numbers share their charts
+    svg = CHARTS_CACHE.get(current_digest)
+    if svg is None:
+        render_chart, _ = SERVICE_CHARTS[chart_name]
+        svg = render_chart(**arguments)
+        CHARTS_CACHE.set(current_digest, svg)
+
+    response = Response(svg, mimetype='image/svg+xml')
+    # A new chart gets a new URL, the browser never has to revalidate this one
+    response.cache_control.private = True
+    response.cache_control.max_age = SERVICE_CHART_MAX_AGE
+    response.cache_control.immutable = True
+    response.set_etag(current_digest)
+    return response
+
+
+@main.route('/services/heatmap.svg')
+@login_required
+def services_heatmap():
+    '''
+        Revenue of the services of the company by weekday and hour,
+        over the date range of the `start_date` and `end_date` filters (YEAR-MONTH-DAY, included)
+    '''
+    filters = {
+        filter_name: request.args[filter_name]
+        for filter_name in SERVICES_FILTERS
+        if request.args.get(filter_name)
+    }
+    try:
+        services_query = filter_services(
+            DB_ORM.session.query(Service.time_buckets).filter(Service.time_buckets.isnot(None)),
+            current_user.company_id,
+            filters,
+        )
+    except ValueError:
+        return BadRequest(description="Wrong date format, use : YEAR-MONTH-DAY")
+
+    # Only the buckets of the services are read, not their sales.
+    # Services without buckets yet (see `flask services backfill-timelines`) count as no sales
+    heatmap = weekday_hour_heatmap([
+        TimeBuckets.from_bytes(raw_time_buckets)
+        for raw_time_buckets, in services_query.all()
+    ])
+    arguments = {
+        "rows": WEEKDAYS,
+        "columns": [f"{hour}h" for hour in range(24)],
+        "values": heatmap.round(2).tolist(),
+        "title": "CA HT PAR JOUR ET HEURE",
+    }
+    digest = chart_digest(['heatmap', arguments])
+    if request.if_none_match.contains(digest):
+        response = Response(status=304)
+    else:
+        svg = CHARTS_CACHE.get(digest)
+        if svg is None:
+            svg = render_heatmap_svg(**arguments)
+            CHARTS_CACHE.set(digest, svg)
+        response = Response(svg, mimetype='image/svg+xml')
+
+    response.set_etag(digest)
+    # Changes with any service of the range, always revalidated
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 
 @main.route('/service/<int:service_id>/json', methods=['GET', 'POST'])
 @login_required
 def json_tools_view(service_id):
-    service = Service.query.get_or_404(service_id)
-    if not service.all_products_timeline and not service.all_products_list_by_name:
+    service = company_services().filter(Service.id == service_id).first_or_404()
+    # Read from the product totals and the timeline index, the deferred blobs of the service are never loaded
+    products_to_search = [
+        product_name
+        for product_name, in (
+            DB_ORM.session.query(ProductTotal.product_name)
+            .filter(ProductTotal.service_id == service_id)
+            .order_by(ProductTotal.product_name)
+        )
+    ]
+    if not products_to_search and not len(get_timeline_index(service_id)):
         flash('No info for this in this service')
         return render_template(
             'json_tools.html',
@@ -319,24 +624,13 @@ def json_tools_view(service_id):
             result_product=""
         )
 
-    product_name_to_profits = json.loads(service.all_products_list_by_name)
-
-    command_datetime_to_profits = {
-        datetime.fromisoformat(key): value
-        for key, value in json.loads(service.all_products_timeline).items()
-    }
     service = {
         "service_id": service_id,
         "date": service.date.strftime('%Y-%m-%d'),
         "title_date": service.date.strftime('%d-%m-%Y'),
-        "graph_url": service.graph_url
+        "graph_url": service_chart_url(service)
     }
 
-    products_to_search = [
-        product_name
-        for product_name in product_name_to_profits.keys()
-    ]
-
     if request.method == 'GET':
         return render_template(
             'json_tools.html',
@@ -357,12 +651,10 @@ def json_tools_view(service_id):
                 request.json['input_date_end'].replace('T', ' '),
                 '%Y-%m-%d %H:%M'
             )
-            result_timeline = 0
-
-            for command_time, profits in command_datetime_to_profits.items():
-                if (command_time > input_date_start and command_time < input_date_end):
-                    for command_price in profits:
-                        result_timeline += command_price
+            result_timeline = get_timeline_index(service_id).revenue_between(
+                start=input_date_start,
+                end=input_date_end,
+            )
             result_timeline = round(result_timeline, 2)
             result_timeline = str(result_timeline) + " €"
 
@@ -370,37 +662,122 @@ def json_tools_view(service_id):
 
         elif request.json['wich_json'] == 'product':
             product_to_search = request.json['products_to_search']
-            result_product = 0
-            for product_name, product_infos in product_name_to_profits.items():
-                if product_name == product_to_search:
-
-                    for command_info in product_infos:
-                        for command_price in command_info.values():
-                            result_product += command_price
+            product_total = ProductTotal.query.filter_by(
+                service_id=service_id,
+                product_name=product_to_search,
+            ).first()
+            result_product = 0 if product_total is None else product_total.revenue
             result_product = round(result_product, 2)
             result_product = str(result_product) + " €"
 
             return result_product
 
 
-@main.route('/service/<int:service_id>/concert', methods=['GET', 'POST'])
-def concert_view(service_id):
-    service = Service.query.get_or_404(service_id)
+@main.route('/products/leaderboard')
+@login_required
+def products_leaderboard():
+    """
+    Best selling products over the services of a date range, from the per-service product totals.
+    """
+    try:
+        start_date = datetime.strptime(request.args['start_date'], '%Y-%m-%d')
+        end_date = datetime.strptime(request.args['end_date'], '%Y-%m-%d')
+        limit = int(request.args.get('limit', LEADERBOARD_DEFAULT_SIZE))
+    except (KeyError, ValueError):
+        return BadRequest(
+            description="Expected 'start_date' and 'end_date' (YYYY-MM-DD) arguments, and an integer 'limit'"
+        )
+
+    revenue = func.sum(ProductTotal.revenue).label('revenue')
+    leaderboard = (
+        DB_ORM.session.query(
+            ProductTotal.product_name,
+            func.sum(ProductTotal.sales_count).label('sales_count'),
+            revenue,
+        )
+        .join(Service, Service.id == ProductTotal.service_id)
+        .filter(Service.company_id == current_user.company_id)
+        .filter(Service.date >= start_date)
+        .filter(Service.date < end_date + timedelta(days=1))
+        .group_by(ProductTotal.product_name)
+        .order_by(revenue.desc())
+        .limit(limit)
+    )
+
+    return {
+        "products": [
+            {
+                "product_name": product_name,
+                "sales_count": sales_count,
+                "revenue": round(product_revenue, 2),
+            }
+            for product_name, sales_count, product_revenue in leaderboard
+        ]
+    }
+
+
+@main.route('/analytics/revenue')
+@login_required
+def revenue_analytics():
+    """
+    Revenue of the user company per day, week or month over a date range, read from the revenue rollups.
+    """
+    period = request.args.get('period', 'month')
+    if period not in ROLLUP_PERIODS:
+        return BadRequest(description=f"'period' must be one of {', '.join(ROLLUP_PERIODS)}")
+    try:
+        start_date = datetime.strptime(request.args['start_date'], '%Y-%m-%d')
+        end_date = datetime.strptime(request.args['end_date'], '%Y-%m-%d')
+    except (KeyError, ValueError):
+        return BadRequest(description="Expected 'start_date' and 'end_date' (YYYY-MM-DD) arguments")
+
+    rollups = (
+        RevenueRollup.query
+        .filter_by(company_id=current_user.company_id, period=period)
+        .filter(RevenueRollup.period_start >= start_date)
+        .filter(RevenueRollup.period_start <= end_date)
+        .order_by(RevenueRollup.period_start)
+    )
+
+    return {
+        "company": current_user.company.name,
+        "period": period,
+        "rollups": [
+            {
+                "period_start": rollup.period_start.strftime('%Y-%m-%d'),
+                "services_count": rollup.services_count,
+                "CA": round(rollup.CA, 2),
+                "solid": round(rollup.solid, 2),
+                "liquid": round(rollup.liquid, 2),
+                "majoration": round(rollup.majoration, 2),
+            }
+            for rollup in rollups
+        ]
+    }
+
+
+def build_concert_context(service: Service) -> Dict[str, Any]:
     # TODO GERER NO CONCERT
     # if not service.concert:
     #     flash('No infos for this concert in this service')
-
-    concert = {
-        "id": service.id,
-        "company": service.company,
-        "date": service.date.strftime('%Y-%m-%d'),
-        "title": json.loads(service.concert_infos)['title'],
-        "facebook": json.loads(service.concert_infos)['facebook'],
-        "style": json.loads(service.concert_infos)['style'],
-        "free": json.loads(service.concert_infos)['free'],
-        "picture": json.loads(service.concert_infos)['picture'],
+    return {
+        "concert": {
+            "id": service.id,
+            "company": service.company.name,
+            "date": service.date.strftime('%Y-%m-%d'),
+            "title": service.concert_infos['title'],
+            "facebook": service.concert_infos['facebook'],
+            "style": service.concert_infos['style'],
+            "free": service.concert_infos['free'],
+            "picture": service.concert_infos['picture'],
+        },
     }
-    return render_template('concert.html', concert=concert)
+
+
+@main.route('/service/<int:service_id>/concert', methods=['GET', 'POST'])
+@login_required
+def concert_view(service_id):
+    return render_service_page('concert', service_id, 'concert.html', build_concert_context)
 
 
 @main.route('/new_service/', methods=['GET'])
@@ -458,25 +835,7 @@ def request_manualy_add_service():
         sales_details = laddition_response.json()["data"][0]
         service_id = sales_details['id']
         sales_no_tva = sales_details['amount_total_evat']
-        liquids_no_tva = 0
-        solids_no_tva = 0
-        solids = CaseInsensitiveDict()
-        solids["no_TVA"] = 0
-        liquids = CaseInsensitiveDict()
-        liquids["no_TVA"] = 0
-        liquids["quantity"] = 0
-        notfound = CaseInsensitiveDict()
-        notfound["no_TVA"] = 0
-        markup = CaseInsensitiveDict()
-        markup["amount"] = 0
-        markup["quantity"] = 0
-        products_with_markup = []
-        products_without_markup = []
-        products_lacking_markup = []
-        drinks_sold = []
-        top5_most_sold_drinks = []
-        all_products_by_timeline = defaultdict(list)
-        all_products_by_name = defaultdict(list)
+        aggregation = SalesAggregation()
 
         # REQUETE API POUR RECUPERER LE NOMBRE DE PAGES
         service_reponse = requests.get(
@@ -495,9 +854,11 @@ def request_manualy_add_service():
             for service_data in service_response:
                 # check if product alrealy in DB
                 check_if_product_already_in_DB = Product.query.filter_by(
+                    company_id=current_user.company_id,
                     uniq_id_product=service_data['id_product']).count()
                 if check_if_product_already_in_DB == 1:
                     product_in_DB = Product.query.filter_by(
+                        company_id=current_user.company_id,
                         uniq_id_product=service_data['id_product']
                     ).first()
                 elif check_if_product_already_in_DB > 1:
@@ -505,129 +866,44 @@ def request_manualy_add_service():
                 else:
                     return NotFound(description="Product not found, update Menu at cultplace.app/add_menu")
 
-                # ALL PRODUCTS
-                all_products_by_timeline[
-                    service_data["timestamp_locale"]
-                ].append(
-                    service_data["amount_total_evat"]
-                )
-                all_products_by_name[
-                    service_data["product_name"]
-                ].append(
-                    {
-                        service_data["timestamp_locale"]: service_data["amount_total_evat"]
-                    }
-                )
-
-                # SOLIDES HT
-                if product_in_DB.category1 == "solid":
-                    solids["no_TVA"] = solids["no_TVA"] + service_data["amount_total_evat"]
-
-                # LIQUIDES HT
-                elif product_in_DB.category1 == "liquid":
-                    drinks_sold.append(service_data["product_name"])
-                    liquids["no_TVA"] = liquids["no_TVA"] + \
-                        service_data["amount_total_evat"]
-                    liquids["quantity"] = liquids["quantity"] + 1
-
-                    # MAJORATION
-                    if service_data["category_name"] == "CONCERT":
-                        product_hasnt_found_his_match = True
-                        not_in_majoration_list = True
-                        for price, name in MAJORATION_PRICES.items():
-                            if service_data["product_name"] in name:
-                                product_hasnt_found_his_match = False
-                                not_in_majoration_list = False
-                                markup["amount"] = markup["amount"] + price
-                                markup["quantity"] += 1
-                                products_with_markup.append(service_data["product_name"])
-                                break
-
-                        # THIS MIGHT BE OPTIONNAL, to investigate
-                        if product_hasnt_found_his_match is True:
-                            for price, name in MAJORATION_PRICES.items():
-                                if service_data["product_type"] in name:
-                                    product_hasnt_found_his_match = False
-                                    not_in_majoration_list = False
-                                    markup["amount"] = markup["amount"] + price
-                                    markup["quantity"] += 1
-                                    products_with_markup.append(service_data["product_name"])
-                                    raise ValueError("Entered this logical branch that is probably not usefull")
-                                    break
-                        # ABOVE MAY BE OPTIONNAL
-
-                        if not_in_majoration_list is True:
-                            products_lacking_markup.append(service_data["product_name"])
-
-                    else:
-                        products_without_markup.append(service_data["product_name"])
-                else:
-                    notfound["no_TVA"] = notfound["no_TVA"] + service_data["amount_total_evat"]
+                aggregation.add_sales_line(service_data, category=product_in_DB.category1)
 
         # DATA INGESTION
-        products_with_markup = list_to_element_counted_and_sorted_dict(products_with_markup)
-        products_with_markup["MAJORATION"] = {markup['quantity']: markup['amount']}
-        products_without_markup = list_to_element_counted_and_sorted_dict(products_without_markup)
-        products_lacking_markup = list_to_element_counted_and_sorted_dict(products_lacking_markup)
-        drinks_sold = list_to_element_counted_and_sorted_dict(drinks_sold)
-
-        top5_most_sold_drinks = list(drinks_sold.items())[:5]
-        solids_no_tva = round(solids["no_TVA"], 2)
-        liquids_no_tva = round(liquids["no_TVA"], 2)
-        majoration_xls = round(markup["amount"], 2)
+        top5_most_sold_drinks = aggregation.top_liquids()
+        solids_no_tva = round(aggregation.solids_no_tva, 2)
+        liquids_no_tva = round(aggregation.liquids_no_tva, 2)
+        majoration_xls = round(aggregation.markup_amount, 2)
         sales_no_tva = round(sales_no_tva, 2)
 
-        top5_most_sold_drinks = dict(top5_most_sold_drinks)
-        top_5_boissons_vendues_values = ",".join(
-            repr(e) for e in top5_most_sold_drinks.values()
-        )
-        top_5_boissons_vendues_values_for_chl = top_5_boissons_vendues_values.replace(
-            ",", "|")
-        top_5_boissons_vendues_keys = "|".join(
-            repr(e) for e in top5_most_sold_drinks.keys())
-        top_5_boissons_vendues_keys = top_5_boissons_vendues_keys.replace(
-            "'", "")
-
-        # PIE CHART FOR LIQUIDS
-        pie_chart = (
-            ImageCharts()
-            .cht('pd')
-            .chd("t:{}".format(top_5_boissons_vendues_values))
-            .chdl("{}".format(top_5_boissons_vendues_keys))
-            .chli("{} €".format(liquids_no_tva))
-            .chl("{}".format(top_5_boissons_vendues_values_for_chl))
-            .chtt("LIQUIDES HT (TOP 5)")
-            .chdlp("l")
-            .chs('400x200')
-        )
-        pie_chart_url = pie_chart.to_url()
+        timeline_values = timeline_columns(aggregation.all_products_by_timeline)
 
         # INSCRIRE EN DB LE SERVICE
         # TODO : add majorationd details, produits non majores et produits a majorer in model
         new_service = Service(
-            company='La Petite Halle',
+            company_id=current_user.company_id,
             date=period_start_date.strftime('%Y-%m-%d'),
             CA=sales_no_tva,
             solid=solids_no_tva,
             liquid=liquids_no_tva,
             majoration=majoration_xls,
-            graph_url=pie_chart_url,
-            top_liquids=json.dumps(top5_most_sold_drinks),
-            all_products_list_by_name=json.dumps(all_products_by_name),
-            all_products_timeline=json.dumps(all_products_by_timeline),
+            top_liquids=top5_most_sold_drinks,
+            all_products_list_by_name=aggregation.all_products_by_name,
+            all_products_timeline=aggregation.all_products_by_timeline,
+            **timeline_values,
             concert=concert_name,
-            concert_infos=json.dumps(concert_infos),
+            concert_infos=concert_infos,
         )
         DB_ORM.session.add(new_service)
+        # Flush to get the service id, sales lines are written in the same transaction
+        DB_ORM.session.flush()
+        copy_sales_lines(service_id=new_service.id, sales_lines=aggregation.sales_lines)
+        save_product_totals(service_id=new_service.id)
+        refresh_revenue_rollups(company_id=new_service.company_id, service_date=new_service.date)
         DB_ORM.session.commit()
+        TIMELINE_INDEX_CACHE.set(new_service.id, TimelineIndex.from_bytes(timeline_values['timeline_index']))
         date_added_to_database = date_to_search_str
-        logger.info(
-            "Added 1 service: %s",
-            new_service.id_str,
-            extra={
-                "service_data": new_service.serialize(),
-            }
-        )
+        logger.info("Added 1 service: %s", new_service.id_str)
+        logger.debug("Data of the added service: %s", LazyLogValue(new_service.serialize))
     else:
         date_with_no_sales = date_to_search_str
 
@@ -0,0 +1,114 @@
+"""_11_compress_service_products_columns
+
+Revision ID: 72e834d7303b
+Revises: dc8dcb464cb8
+Create Date: 2026-10-19 13:39:30.017923
+
+"""
+import zlib
+
+from alembic import op
+import orjson
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '72e834d7303b'
+down_revision = 'dc8dcb464cb8'
+branch_labels = None
+depends_on = None
+
+
+BLOB_COLUMNS = (
+    'all_products_list_by_name',
+    'all_products_timeline',
+)
+# Services rewritten per statement, a blob weighs a few kilobytes
+BATCH_SIZE = 500
+
+# Format of utils.compression at this revision, copied so that later changes of it do not change this migration:
+# a marker byte, then the JSON as is below the threshold, compressed by zlib from it
+RAW_MARKER = b"j"
+ZLIB_MARKER = b"z"
+COMPRESSION_THRESHOLD = 1024
+COMPRESSION_LEVEL = 6
+
+
+def compress_json(value):
+    json_value = orjson.dumps(value)
+    if len(json_value) < COMPRESSION_THRESHOLD:
+        return RAW_MARKER + json_value
+    return ZLIB_MARKER + zlib.compress(json_value, COMPRESSION_LEVEL)
+
+
+def decompress_json(payload):
+    payload = bytes(payload)
+    marker, json_value = payload[:1], payload[1:]
+    if marker == ZLIB_MARKER:
+        return orjson.loads(zlib.decompress(json_value))
+    if marker == RAW_MARKER:
+        return orjson.loads(json_value)
+    raise ValueError(f"Unknown compressed JSON marker {marker!r}")
+
+
+def rewrite_blobs(from_type, to_type, convert):
+    '''
+        Swap the blob columns for columns of `to_type`, filled by batches with `convert(blob)`
+    '''
+    for column in BLOB_COLUMNS:
+        op.add_column('service', sa.Column(f'{column}_new', to_type, nullable=True))
+
+    connection = op.get_bind()
+    service = sa.table(
+        'service',
+        sa.column('id', sa.Integer),
+        *(sa.column(column, from_type) for column in BLOB_COLUMNS),
+        *(sa.column(f'{column}_new', to_type) for column in BLOB_COLUMNS),
+    )
+    select_batch = (
+        sa.select(service.c.id, *(service.c[column] for column in BLOB_COLUMNS))
+        .where(service.c.id > sa.bindparam('last_id'))
+        .order_by(service.c.id)
+        .limit(BATCH_SIZE)
+    )
+    update_row = (
+        service.update()
+        .where(service.c.id == sa.bindparam('service_id'))
+        .values({f'{column}_new': sa.bindparam(f'{column}_value') for column in BLOB_COLUMNS})
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(select_batch, {'last_id': last_id}).all()
+        if not rows:
+            break
+        connection.execute(update_row, [
+            {
+                'service_id': row.id,
+                **{
+                    f'{column}_value': None if row[column] is None else convert(row[column])
+                    for column in BLOB_COLUMNS
+                },
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+    for column in BLOB_COLUMNS:
+        op.drop_column('service', column)
+        op.alter_column('service', f'{column}_new', new_column_name=column)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_service_all_products_list_by_name', table_name='service', postgresql_using='gin')
+    # ### end Alembic commands ###
+    # The blobs are compressed in Python, see project.models.types.CompressedJSON
+    rewrite_blobs(from_type=postgresql.JSONB(), to_type=sa.LargeBinary(), convert=compress_json)
+
+
+def downgrade():
+    rewrite_blobs(from_type=sa.LargeBinary(), to_type=postgresql.JSONB(), convert=decompress_json)
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_index('ix_service_all_products_list_by_name', 'service', ['all_products_list_by_name'],
+                    unique=False, postgresql_using='gin')
+    # ### end Alembic commands ###
@@ -0,0 +1,102 @@
+"""_12_partition_service_by_month
+
+Revision ID: 9587ebd15d35
+Revises: 72e834d7303b
+Create Date: 2026-10-19 13:42:40.899801
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9587ebd15d35'
+down_revision = '72e834d7303b'
+branch_labels = None
+depends_on = None
+
+
+# Partitions are created up to this many months after the current one, then by `flask partitions create`
+MONTHS_AHEAD = 3
+SERVICE_INDEXES = {
+    'ix_service_date_id': ['date', 'id'],
+    'ix_service_company_date_id': ['company', 'date', 'id'],
+}
+
+
+# Helpers of utils.partitions at this revision, copied so that later changes of it do not change this migration.
+# They are created on the new empty table, before the rows are copied into it.
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, months):
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def create_default_partition(connection, table_name):
+    connection.execute(sa.text(f"CREATE TABLE IF NOT EXISTS {table_name}_default PARTITION OF {table_name} DEFAULT"))
+
+
+def create_month_partitions(connection, table_name, first_month, last_month):
+    month = month_start(first_month)
+    while month <= last_month:
+        next_month = add_months(month, 1)
+        # Bounds are inlined, DDL statements take no parameters
+        connection.execute(sa.text(
+            f"CREATE TABLE {table_name}_y{month.year:04}m{month.month:02} PARTITION OF {table_name} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        ))
+        month = next_month
+
+
+def copy_service_table(partitioned):
+    '''
+        Replace the service table by a copy of its rows, partitioned by month or not,
+        the id sequence is handed over to the new table
+    '''
+    op.execute("ALTER TABLE service RENAME TO service_previous")
+    op.execute(
+        "CREATE TABLE service (LIKE service_previous INCLUDING DEFAULTS)"
+        + (" PARTITION BY RANGE (date)" if partitioned else "")
+    )
+    op.execute("ALTER SEQUENCE service_id_seq OWNED BY service.id")
+
+    if partitioned:
+        connection = op.get_bind()
+        first_service_date = connection.execute(sa.text("SELECT MIN(date)::date FROM service_previous")).scalar()
+        create_default_partition(connection, 'service')
+        create_month_partitions(
+            connection,
+            table_name='service',
+            first_month=month_start(first_service_date or date.today()),
+            last_month=add_months(month_start(date.today()), MONTHS_AHEAD),
+        )
+
+    op.execute("INSERT INTO service SELECT * FROM service_previous")
+    op.execute("DROP TABLE service_previous")
+
+    # Partitioned tables can only be unique on columns including the partition key
+    op.create_primary_key('service_pkey', 'service', ['id', 'date'] if partitioned else ['id'])
+    for index_name, columns in SERVICE_INDEXES.items():
+        op.create_index(index_name, 'service', columns, unique=False)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_constraint('product_total_service_id_fkey', 'product_total', type_='foreignkey')
+    op.drop_constraint('sales_line_service_id_fkey', 'sales_line', type_='foreignkey')
+    # ### end Alembic commands ###
+    copy_service_table(partitioned=True)
+
+
+def downgrade():
+    copy_service_table(partitioned=False)
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_foreign_key('sales_line_service_id_fkey', 'sales_line', 'service', ['service_id'], ['id'],
+                          ondelete='CASCADE')
+    op.create_foreign_key('product_total_service_id_fkey', 'product_total', 'service', ['service_id'], ['id'],
+                          ondelete='CASCADE')
+    # ### end Alembic commands ###
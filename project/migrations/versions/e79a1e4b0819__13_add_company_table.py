@@ -0,0 +1,118 @@
+"""_13_add_company_table
+
+Revision ID: e79a1e4b0819
+Revises: 9587ebd15d35
+Create Date: 2026-10-19 13:48:35.891132
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e79a1e4b0819'
+down_revision = '9587ebd15d35'
+branch_labels = None
+depends_on = None
+
+
+# Company of the products synced from L'addition before products had a company,
+# and of the users and services saved without a company
+PRODUCTS_COMPANY = 'La Petite Halle'
+COMPANY_TABLES = ('user', 'service', 'revenue_rollup')
+
+
+def upgrade():
+    op.create_table('company',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=30), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.execute(
+        f"""
+        INSERT INTO company (name)
+        SELECT company FROM "user" WHERE company IS NOT NULL
+        UNION SELECT company FROM service WHERE company IS NOT NULL
+        UNION SELECT company FROM revenue_rollup
+        UNION SELECT '{PRODUCTS_COMPANY}' WHERE EXISTS (SELECT 1 FROM product)
+            OR EXISTS (SELECT 1 FROM "user" WHERE company IS NULL)
+            OR EXISTS (SELECT 1 FROM service WHERE company IS NULL)
+        """
+    )
+
+    for table_name in COMPANY_TABLES:
+        op.add_column(table_name, sa.Column('company_id', sa.Integer(), nullable=True))
+        op.execute(
+            f'UPDATE "{table_name}" SET company_id = company.id FROM company WHERE "{table_name}".company = company.name'
+        )
+        op.execute(
+            f'UPDATE "{table_name}" SET company_id = (SELECT id FROM company WHERE name = \'{PRODUCTS_COMPANY}\') '
+            'WHERE company_id IS NULL'
+        )
+    op.add_column('product', sa.Column('company_id', sa.Integer(), nullable=True))
+    op.execute(f"UPDATE product SET company_id = (SELECT id FROM company WHERE name = '{PRODUCTS_COMPANY}')")
+
+    op.drop_constraint('revenue_rollup_pkey', 'revenue_rollup', type_='primary')
+    op.drop_index('ix_service_company_date_id', table_name='service')
+    op.drop_index('ix_service_date_id', table_name='service')
+    op.drop_constraint('uniq_id_product', 'product', type_='unique')
+    for table_name in (*COMPANY_TABLES, 'product'):
+        op.alter_column(table_name, 'company_id', existing_type=sa.Integer(), nullable=False)
+        op.create_foreign_key(f'{table_name}_company_id_fkey', table_name, 'company', ['company_id'], ['id'])
+    for table_name in COMPANY_TABLES:
+        op.drop_column(table_name, 'company')
+
+    op.create_primary_key('revenue_rollup_pkey', 'revenue_rollup', ['company_id', 'period', 'period_start'])
+    op.create_index('ix_service_company_id_date_id', 'service', ['company_id', 'date', 'id'], unique=False)
+    op.create_index('ix_user_company_id', 'user', ['company_id'], unique=False)
+    op.create_index('ix_product_company_id_uniq_id_product', 'product', ['company_id', 'uniq_id_product'], unique=True)
+
+    # Services without a company had no rollups (see revision 18c4a8b20fdd),
+    # the rollups of the company they now belong to are rebuilt from all its services
+    op.execute(
+        f"""
+        DELETE FROM revenue_rollup WHERE company_id = (SELECT id FROM company WHERE name = '{PRODUCTS_COMPANY}')
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO revenue_rollup (company_id, period, period_start, services_count, "CA", solid, liquid, majoration)
+        SELECT
+            service.company_id,
+            rollup_periods.period,
+            date_trunc(rollup_periods.period, service.date)::date,
+            COUNT(*),
+            COALESCE(SUM(service."CA"), 0),
+            COALESCE(SUM(service.solid), 0),
+            COALESCE(SUM(service.liquid), 0),
+            COALESCE(SUM(service.majoration), 0)
+        FROM service
+        CROSS JOIN (VALUES ('day'), ('week'), ('month')) AS rollup_periods(period)
+        WHERE service.company_id = (SELECT id FROM company WHERE name = '{PRODUCTS_COMPANY}')
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade():
+    op.drop_index('ix_product_company_id_uniq_id_product', table_name='product')
+    op.drop_index('ix_user_company_id', table_name='user')
+    op.drop_index('ix_service_company_id_date_id', table_name='service')
+    op.drop_constraint('revenue_rollup_pkey', 'revenue_rollup', type_='primary')
+
+    for table_name in COMPANY_TABLES:
+        op.add_column(table_name, sa.Column('company', sa.VARCHAR(length=30), nullable=True))
+        op.execute(
+            f'UPDATE "{table_name}" SET company = company.name FROM company WHERE "{table_name}".company_id = company.id'
+        )
+    for table_name in (*COMPANY_TABLES, 'product'):
+        op.drop_constraint(f'{table_name}_company_id_fkey', table_name, type_='foreignkey')
+        op.drop_column(table_name, 'company_id')
+    op.alter_column('revenue_rollup', 'company', existing_type=sa.VARCHAR(length=30), nullable=False)
+
+    # Products of several companies may share their L'addition id, the constraint fails on such rows
+    op.create_unique_constraint('uniq_id_product', 'product', ['uniq_id_product'])
+    op.create_primary_key('revenue_rollup_pkey', 'revenue_rollup', ['company', 'period', 'period_start'])
+    op.create_index('ix_service_date_id', 'service', ['date', 'id'], unique=False)
+    op.create_index('ix_service_company_date_id', 'service', ['company', 'date', 'id'], unique=False)
+    op.drop_table('company')
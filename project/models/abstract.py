@@ -1,7 +1,68 @@
 import json
-from typing import Any, Dict, Optional, Set
+from typing import Any, Callable, Dict, Optional, Set, Tuple, Type
+from sqlalchemy import inspect
+from sqlalchemy.types import Date, DateTime, Time
 from utils.errors.http_errors import SerializationError
 
+FieldEncoder = Optional[Callable[[Any], Any]]
+
+
+class SerializationPlan():
+    """
+        How to serialize the instances of a model class, built once per class.
+        Mapped classes read their mapper columns, each with the encoder of its type:
+        dates are written as their str(), floats and JSON(B) values are left to json as they are.
+        Other classes (eg: plain SerializableModel) serialize the public fields of each instance.
+        Any value json cannot write is written as its str().
+    """
+
+    def __init__(self, model_class: Type["SerializableModel"]) -> None:
+        self.model_class = model_class
+        self.fields: Optional[Tuple[Tuple[str, FieldEncoder], ...]] = None
+
+        mapper = inspect(model_class, raiseerr=False)
+        if mapper is not None:
+            self.fields = tuple(
+                (column_property.key, self._column_encoder(column_property.columns[0].type))
+                for column_property in mapper.column_attrs
+                if model_class._assert_serializable(column_property.key)
+            )
+        self.encoder = json.JSONEncoder(default=self._encode_default)
+
+    @staticmethod
+    def _column_encoder(column_type: Any) -> FieldEncoder:
+        if isinstance(column_type, (Date, DateTime, Time)):
+            return str
+        return None
+
+    def _encode_default(self, to_serialize: Any) -> Any:
+        try:
+            return str(to_serialize)
+        except Exception:
+            raise SerializationError(
+                "Error serializing a model to JSON",
+                extra={
+                    "model_name": self.model_class.__name__,
+                }
+            )
+
+    def to_dict(self, instance: "SerializableModel") -> Dict[str, Any]:
+        # Only the loaded columns are in the instance dict, the others are left unloaded
+        instance_dict = vars(instance)
+        if self.fields is None:
+            return {
+                field: value
+                for field, value in instance_dict.items()
+                if self.model_class._assert_serializable(field)
+            }
+
+        dict_instance: Dict[str, Any] = {}
+        for field, encode in self.fields:
+            if field in instance_dict:
+                value = instance_dict[field]
+                dict_instance[field] = value if encode is None or value is None else encode(value)
+        return dict_instance
+
 
 class SerializableModel():
     """
@@ -15,20 +76,23 @@ class SerializableModel():
         for field, value in kwargs.items():
             setattr(self, field, value)
 
+    @classmethod
+    def serialization_plan(cls) -> SerializationPlan:
+        # Stored on the class itself, subclasses get their own plan
+        plan = cls.__dict__.get('_serialization_plan')
+        if plan is None:
+            plan = SerializationPlan(cls)
+            setattr(cls, '_serialization_plan', plan)
+        return plan
+
     def serialize(self, *args, **kwargs) -> str:
         '''
             Return a serialized version of the model instance.
             Provide args to store in a list called args_list
             Provide kwargs to store as key: value
         '''
-        dict_self: Dict[str, Any] = {}
-
-        for field, value in vars(self).items():
-            if self._assert_serializable(field):
-                dict_self.setdefault(
-                    field,
-                    self._to_json_serializable(value),
-                )
+        plan = self.serialization_plan()
+        dict_self = plan.to_dict(self)
 
         if len(kwargs) > 0:
             dict_self.update(kwargs)
@@ -36,35 +100,17 @@ class SerializableModel():
         if len(args) > 0:
             dict_self["args_list"] = list(args)
 
-        json_self = json.dumps(dict_self)
-
-        return json_self
+        try:
+            return plan.encoder.encode(dict_self)
+        except SerializationError as exc:
+            exc.extra = {**exc.extra, "model_id": self.id}
+            raise
 
-    def _assert_serializable(self, field_name: str) -> bool:
-        if field_name in self.non_serializable_fields:
+    @classmethod
+    def _assert_serializable(cls, field_name: str) -> bool:
+        if field_name in cls.non_serializable_fields:
             return False
         if field_name.startswith("_"):
             return False
 
         return True
-
-    def _to_json_serializable(self, to_serialize: Any) -> Any:
-        failed_to_serialize = False
-        try:
-            json.dumps(to_serialize)
-        except (ValueError, TypeError):
-            failed_to_serialize = True
-
-        if failed_to_serialize:
-            try:
-                return str(to_serialize)
-            except Exception as exc:
-                raise SerializationError(
-                    "Error serializing a model to JSON",
-                    extra={
-                        "model_name": type(self).__name__,
-                        "model_id": self.id,
-                    }
-                )
-        else:
-            return to_serialize
@@ -1,5 +1,6 @@
 from flask_login import UserMixin
 from project.settings import DB_ORM as db
+from project.models.company import Company
 
 
 class User(UserMixin, db.Model):
@@ -7,5 +8,7 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(100), unique=True)
     password = db.Column(db.String(100))
     name = db.Column(db.String(20))
-    company = db.Column(db.String(30))
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=False, index=True)
+    # Loaded along the user, every page is scoped to their company
+    company = db.relationship(Company, lazy='joined')
     super_user = db.Column(db.Boolean, default=False)
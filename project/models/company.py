@@ -0,0 +1,24 @@
+from project.settings import DB_ORM as db
+
+
+class Company(db.Model):
+    '''
+        A venue sharing the app, every user, service and product belongs to one.
+    '''
+    id = db.Column(db.Integer, primary_key=True)
+    name: str = db.Column(db.String(30), nullable=False, unique=True)
+
+    @classmethod
+    def get_or_create(cls, name: str) -> "Company":
+        '''
+            Company of that name, added to the session if missing. Commit is left to the caller.
+        '''
+        company = cls.query.filter_by(name=name).first()
+        if company is None:
+            company = cls(name=name)
+            db.session.add(company)
+        return company
+
+    @property
+    def id_str(self):
+        return f"<Company: {self.id} - {self.name}>"
@@ -0,0 +1,19 @@
+from typing import Any, Dict
+from datetime import date as date_type
+from sqlalchemy.dialects.postgresql import JSONB
+from project.settings import DB_ORM as db
+
+
+class Concert(db.Model):
+    '''
+        Local index of the Sowprog agenda, one row per scheduled date.
+        Filled by `flask concerts import` and read before calling the Sowprog API.
+    '''
+    id = db.Column(db.Integer, primary_key=True)
+    date: date_type = db.Column(db.Date, nullable=False, unique=True, index=True)
+    name: str = db.Column(db.Text, nullable=False)
+    infos: Dict[str, Any] = db.Column(JSONB, nullable=False)
+
+    @property
+    def id_str(self):
+        return f"<Concert: {self.date} - {self.name}>"
@@ -7,9 +7,9 @@ class Product(db.Model):
         GET ALL PRODUCT IN MENU
     '''
     id = db.Column(db.Integer, primary_key=True)
-    # company: str = db.Column(db.String(30))
-    # ADD COMPANY ID AND COMPANY TABLE
-    uniq_id_product = db.Column(db.Text, unique=True, nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=False)
+    # L'Addition id, unique in the menu of a company
+    uniq_id_product = db.Column(db.Text, nullable=False)
     product_name = db.Column(db.Text)
     product_price = db.Column(db.Float)
     id_product_type = db.Column(db.Integer)
@@ -23,6 +23,10 @@ class Product(db.Model):
     visible = db.Column(db.Boolean, nullable=False)
     removed = db.Column(db.Boolean, nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_product_company_id_uniq_id_product', 'company_id', 'uniq_id_product', unique=True),
+    )
+
     @property
     def id_str(self):
         return f"<PRODUCT --> id : {self.uniq_id_product} - name : {self.product_name}>"
@@ -0,0 +1,24 @@
+from datetime import date as date_type
+from project.settings import DB_ORM as db
+
+# Values of RevenueRollup.period, they are valid `date_trunc` fields and interval units
+ROLLUP_PERIODS = ('day', 'week', 'month')
+
+
+class RevenueRollup(db.Model):
+    '''
+        Totals of the services of a company over a day, a week or a month.
+        Rows are refreshed each time a service of the period is added, edited or deleted.
+    '''
+    company_id: int = db.Column(db.Integer, db.ForeignKey('company.id'), primary_key=True)
+    period: str = db.Column(db.String(5), primary_key=True)
+    period_start: date_type = db.Column(db.Date, primary_key=True)
+    services_count: int = db.Column(db.Integer, nullable=False)
+    CA: float = db.Column(db.Float, nullable=False)
+    solid: float = db.Column(db.Float, nullable=False)
+    liquid: float = db.Column(db.Float, nullable=False)
+    majoration: float = db.Column(db.Float, nullable=False)
+
+    @property
+    def id_str(self):
+        return f"<RevenueRollup: {self.company_id} - {self.period} {self.period_start}>"
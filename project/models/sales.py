@@ -0,0 +1,50 @@
+from datetime import datetime
+from project.settings import DB_ORM as db
+
+
+class SalesLine(db.Model):
+    '''
+        One row per product sold during a service (a line of a L'Addition sales document).
+    '''
+    id = db.Column(db.Integer, primary_key=True)
+    # No foreign key, the partitioned service table is only unique on (id, date).
+    # Deleted with their service, see project.ingestion.delete_service_sales
+    service_id: int = db.Column(db.Integer, nullable=False)
+    timestamp: datetime = db.Column(db.DateTime, nullable=False)
+    uniq_id_product: str = db.Column(db.Text)
+    product_name: str = db.Column(db.Text, nullable=False)
+    amount: float = db.Column(db.Float, nullable=False)
+    category: str = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('ix_sales_line_service_id_timestamp', 'service_id', 'timestamp'),
+        db.Index('ix_sales_line_uniq_id_product_timestamp', 'uniq_id_product', 'timestamp'),
+    )
+
+    @property
+    def id_str(self):
+        return f"<SalesLine: {self.id} - service {self.service_id} - {self.product_name}>"
+
+
+class ProductTotal(db.Model):
+    '''
+        Sales of a product over a whole service, computed once at ingestion from the sales lines.
+    '''
+    id = db.Column(db.Integer, primary_key=True)
+    # No foreign key, the partitioned service table is only unique on (id, date).
+    # Deleted with their service, see project.ingestion.delete_service_sales
+    service_id: int = db.Column(db.Integer, nullable=False)
+    product_name: str = db.Column(db.Text, nullable=False)
+    sales_count: int = db.Column(db.Integer, nullable=False)
+    revenue: float = db.Column(db.Float, nullable=False)
+    first_sale_at: datetime = db.Column(db.DateTime, nullable=False)
+    last_sale_at: datetime = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_product_total_service_id_product_name', 'service_id', 'product_name', unique=True),
+        db.Index('ix_product_total_product_name_revenue', 'product_name', 'revenue'),
+    )
+
+    @property
+    def id_str(self):
+        return f"<ProductTotal: service {self.service_id} - {self.product_name}>"
@@ -1,9 +1,15 @@
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 from datetime import date as date_type
+from sqlalchemy import DDL, event
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.interfaces import LoaderOption
 from project.settings import DB_ORM as db
 from project.models.abstract import SerializableModel
+from project.models.company import Company
+from project.models.types import CompressedJSON
+from utils.partitions import default_partition_name
 
 
 class Service(db.Model, SerializableModel):
@@ -16,28 +22,78 @@ class Service(db.Model, SerializableModel):
                     - CA is french nomenclature
                     - Concert is also french
     '''
-    id = db.Column(db.Integer, primary_key=True)
-    company: str = db.Column(db.String(30))
-    # ADD COMPANY ID AND COMPANY TABLE
-    date: date_type = db.Column(db.DateTime, nullable=False)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    company_id: int = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=False)
+    company = db.relationship(Company)
+    # Partition key, part of the table primary key as Postgres requires
+    date: date_type = db.Column(db.DateTime, primary_key=True)
     CA: float = db.Column(db.Float)
     solid: float = db.Column(db.Float)
     liquid: float = db.Column(db.Float)
     majoration: float = db.Column(db.Float)
-    graph_url: str = db.Column(db.Text)
     top_liquids = db.Column(JSONB)
-    all_products_list_by_name = db.Column(JSONB)
-    all_products_timeline = db.Column(JSONB)
+    # Multi-kilobyte blobs, stored compressed and only loaded (together) when one of them is accessed
+    all_products_list_by_name = db.deferred(db.Column(CompressedJSON), group='products')
+    all_products_timeline = db.deferred(db.Column(CompressedJSON), group='products')
     concert: str = db.Column(db.Text)
     concert_infos = db.Column(JSONB)
+    # utils.timeline.TimelineIndex of all_products_timeline, built at ingestion
+    timeline_index: bytes = db.deferred(db.Column(db.LargeBinary))
+    # utils.timeline.TimeBuckets, revenue by 15 minutes built at ingestion for the sales charts
+    time_buckets: bytes = db.deferred(db.Column(db.LargeBinary))
+    # Bumped by each update, keys the cached service pages
+    version: int = db.Column(db.Integer, nullable=False, server_default='1')
+
+    __table_args__ = (
+        # Services of a company over a date range, in the keyset pagination order (see utils.pagination)
+        db.Index('ix_service_company_id_date_id', 'company_id', 'date', 'id'),
+        # One partition per month, see utils.partitions and `flask partitions`
+        {'postgresql_partition_by': 'RANGE (date)'},
+    )
+
+    # Columns read by each view, see `Service.load_profile`
+    load_profiles: Dict[str, Tuple[str, ...]] = {
+        'list': ('id', 'company_id', 'date', 'CA', 'solid', 'liquid', 'majoration', 'concert'),
+        'graph': ('id', 'company_id', 'date', 'CA', 'liquid', 'top_liquids', 'time_buckets'),
+        'concert': ('id', 'company_id', 'date', 'concert_infos'),
+        'service': (
+            'id', 'company_id', 'date', 'CA', 'solid', 'liquid', 'majoration', 'top_liquids',
+            'all_products_list_by_name', 'all_products_timeline', 'concert', 'concert_infos',
+        ),
+    }
+
+    __mapper_args__ = {
+        'version_id_col': version,
+        # Services are still identified by their id alone
+        'primary_key': [id],
+    }
 
     non_serializable_fields = {
+        'company',
         'top_liquids',
         'all_products_list_by_name',
         'all_products_timeline',
         'concert_infos',
+        'timeline_index',
+        'time_buckets',
     }
 
+    @classmethod
+    def load_profile(cls, view_name: str) -> LoaderOption:
+        '''
+            Query option loading only the columns of a view, other columns are loaded on access
+            eg: Service.query.options(Service.load_profile('list'))
+        '''
+        return load_only(*cls.load_profiles[view_name])
+
     @property
     def id_str(self):
         return f"<Service: {self.id} - {self.date}>"
+
+
+# Services out of every monthly partition are stored in the default partition
+event.listen(
+    Service.__table__,
+    'after_create',
+    DDL(f"CREATE TABLE {default_partition_name('service')} PARTITION OF service DEFAULT"),
+)
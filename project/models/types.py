@@ -0,0 +1,29 @@
+from typing import Any, Optional
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+from utils.compression import COMPRESSION_LEVEL, COMPRESSION_THRESHOLD, compress_json, decompress_json
+
+
+class CompressedJSON(TypeDecorator):
+    '''
+        JSON value stored as bytes, zlib compressed once its JSON is `threshold` bytes or more.
+        Its content cannot be queried by the DB, keep it for blobs only read by the app,
+        and defer the column so it is only fetched and decompressed when accessed.
+    '''
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, threshold: int = COMPRESSION_THRESHOLD, level: int = COMPRESSION_LEVEL) -> None:
+        super().__init__()
+        self.threshold = threshold
+        self.level = level
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return compress_json(value, threshold=self.threshold, level=self.level)
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Any:
+        if value is None:
+            return None
+        return decompress_json(value)
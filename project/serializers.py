@@ -0,0 +1,114 @@
+# serializers.py
+
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import orjson
+
+from utils.cache import LRUCache
+
+# Plans of the selections of fields kept by each serializer
+SERIALIZER_PLANS_CACHE_SIZE = 64
+
+
+class ModelSerializer():
+    """
+        JSON serializer of a model, compiled once per selection of fields:
+        the fields are read by a single attrgetter, the values are encoded by orjson
+        which handles dates, floats and JSONB dicts natively.
+    """
+
+    def __init__(self, fields: Sequence[str], default_fields: Optional[Sequence[str]] = None) -> None:
+        self.fields = tuple(fields)
+        self.default_fields = tuple(default_fields or fields)
+        self._plans = LRUCache(maxsize=SERIALIZER_PLANS_CACHE_SIZE)
+
+    def select_fields(self, requested_fields: Optional[str] = None) -> Tuple[str, ...]:
+        '''
+            Fields of a comma separated selection, eg: "id,date,CA", the default fields if empty.
+            The selected fields are returned once each, in the declared order of the fields.
+            Raises ValueError on an unknown field.
+        '''
+        if not requested_fields:
+            return self.default_fields
+
+        requested = {field.strip() for field in requested_fields.split(",") if field.strip()}
+        unknown_fields = sorted(requested.difference(self.fields))
+        if unknown_fields or not requested:
+            raise ValueError(f"Unknown fields {unknown_fields}, expected some of {list(self.fields)}")
+        return tuple(field for field in self.fields if field in requested)
+
+    def _plan(self, fields: Tuple[str, ...]) -> Callable[[Any], Dict[str, Any]]:
+        plan = self._plans.get(fields)
+        if plan is None:
+            get_values = attrgetter(*fields)
+            if len(fields) == 1:
+                [field] = fields
+                plan = lambda instance: {field: get_values(instance)}  # noqa: E731
+            else:
+                plan = lambda instance: dict(zip(fields, get_values(instance)))  # noqa: E731
+            self._plans.set(fields, plan)
+        return plan
+
+    def to_dict(self, instance: Any, fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        return self._plan(fields or self.default_fields)(instance)
+
+    def to_dicts(self, instances: Iterable[Any], fields: Optional[Tuple[str, ...]] = None) -> List[Dict[str, Any]]:
+        plan = self._plan(fields or self.default_fields)
+        return [plan(instance) for instance in instances]
+
+    def iter_json_chunks(
+        self,
+        batches: Iterable[Iterable[Any]],
+        fields: Optional[Tuple[str, ...]] = None,
+        ndjson: bool = False,
+    ) -> Iterator[bytes]:
+        '''
+            Batches of instances (eg: the partitions of a query result) as a JSON array,
+            or as one JSON object per line if `ndjson`. Each batch is encoded into one chunk, so a query can be streamed.
+        '''
+        plan = self._plan(fields or self.default_fields)
+        if ndjson:
+            for batch in batches:
+                yield b"".join(
+                    orjson.dumps(plan(instance), option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+                    for instance in batch
+                )
+            return
+
+        opening = b"["
+        for batch in batches:
+            encoded_batch = self.dumps([plan(instance) for instance in batch])
+            # Without the brackets of the batch, the chunks make a single array
+            if len(encoded_batch) > 2:
+                yield opening + encoded_batch[1:-1]
+                opening = b","
+        yield b"[]" if opening == b"[" else b"]"
+
+    @staticmethod
+    def dumps(payload: Any) -> bytes:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+
+
+SERVICE_SERIALIZER = ModelSerializer(
+    fields=(
+        'id',
+        'company_id',
+        'date',
+        'version',
+        'CA',
+        'solid',
+        'liquid',
+        'majoration',
+        'top_liquids',
+        'all_products_list_by_name',
+        'all_products_timeline',
+        'concert',
+        'concert_infos',
+    ),
+    default_fields=('id', 'company_id', 'date', 'version', 'CA', 'solid', 'liquid', 'majoration', 'concert'),
+)
+
+SERVICE_CONCERT_SERIALIZER = ModelSerializer(
+    fields=('id', 'company_id', 'date', 'concert', 'concert_infos'),
+)
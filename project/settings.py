@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from flask_sqlalchemy import SQLAlchemy
 
@@ -26,3 +27,23 @@ SOWPROG_PASSWORD = os.getenv("SOWPROG_PASSWORD")
 
 LADDITION_AUTH_TOKEN = os.getenv("LADDITION_AUTHORIZATION_TOKEN")
 LADDITION_CUSTOMER_ID = os.getenv("LADDITION_CUSTOMER_ID")
+
+# Cache of the service detail pages: 'memory' (per process) or 'filesystem' (shared by the workers of a host)
+SERVICE_PAGES_CACHE_BACKEND = os.getenv("SERVICE_PAGES_CACHE_BACKEND", "memory")
+SERVICE_PAGES_CACHE_DIR = os.getenv(
+    "SERVICE_PAGES_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "cultplace_service_pages"),
+)
+SERVICE_PAGES_CACHE_SIZE = int(os.getenv("SERVICE_PAGES_CACHE_SIZE", "1024"))
+
+# Cache of the rendered charts, keyed by the digest of their arguments
+CHARTS_CACHE_BACKEND = os.getenv("CHARTS_CACHE_BACKEND", "memory")
+CHARTS_CACHE_DIR = os.getenv(
+    "CHARTS_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "cultplace_charts"),
+)
+CHARTS_CACHE_SIZE = int(os.getenv("CHARTS_CACHE_SIZE", "512"))
+
+# Users of the authenticated requests, kept in each process for at most USERS_CACHE_TTL seconds
+USERS_CACHE_SIZE = int(os.getenv("USERS_CACHE_SIZE", "1024"))
+USERS_CACHE_TTL = int(os.getenv("USERS_CACHE_TTL", "60"))
@@ -1,16 +1,19 @@
 # synchers.py
 
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from typing import Any, Collection, Dict, List, Mapping, Optional, Set, Tuple, Union
 
 import requests
-from requests import HTTPError
+from requests import HTTPError, RequestException
 from requests.auth import HTTPBasicAuth
 from requests.structures import CaseInsensitiveDict
 from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import insert
 from werkzeug.exceptions import Conflict, HTTPException, NotFound
 
+from project.models.concert import Concert
 from project.models.product import Product
 from project.settings import (
     APP_NAME,
@@ -20,11 +23,24 @@ from project.settings import (
     SOWPROG_EMAIL_CREDENTIAL,
     SOWPROG_PASSWORD
 )
+from utils.logs import LazyLogValue
 
 SOWPROG_URL = "https://agenda.sowprog.com/rest/v1_2/scheduledEventsSplitByDate/search?"
+# Sowprog answers one date per request, keep the number of requests in flight bounded
+SOWPROG_IMPORT_MAX_WORKERS = 8
 
 logger = logging.getLogger(APP_NAME)
 
+# Concert infos of the services without a concert
+NO_CONCERT_NAME = 'Sans concert'
+NO_CONCERT_INFOS = {
+    'title': NO_CONCERT_NAME,
+    'facebook': '#',
+    'style': '',
+    'free': 'true',
+    'picture': '#',
+}
+
 # --------------- #
 # CONCERT SYNCHER #
 # --------------- #
@@ -90,13 +106,7 @@ def unpack_and_check_sowprog_data(sowprog_raw_data: Mapping[str, Any]) -> Tuple[
         return concert_name, concert_infos, None
     else:
         # default without concert infos
-        concert_infos = {
-            'title': 'Sans concert',
-            'facebook': '#',
-            'style': '',
-            'free': 'true',
-            'picture': '#',
-        }
+        concert_infos = dict(NO_CONCERT_INFOS)
         if sowprog_infos is None:
             concert_name = 'Error with API'
             return concert_name, concert_infos, NotFound(
@@ -114,7 +124,7 @@ def unpack_and_check_sowprog_data(sowprog_raw_data: Mapping[str, Any]) -> Tuple[
                 description="Too many data from SowProgAPI"
             )
         else:
-            concert_name = 'Sans concert'
+            concert_name = NO_CONCERT_NAME
             return concert_name, concert_infos, None
 
 
@@ -123,8 +133,106 @@ def sowprog_syncher(date_to_search: datetime) -> Tuple[
         Dict[str, Any],  # concert_infos
         Optional[HTTPException]  # error
 ]:
+    """
+    Read the concert of the day from the local index, fallback on Sowprog API (and index its answer).
+    """
+    indexed_concert = Concert.query.filter_by(date=date_to_search.date()).first()
+    if indexed_concert is not None:
+        return indexed_concert.name, indexed_concert.infos, None
+
     sowprog_raw_data = get_concert_infos_from_sowprog_api_with_date(date_to_search)
-    return unpack_and_check_sowprog_data(sowprog_raw_data)
+    concert_name, concert_infos, error = unpack_and_check_sowprog_data(sowprog_raw_data)
+
+    if error is None:
+        save_concerts_to_index(
+            concerts_by_date={date_to_search.date(): (concert_name, concert_infos)}
+        )
+        DB_ORM.session.commit()
+
+    return concert_name, concert_infos, error
+
+
+def import_sowprog_season(
+    start_date: date,
+    end_date: date,
+    max_workers: int = SOWPROG_IMPORT_MAX_WORKERS,
+) -> Tuple[
+        List[date],  # imported dates
+        Dict[date, str],  # failed dates with the reason
+]:
+    """
+    Fetch every date between start_date and end_date (included) from Sowprog API,
+    with at most max_workers requests in flight, and write them into the local concert index.
+    """
+    dates_to_import = [
+        start_date + timedelta(days=day_index)
+        for day_index in range((end_date - start_date).days + 1)
+    ]
+
+    def fetch_date(date_to_import: date) -> Union[Mapping[str, Any], RequestException]:
+        try:
+            return get_concert_infos_from_sowprog_api_with_date(
+                datetime.combine(date_to_import, datetime.min.time())
+            )
+        except RequestException as exc:
+            return exc
+
+    # Only network calls are run in threads, the DB session stays on the calling thread
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        sowprog_responses = executor.map(fetch_date, dates_to_import)
+
+        concerts_by_date: Dict[date, Tuple[str, Dict[str, Any]]] = {}
+        failed_dates: Dict[date, str] = {}
+        for date_to_import, sowprog_raw_data in zip(dates_to_import, sowprog_responses):
+            if isinstance(sowprog_raw_data, RequestException):
+                failed_dates[date_to_import] = str(sowprog_raw_data)
+                continue
+
+            concert_name, concert_infos, error = unpack_and_check_sowprog_data(sowprog_raw_data)
+            if error is not None:
+                failed_dates[date_to_import] = error.description
+                continue
+
+            concerts_by_date[date_to_import] = (concert_name, concert_infos)
+
+    save_concerts_to_index(concerts_by_date=concerts_by_date)
+    DB_ORM.session.commit()
+
+    logger.info(msg=f"Imported {len(concerts_by_date)} dates from Sowprog, {len(failed_dates)} failed")
+    logger.debug(
+        "Sowprog dates failed to import: %s",
+        LazyLogValue(lambda: {str(failed_date): reason for failed_date, reason in failed_dates.items()}),
+    )
+
+    return sorted(concerts_by_date.keys()), failed_dates
+
+
+def save_concerts_to_index(concerts_by_date: Mapping[date, Tuple[str, Dict[str, Any]]]) -> None:
+    """
+    Insert or update concerts of the local index, in one statement. Commit is left to the caller.
+    """
+    if len(concerts_by_date) == 0:
+        return
+
+    insert_statement = insert(Concert.__table__).values(
+        [
+            {
+                "date": concert_date,
+                "name": concert_name,
+                "infos": concert_infos,
+            }
+            for concert_date, (concert_name, concert_infos) in concerts_by_date.items()
+        ]
+    )
+    DB_ORM.session.execute(
+        insert_statement.on_conflict_do_update(
+            index_elements=[Concert.date],
+            set_={
+                "name": insert_statement.excluded.name,
+                "infos": insert_statement.excluded.infos,
+            },
+        )
+    )
 
 # --------------- #
 # PRODUCT SYNCHER #
@@ -139,15 +247,17 @@ class ProductSyncher:
     }
 
     @classmethod
-    def sync_products(cls) -> Tuple[
+    def sync_products(cls, company_id: int) -> Tuple[
         List[Product],  # Product added
         List[Product],  # Product updated
     ]:
         """
-        Grab remote data from laddition API, and create_or_update first party products.
+        Grab remote data from laddition API, and create_or_update first party products of a company.
         """
 
         new_products = cls.get_remote_products()
+        for product in new_products:
+            product.company_id = company_id
 
         new_products_third_party_ids = {
             product.uniq_id_product
@@ -155,7 +265,8 @@ class ProductSyncher:
         }
 
         existing_products = Product.query.filter(
-            Product.uniq_id_product.in_(new_products_third_party_ids)
+            Product.company_id == company_id,
+            Product.uniq_id_product.in_(new_products_third_party_ids),
         ).all()
 
         updated_products, remaining_products_to_create = cls.batch_update_products_from_products(
@@ -167,11 +278,10 @@ class ProductSyncher:
             products_to_save=remaining_products_to_create,
         )
 
-        logger.info(
-            msg=f"Created {len(remaining_products_to_create)} new products",
-            extra={
-                "created_product_ids": [product.id for product in remaining_products_to_create]
-            }
+        logger.info(msg=f"Created {len(remaining_products_to_create)} new products")
+        logger.debug(
+            "Ids of the created products: %s",
+            LazyLogValue(lambda: [product.id for product in remaining_products_to_create]),
         )
 
         return (
@@ -261,11 +371,10 @@ class ProductSyncher:
             products_to_save=products_to_update
         )
 
-        logger.info(
-            msg=f"Updated {len(products_to_update)} existing products",
-            extra={
-                "updated_product_ids": [product.id for product in products_to_update]
-            }
+        logger.info(msg=f"Updated {len(products_to_update)} existing products")
+        logger.debug(
+            "Ids of the updated products: %s",
+            LazyLogValue(lambda: [product.id for product in products_to_update]),
         )
 
         return (
@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+
+# Results are saved in .benchmarks/, compare two runs with: pipenv run pytest-benchmark compare 0001 0002
+pipenv run python -m pytest benchmarks --benchmark-autosave --benchmark-columns=min,median,mean,stddev,rounds "$@"
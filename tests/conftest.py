@@ -5,6 +5,7 @@ from flask import Flask
 from flask.testing import FlaskClient
 from project import app as app_factory
 from project.models.auth import User
+from project.models.company import Company
 from project.settings import DB_ORM
 from werkzeug.security import generate_password_hash
 from werkzeug.test import TestResponse
@@ -49,6 +50,11 @@ def app():
         # Create all the tables in the DB
         DB_ORM.create_all()
 
+        # Setup the companies of the users in the DB
+        test_company = Company(name=TEST_USER_CREDENTIALS['company'])
+        test_admin_company = Company(name=TEST_ADMIN_USER_CREDENTIALS['company'])
+        DB_ORM.session.add_all([test_company, test_admin_company])
+
         # Setup a user in the DB
         DB_ORM.session.add(
             User(
@@ -58,7 +64,7 @@ def app():
                     method='sha256'
                 ),
                 name=TEST_USER_CREDENTIALS['name'],
-                company=TEST_USER_CREDENTIALS['company'],
+                company=test_company,
                 super_user=TEST_USER_CREDENTIALS['super_user'],
             )
         )
@@ -71,7 +77,7 @@ def app():
                     method='sha256'
                 ),
                 name=TEST_ADMIN_USER_CREDENTIALS['name'],
-                company=TEST_ADMIN_USER_CREDENTIALS['company'],
+                company=test_admin_company,
                 super_user=TEST_ADMIN_USER_CREDENTIALS['super_user'],
             )
         )
@@ -88,6 +94,11 @@ def app():
     # clean up / reset resources here
 
 
+def get_company_id(company_name: str = TEST_USER_CREDENTIALS['company']) -> int:
+    # Needs an app context
+    return Company.query.filter_by(name=company_name).one().id
+
+
 @pytest.fixture(scope="session")
 def client(app: Flask):
     return app.test_client()
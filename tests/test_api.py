@@ -0,0 +1,88 @@
+from datetime import datetime
+
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from project.models.service import Service
+
+from .conftest import DB_ORM, TEST_USER_CREDENTIALS, AuthActions, get_company_id
+
+
+def test_get_api_services_success(app: Flask, client: FlaskClient, auth: AuthActions):
+    with app.app_context(), app.test_request_context():
+        services = [
+            Service(
+                company_id=get_company_id(),
+                date=datetime(2021, 8, day),
+                CA=10.5 * day,
+                concert="Sans concert",
+                concert_infos={'title': 'Sans concert', 'free': 'true'},
+                all_products_timeline={"2021-08-01 20:00:00": [5.5]},
+            )
+            for day in (1, 2)
+        ]
+        DB_ORM.session.add_all(services)
+        DB_ORM.session.commit()
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+
+        response = client.get(url_for(
+            "api.list_services",
+            start_date="2021-08-01",
+            end_date="2021-08-02",
+            fields="id,date,CA",
+        ))
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        assert response.get_json() == {
+            "services": [
+                {"id": services[1].id, "date": "2021-08-02T00:00:00", "CA": 21.0},
+                {"id": services[0].id, "date": "2021-08-01T00:00:00", "CA": 10.5},
+            ],
+            "prev_cursor": None,
+            "next_cursor": None,
+        }
+
+        response = client.get(url_for(
+            "api.get_service",
+            service_id=services[0].id,
+            fields="id,all_products_timeline",
+        ))
+
+        assert response.get_json() == {
+            "id": services[0].id,
+            "all_products_timeline": {"2021-08-01 20:00:00": [5.5]},
+        }
+
+        response = client.get(url_for("api.get_service_concert", service_id=services[0].id))
+
+        assert response.get_json() == {
+            "id": services[0].id,
+            "company_id": get_company_id(),
+            "date": "2021-08-01T00:00:00",
+            "concert": "Sans concert",
+            "concert_infos": {'title': 'Sans concert', 'free': 'true'},
+        }
+
+        for service in services:
+            DB_ORM.session.delete(service)
+        DB_ORM.session.commit()
+
+
+def test_get_api_services_error_unknown_field(app: Flask, client: FlaskClient, auth: AuthActions):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+
+        response = client.get(url_for("api.list_services", fields="id,timeline_index"))
+        assert response.status_code == 400
+
+        response = client.get(url_for("api.list_services", start_date="01/08/2021"))
+        assert response.status_code == 400
+
+        response = client.get(url_for("api.get_service", service_id=0))
+        assert response.status_code == 404
@@ -2,11 +2,16 @@ from unittest.mock import patch
 
 import pytest
 from flask import Flask, url_for
+from sqlalchemy import event
 from flask.testing import FlaskClient
 from project.auth import (
     EXISTING_USER_MESSAGE,
+    MISSING_SUPER_USER_SETTINGS_MESSAGE,
+    UNKNOWN_COMPANY_MESSAGE,
     NOT_IMPLEMENTED_ERROR_MESSAGE,
-    RETRY_MESSAGE
+    RETRY_MESSAGE,
+    USERS_CACHE,
+    load_user
 )
 from project.models.auth import User
 
@@ -21,6 +26,20 @@ def test_get_login(client: FlaskClient, app: Flask):
         assert response.status_code == 200
 
 
+@patch("project.auth.FLASK_ENV", "production")
+def test_get_login_error_missing_super_user_settings(client: FlaskClient, app: Flask, monkeypatch):
+    monkeypatch.setenv("SUPER_USER_EMAIL", "admin@email.fake")
+    monkeypatch.setenv("SUPER_USER_PASSWORD", "password")
+    monkeypatch.delenv("SUPER_USER_COMPANY", raising=False)
+    with app.app_context(), app.test_request_context():
+
+        response = client.get(url_for("auth.login"))
+
+        assert response.status_code == 400
+        assert MISSING_SUPER_USER_SETTINGS_MESSAGE.format("SUPER_USER_COMPANY") in response.get_data(as_text=True)
+        assert User.query.filter_by(email="admin@email.fake").first() is None
+
+
 def test_post_login_success(auth: AuthActions, app: Flask):
     with app.app_context(), app.test_request_context():
         response = auth.login(
@@ -96,7 +115,7 @@ def test_post_signup_success_production(
                 "email": "new_email@to_register.com",
                 "name": "New User",
                 "password": "new_password",
-                "company": "New Company",
+                "company": TEST_USER_CREDENTIALS['company'],
             }
         )
 
@@ -116,7 +135,7 @@ def test_post_signup_success_developement(
                 "email": "new_email@to_register.com",
                 "name": "New User",
                 "password": "new_password",
-                "company": "New Company",
+                "company": TEST_USER_CREDENTIALS['company'],
             },
             follow_redirects=True
         )
@@ -142,7 +161,7 @@ def test_post_signup_success_existing_user(
                 "email": "new_email@to_register.com",
                 "name": "New User",
                 "password": "new_password",
-                "company": "New Company",
+                "company": TEST_USER_CREDENTIALS['company'],
             }
         )
 
@@ -163,6 +182,28 @@ def test_post_signup_success_existing_user(
         assert EXISTING_USER_MESSAGE in response.get_data(as_text=True)
 
 
+@patch("project.auth.FLASK_ENV", "development")
+def test_post_signup_error_unknown_company(
+    app: Flask,
+    client: FlaskClient,
+):
+    with app.app_context(), app.test_request_context():
+        response = client.post(
+            url_for("auth.signup"),
+            data={
+                "email": "unknown_company@to_register.com",
+                "name": "New User",
+                "password": "new_password",
+                "company": "Unknown Company",
+            },
+            follow_redirects=True
+        )
+
+        assert response.request.path == url_for("auth.signup")
+        assert UNKNOWN_COMPANY_MESSAGE in response.get_data(as_text=True)
+        assert User.query.filter_by(email="unknown_company@to_register.com").first() is None
+
+
 def test_get_logout_success(auth: AuthActions, app: Flask):
     with app.app_context(), app.test_request_context():
         auth.login(
@@ -179,3 +220,48 @@ def test_get_logout_success_not_logged(auth: AuthActions, app: Flask):
         response = auth.logout()
         assert response.status_code == 200
         assert response.request.path == url_for("auth.login")
+
+
+def test_load_user_success_cached_until_changed(app: Flask):
+    with app.app_context():
+        USERS_CACHE.clear()
+        user_id = User.query.filter_by(email=TEST_USER_CREDENTIALS['email']).one().id
+        DB_ORM.session.remove()
+        statements = []
+
+        def count_statement(*args):
+            statements.append(args)
+
+        event.listen(DB_ORM.engine, "before_cursor_execute", count_statement)
+        try:
+            user = load_user(str(user_id))
+            assert len(statements) == 1
+            DB_ORM.session.remove()
+
+            user = load_user(str(user_id))
+            # The user and their company are copied into the session, without any query
+            assert user.email == TEST_USER_CREDENTIALS['email']
+            assert user.company.name == TEST_USER_CREDENTIALS['company']
+            assert user in DB_ORM.session
+            assert len(statements) == 1
+        finally:
+            event.remove(DB_ORM.engine, "before_cursor_execute", count_statement)
+
+        user.name = "Renamed User"
+        DB_ORM.session.flush()
+
+        # Other requests keep the committed user until the change is committed
+        assert user_id in USERS_CACHE
+        DB_ORM.session.commit()
+        assert user_id not in USERS_CACHE
+        DB_ORM.session.remove()
+        assert load_user(str(user_id)).name == "Renamed User"
+
+        user.name = TEST_USER_CREDENTIALS['name']
+        DB_ORM.session.commit()
+
+
+def test_load_user_success_unknown_user(app: Flask):
+    with app.app_context():
+        assert load_user("123456") is None
+        assert 123456 not in USERS_CACHE
@@ -0,0 +1,119 @@
+import io
+import json
+from datetime import datetime
+
+import pyarrow.parquet
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from project.ingestion import copy_sales_lines, delete_service_sales
+from project.models.service import Service
+
+from .conftest import DB_ORM, TEST_ADMIN_USER_CREDENTIALS, TEST_USER_CREDENTIALS, AuthActions, get_company_id
+
+
+def test_get_export_services_success(app: Flask, client: FlaskClient, auth: AuthActions):
+    with app.app_context(), app.test_request_context():
+        services = [
+            Service(
+                company_id=get_company_id(company_name),
+                date=datetime(2021, 2, day),
+                CA=day,
+                concert="Sans concert",
+            )
+            for company_name, day in (
+                (TEST_USER_CREDENTIALS['company'], 1),
+                (TEST_USER_CREDENTIALS['company'], 10),
+                (TEST_USER_CREDENTIALS['company'], 20),
+                (TEST_ADMIN_USER_CREDENTIALS['company'], 10),
+            )
+        ]
+        DB_ORM.session.add_all(services)
+        DB_ORM.session.flush()
+        copy_sales_lines(
+            service_id=services[1].id,
+            sales_lines=[
+                ("2021-02-10 21:00:00", "123", "Blonde pinte", 6.5, "liquid"),
+                ("2021-02-10 20:00:00", None, "Frites", 4.0, None),
+            ],
+        )
+        DB_ORM.session.commit()
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+
+        response = client.get(url_for("exports.export_services", export_format="csv", end_date="2021-02-10"))
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/csv"
+        assert response.headers["Content-Disposition"] == 'attachment; filename="services_2021-02-10.csv"'
+        # The services of other companies are never exported
+        assert response.get_data(as_text=True).splitlines() == [
+            "id,date,CA,solid,liquid,majoration,concert",
+            f"{services[0].id},2021-02-01 00:00:00,1.0,,,,Sans concert",
+            f"{services[1].id},2021-02-10 00:00:00,10.0,,,,Sans concert",
+        ]
+
+        response = client.get(url_for("exports.export_sales_lines", export_format="parquet", start_date="2021-02-01"))
+
+        assert response.status_code == 200
+        assert pyarrow.parquet.read_table(io.BytesIO(response.get_data())).to_pylist() == [
+            {
+                "service_id": services[1].id,
+                "service_date": datetime(2021, 2, 10),
+                "timestamp": datetime(2021, 2, 10, 20),
+                "uniq_id_product": None,
+                "product_name": "Frites",
+                "amount": 4.0,
+                "category": None,
+            },
+            {
+                "service_id": services[1].id,
+                "service_date": datetime(2021, 2, 10),
+                "timestamp": datetime(2021, 2, 10, 21),
+                "uniq_id_product": "123",
+                "product_name": "Blonde pinte",
+                "amount": 6.5,
+                "category": "liquid",
+            },
+        ]
+
+        # Services are read again, with the columns of the list only
+        DB_ORM.session.expire_all()
+        response = client.get(url_for("exports.export_services_json", export_format="ndjson", start_date="2021-02-10"))
+
+        assert response.mimetype == "application/x-ndjson"
+        assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == [
+            {
+                "id": service.id,
+                "company_id": get_company_id(),
+                "date": f"2021-02-{service.date.day}T00:00:00",
+                "version": 1,
+                "CA": float(service.date.day),
+                "solid": None,
+                "liquid": None,
+                "majoration": None,
+                "concert": "Sans concert",
+            }
+            for service in services[1:3]
+        ]
+
+        response = client.get(url_for("exports.export_services_json", export_format="json", end_date="2021-02-01"))
+        assert [service["id"] for service in response.json] == [services[0].id]
+
+        response = client.get(url_for("exports.export_services_json", export_format="json", fields="id,CA,foo"))
+        assert response.status_code == 400
+        response = client.get(
+            url_for("exports.export_services_json", export_format="json", fields="id,CA", start_date="2022-01-01")
+        )
+        assert response.json == []
+
+        response = client.get(url_for("exports.export_services", export_format="csv", start_date="01/02/2021"))
+        assert response.status_code == 400
+
+        assert client.get("/exports/services.xlsx").status_code == 404
+
+        delete_service_sales(services[1].id)
+        for service in services:
+            DB_ORM.session.delete(service)
+        DB_ORM.session.commit()
@@ -0,0 +1,140 @@
+from datetime import date, datetime
+
+from flask import Flask
+from project.ingestion import (
+    SalesAggregation,
+    copy_sales_lines,
+    delete_service_sales,
+    import_services,
+    refresh_revenue_rollups_of_dates,
+    rollup_period_start
+)
+from project.models.sales import SalesLine
+from project.models.service import Service
+from project.settings import DB_ORM
+
+from .conftest import get_company_id
+
+
+def test_copy_sales_lines_success(app: Flask):
+    with app.app_context():
+        service = Service(company_id=get_company_id(), date=datetime(2022, 1, 15))
+        DB_ORM.session.add(service)
+        DB_ORM.session.flush()
+
+        copy_sales_lines(
+            service_id=service.id,
+            sales_lines=[
+                ("2022-01-15 20:01:02", "123", "Blonde pinte", 6.5, "liquid"),
+                ("2022-01-15 21:30:00", None, 'Product, with "quotes"', 3.0, None),
+            ]
+        )
+        DB_ORM.session.commit()
+
+        sales_lines = (
+            SalesLine.query
+            .filter_by(service_id=service.id)
+            .order_by(SalesLine.timestamp)
+            .all()
+        )
+
+        assert [
+            (
+                sales_line.timestamp,
+                sales_line.uniq_id_product,
+                sales_line.product_name,
+                sales_line.amount,
+                sales_line.category,
+            )
+            for sales_line in sales_lines
+        ] == [
+            (datetime(2022, 1, 15, 20, 1, 2), "123", "Blonde pinte", 6.5, "liquid"),
+            (datetime(2022, 1, 15, 21, 30), None, 'Product, with "quotes"', 3.0, None),
+        ]
+
+        # Sales lines are deleted along their service
+        delete_service_sales(service.id)
+        DB_ORM.session.delete(service)
+        DB_ORM.session.commit()
+
+        assert SalesLine.query.filter_by(service_id=service.id).count() == 0
+
+
+def test_rollup_period_start_success():
+    # 2022-01-15 is a saturday
+    assert rollup_period_start('day', date(2022, 1, 15)) == date(2022, 1, 15)
+    assert rollup_period_start('week', date(2022, 1, 15)) == date(2022, 1, 10)
+    assert rollup_period_start('month', date(2022, 1, 15)) == date(2022, 1, 1)
+
+
+def test_import_services_success_batches(app: Flask):
+    with app.app_context():
+        rows = [
+            (
+                row_number,
+                {
+                    "date": f"2021-03-{row_number:02}",
+                    "CA": row_number,
+                    "solid": 0,
+                    "liquid": row_number,
+                    "majoration": 0,
+                    "all_products_list_by_name": {
+                        f"Product {row_number}": [{f"2021-03-{row_number:02} 20:00:00": row_number}],
+                    },
+                },
+                None,
+            )
+            for row_number in range(1, 6)
+        ]
+
+        report = import_services(company_id=get_company_id(), rows=rows, batch_size=2)
+        DB_ORM.session.commit()
+
+        assert report == {"imported": 5, "errors": []}
+        services = Service.query.filter(Service.date < datetime(2021, 4, 1)).order_by(Service.date).all()
+        # Sales lines are matched to their service across batches
+        assert [
+            [
+                (sales_line.product_name, sales_line.amount)
+                for sales_line in SalesLine.query.filter_by(service_id=service.id)
+            ]
+            for service in services
+        ] == [[(f"Product {day}", day)] for day in range(1, 6)]
+
+        for service in services:
+            delete_service_sales(service.id)
+            DB_ORM.session.delete(service)
+        DB_ORM.session.flush()
+        refresh_revenue_rollups_of_dates(get_company_id(), [service.date for service in services])
+        DB_ORM.session.commit()
+
+
+def test_sales_aggregation_success():
+    aggregation = SalesAggregation()
+    for product_name, product_type, category_name, amount, category in (
+        ("Blonde pinte", "Bière", "CONCERT", 6.5, "liquid"),
+        ("Blonde pinte", "Bière", "BAR", 5.5, "liquid"),
+        ("Mystery drink", "Autre", "CONCERT", 3.0, "liquid"),
+        ("Frites", "Cuisine", "CUISINE", 4.0, "solid"),
+        ("Gift card", "Autre", "BAR", 10.0, None),
+    ):
+        aggregation.add_sales_line(
+            {
+                "timestamp_locale": "2022-01-15 20:00:00",
+                "id_product": product_name.lower(),
+                "product_name": product_name,
+                "product_type": product_type,
+                "category_name": category_name,
+                "amount_total_evat": amount,
+            },
+            category=category,
+        )
+
+    assert (aggregation.solids_no_tva, aggregation.liquids_no_tva, aggregation.notfound_no_tva) == (4.0, 15.0, 10.0)
+    assert (aggregation.markup_amount, aggregation.markup_quantity) == (1, 1)
+    assert aggregation.products_lacking_markup == {"Mystery drink": 1}
+    assert aggregation.top_liquids() == {"Blonde pinte": 2, "Mystery drink": 1}
+    assert aggregation.all_products_by_timeline == {
+        "2022-01-15 20:00:00": [6.5, 5.5, 3.0, 4.0, 10.0],
+    }
+    assert aggregation.sales_lines[3] == ("2022-01-15 20:00:00", "frites", "Frites", 4.0, "solid")
@@ -0,0 +1,872 @@
+import json
+from datetime import datetime
+from typing import List
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from sqlalchemy import event, inspect
+from project.ingestion import (
+    backfill_timeline_columns,
+    copy_sales_lines,
+    delete_service_sales,
+    refresh_revenue_rollups,
+    sales_lines_from_products_by_name,
+    save_product_totals
+)
+from project.models.product import Product
+from project.models.rollup import RevenueRollup
+from project.models.sales import ProductTotal, SalesLine
+from project.main import CHARTS_CACHE, SERVICE_PAGES_CACHE, service_chart_digest, service_chart_url
+from project.models.service import Service
+from utils.pagination import encode_cursor
+from utils.timeline import TimeBuckets, TimelineIndex
+
+from .conftest import DB_ORM, TEST_ADMIN_USER_CREDENTIALS, TEST_USER_CREDENTIALS, AuthActions, get_company_id
+
+TEST_SERVICE_TIMELINE = {
+    "2022-01-15 20:00:00": [5.5, 2.0],
+    "2022-01-15 21:15:00": [6.5],
+    "2022-01-15 23:45:00": [4.0],
+}
+TEST_SERVICE_PRODUCTS = {
+    "Blonde pinte": [
+        {"2022-01-15 20:00:00": 5.5},
+        {"2022-01-15 21:15:00": 6.5},
+    ],
+    "SOFT verse": [
+        {"2022-01-15 20:00:00": 2.0},
+    ],
+    "Frites": [
+        {"2022-01-15 23:45:00": 4.0},
+    ],
+}
+
+
+@pytest.fixture(scope="function")
+def service(app: Flask):
+    with app.app_context():
+        service = Service(
+            company_id=get_company_id(),
+            date=datetime(2022, 1, 15),
+            CA=18,
+            solid=4,
+            liquid=14,
+            majoration=0,
+            top_liquids={"Blonde pinte": 2, "SOFT verse": 1},
+            all_products_list_by_name=TEST_SERVICE_PRODUCTS,
+            all_products_timeline=TEST_SERVICE_TIMELINE,
+            concert="Sans concert",
+            concert_infos={
+                'title': 'Sans concert',
+                'facebook': '#',
+                'style': '',
+                'free': 'true',
+                'picture': '#',
+            },
+        )
+        DB_ORM.session.add(service)
+        DB_ORM.session.flush()
+        copy_sales_lines(
+            service_id=service.id,
+            sales_lines=sales_lines_from_products_by_name(TEST_SERVICE_PRODUCTS),
+        )
+        save_product_totals(service_id=service.id)
+        refresh_revenue_rollups(company_id=service.company_id, service_date=service.date)
+        DB_ORM.session.commit()
+        service_id, service_company_id, service_date = service.id, service.company_id, service.date
+
+        yield service
+
+        # The test may have deleted the service already
+        delete_service_sales(service_id)
+        Service.query.filter_by(id=service_id).delete()
+        refresh_revenue_rollups(company_id=service_company_id, service_date=service_date)
+        DB_ORM.session.commit()
+
+
+def test_get_json_tools_view_success(app: Flask, client: FlaskClient, auth: AuthActions, service: Service):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        DB_ORM.session.expire_all()
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(DB_ORM.engine, "before_cursor_execute", record_statement)
+        try:
+            response = client.get(url_for("main.json_tools_view", service_id=service.id))
+        finally:
+            event.remove(DB_ORM.engine, "before_cursor_execute", record_statement)
+
+        assert response.status_code == 200
+        page = response.get_data(as_text=True)
+        for product_name in TEST_SERVICE_PRODUCTS:
+            assert f'<option value="{product_name}">' in page
+        # The compressed blobs of the service are left unloaded
+        assert not [statement for statement in statements if "all_products" in statement]
+
+
+def test_post_json_tools_view_timeline_success(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    service: Service,
+):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        timeline_request = {
+            "wich_json": "timeline",
+            "input_date_start": "2022-01-15T19:00",
+            "input_date_end": "2022-01-15T22:00",
+        }
+        # Read only, a service without timeline index has no sales until it is backfilled
+        response = client.post(url_for("main.json_tools_view", service_id=service.id), json=timeline_request)
+
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == "0.0 €"
+        DB_ORM.session.refresh(service)
+        assert service.timeline_index is None
+
+        assert backfill_timeline_columns() >= 1
+        response = client.post(url_for("main.json_tools_view", service_id=service.id), json=timeline_request)
+
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == "14.0 €"
+
+
+def test_post_json_tools_view_product_success(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    service: Service,
+):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        response = client.post(
+            url_for("main.json_tools_view", service_id=service.id),
+            json={
+                "wich_json": "product",
+                "products_to_search": "Blonde pinte",
+            }
+        )
+
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == "12.0 €"
+
+        response = client.post(
+            url_for("main.json_tools_view", service_id=service.id),
+            json={
+                "wich_json": "product",
+                "products_to_search": "Not sold tonight",
+            }
+        )
+
+        assert response.get_data(as_text=True) == "0 €"
+
+
+TEST_LADDITION_SALES_LINES = [
+    {
+        "timestamp_locale": "2022-01-16 20:00:00",
+        "id_product": "test_blonde",
+        "product_name": "Blonde pinte",
+        "product_type": "Bière",
+        "category_name": "CONCERT",
+        "amount_total_evat": 5.5,
+    },
+    {
+        "timestamp_locale": "2022-01-16 20:00:00",
+        "id_product": "test_frites",
+        "product_name": "Frites",
+        "product_type": "Snack",
+        "category_name": "CUISINE",
+        "amount_total_evat": 4.0,
+    },
+    {
+        "timestamp_locale": "2022-01-16 21:30:00",
+        "id_product": "test_blonde",
+        "product_name": "Blonde pinte",
+        "product_type": "Bière",
+        "category_name": "BAR",
+        "amount_total_evat": 6.5,
+    },
+]
+
+
+@pytest.fixture(scope="function")
+def products(app: Flask):
+    with app.app_context():
+        products = [
+            Product(
+                company_id=get_company_id(),
+                uniq_id_product="test_blonde",
+                product_name="Blonde pinte",
+                product_price=6.5,
+                id_product_type=1,
+                category1="liquid",
+                visible=True,
+                removed=False,
+            ),
+            Product(
+                company_id=get_company_id(),
+                uniq_id_product="test_frites",
+                product_name="Frites",
+                product_price=4,
+                id_product_type=2,
+                category1="solid",
+                visible=True,
+                removed=False,
+            ),
+        ]
+        DB_ORM.session.add_all(products)
+        DB_ORM.session.commit()
+
+        yield products
+
+        for product in products:
+            DB_ORM.session.delete(product)
+        DB_ORM.session.commit()
+
+
+@patch("project.main.sowprog_syncher")
+@patch("project.main.requests")
+def test_post_request_manualy_add_service_success(
+    mocked_requests: MagicMock,
+    mocked_sowprog_syncher: MagicMock,
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    products: List[Product],
+):
+    concert_infos = {
+        'title': 'Test_Title',
+        'facebook': '#',
+        'style': 'jazzapapa',
+        'free': 'true',
+        'picture': '#',
+    }
+    mocked_sowprog_syncher.return_value = ("Test_Title", concert_infos, None)
+    mocked_requests.get = MagicMock(
+        side_effect=[
+            MagicMock(json=MagicMock(return_value={"data": [{"id": 1, "amount_total_evat": 16.0}]})),
+            MagicMock(json=MagicMock(return_value={"lastPage": 1})),
+            MagicMock(json=MagicMock(return_value={"data": TEST_LADDITION_SALES_LINES})),
+        ]
+    )
+
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        response = client.post(
+            url_for("main.request_manualy_add_service"),
+            data={"date_to_search": "2022-01-16"},
+        )
+
+        assert response.status_code == 200
+        assert response.json == {"created_service": "2022-01-16"}
+
+        service = Service.query.filter_by(date=datetime(2022, 1, 16)).one()
+        assert service.CA == 16.0
+        assert service.solid == 4.0
+        assert service.liquid == 12.0
+        # JSON columns hold JSON objects, not JSON encoded strings
+        assert service.top_liquids == {"Blonde pinte": 2}
+        assert service.all_products_timeline == {
+            "2022-01-16 20:00:00": [5.5, 4.0],
+            "2022-01-16 21:30:00": [6.5],
+        }
+        assert service.all_products_list_by_name == {
+            "Blonde pinte": [
+                {"2022-01-16 20:00:00": 5.5},
+                {"2022-01-16 21:30:00": 6.5},
+            ],
+            "Frites": [
+                {"2022-01-16 20:00:00": 4.0},
+            ],
+        }
+        assert service.concert_infos == concert_infos
+        assert TimelineIndex.from_bytes(service.timeline_index).revenue_between(
+            start=datetime(2022, 1, 16, 15),
+            end=datetime(2022, 1, 17, 6),
+        ) == 16.0
+
+        assert SalesLine.query.filter_by(service_id=service.id).count() == 3
+        assert [
+            (product_total.product_name, product_total.sales_count, product_total.revenue)
+            for product_total in ProductTotal.query.filter_by(service_id=service.id).order_by(
+                ProductTotal.product_name
+            )
+        ] == [
+            ("Blonde pinte", 2, 12.0),
+            ("Frites", 1, 4.0),
+        ]
+
+        assert RevenueRollup.query.filter_by(company_id=get_company_id(), period="month").one().CA == 16.0
+
+        # The chart is only rendered when it is first requested, by the app and not by a third party
+        chart_response = client.get(service_chart_url(service))
+        assert chart_response.status_code == 200
+        assert chart_response.mimetype == "image/svg+xml"
+        assert "Blonde pinte" in chart_response.get_data(as_text=True)
+
+        delete_service_sales(service.id)
+        DB_ORM.session.delete(service)
+        DB_ORM.session.flush()
+        refresh_revenue_rollups(company_id=service.company_id, service_date=service.date)
+        DB_ORM.session.commit()
+
+
+def test_get_products_leaderboard_success(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    service: Service,
+):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        response = client.get(
+            url_for(
+                "main.products_leaderboard",
+                start_date="2022-01-15",
+                end_date="2022-01-15",
+                limit=2,
+            )
+        )
+
+        assert response.status_code == 200
+        assert response.json == {
+            "products": [
+                {"product_name": "Blonde pinte", "sales_count": 2, "revenue": 12.0},
+                {"product_name": "Frites", "sales_count": 1, "revenue": 4.0},
+            ]
+        }
+
+        response = client.get(url_for("main.products_leaderboard", start_date="15-01-2022"))
+
+        assert response.status_code == 400
+
+
+def test_post_add_service_success(app: Flask, client: FlaskClient):
+    with app.app_context(), app.test_request_context():
+        response = client.post(
+            url_for("main.add_service"),
+            json={
+                "company": TEST_USER_CREDENTIALS['company'],
+                "date": "2022-01-17",
+                "CA": 18,
+                "solid": 4,
+                "liquid": 14,
+                "majoration": 0,
+                # Legacy clients still send the URL of a chart rendered by a third party, it is ignored
+                "graph_url": "",
+                # Legacy clients send the JSON columns as JSON encoded strings
+                "top_liquids": json.dumps({"Blonde pinte": 2, "SOFT verse": 1}),
+                "all_products_list_by_name": json.dumps(TEST_SERVICE_PRODUCTS),
+                "all_products_timeline": TEST_SERVICE_TIMELINE,
+                "concert": "Sans concert",
+                "concert_infos": {},
+            }
+        )
+
+        assert response.status_code == 200
+
+        service = Service.query.filter_by(date=datetime(2022, 1, 17)).one()
+        assert service.top_liquids == {"Blonde pinte": 2, "SOFT verse": 1}
+        assert service.all_products_list_by_name == TEST_SERVICE_PRODUCTS
+        # The sales charts and the timeline of the service are read from columns built at creation
+        assert TimeBuckets.from_bytes(service.time_buckets).per_hour()[0] == (datetime(2022, 1, 15, 20), 7.5)
+        assert TimelineIndex.from_bytes(service.timeline_index).revenue_between(
+            datetime(2022, 1, 15, 21), datetime(2022, 1, 16)
+        ) == 10.5
+        assert SalesLine.query.filter_by(service_id=service.id).count() == 4
+        assert ProductTotal.query.filter_by(service_id=service.id, product_name="Blonde pinte").one().revenue == 12.0
+        assert RevenueRollup.query.filter_by(
+            company_id=get_company_id(),
+            period="day",
+            period_start=datetime(2022, 1, 17),
+        ).one().CA == 18
+
+        delete_service_sales(service.id)
+        DB_ORM.session.delete(service)
+        DB_ORM.session.flush()
+        refresh_revenue_rollups(company_id=service.company_id, service_date=service.date)
+        DB_ORM.session.commit()
+
+
+def test_get_revenue_analytics_success(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    service: Service,
+):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        response = client.get(
+            url_for(
+                "main.revenue_analytics",
+                period="week",
+                start_date="2022-01-01",
+                end_date="2022-12-31",
+            )
+        )
+
+        assert response.status_code == 200
+        assert response.json == {
+            "company": TEST_USER_CREDENTIALS['company'],
+            "period": "week",
+            "rollups": [
+                {
+                    "period_start": "2022-01-10",
+                    "services_count": 1,
+                    "CA": 18,
+                    "solid": 4,
+                    "liquid": 14,
+                    "majoration": 0,
+                },
+            ]
+        }
+
+        response = client.get(url_for("main.revenue_analytics", period="year"))
+
+        assert response.status_code == 400
+
+
+def test_delete_service_success_refreshes_revenue_rollups(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    service: Service,
+):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        rollups_query = RevenueRollup.query.filter_by(company_id=get_company_id())
+        assert rollups_query.count() == 3
+
+        response = client.delete(url_for("main.handle_service", service_id=service.id))
+
+        assert response.status_code == 200
+        assert rollups_query.count() == 0
+
+
+@patch("project.main.PAGES_NUM_TO_LOAD", 2)
+def test_get_handle_services_success_keyset_pagination(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+):
+    with app.app_context(), app.test_request_context():
+        services = [
+            Service(company_id=get_company_id(), date=datetime(2021, 6, day), concert="Sans concert")
+            for day in (1, 2, 2, 3, 4)
+        ]
+        DB_ORM.session.add_all(services)
+        DB_ORM.session.commit()
+        # Newest first, services of the same date sorted by id
+        expected_services_order = [services[4], services[3], services[2], services[1], services[0]]
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+
+        def listed_service_ids(response) -> List[int]:
+            page = response.get_data(as_text=True)
+            return [
+                service.id
+                for service in expected_services_order
+                if f'<tr id="{service.id}">' in page
+            ]
+
+        first_page = client.get(url_for("main.handle_services"))
+        assert first_page.status_code == 200
+        assert listed_service_ids(first_page) == [services[4].id, services[3].id]
+
+        second_page = client.get(
+            url_for("main.handle_services", after=encode_cursor(services[3].date, services[3].id))
+        )
+        assert listed_service_ids(second_page) == [services[2].id, services[1].id]
+
+        last_page = client.get(
+            url_for("main.handle_services", after=encode_cursor(services[1].date, services[1].id))
+        )
+        assert listed_service_ids(last_page) == [services[0].id]
+        assert "after=" not in last_page.get_data(as_text=True)
+
+        previous_page = client.get(
+            url_for("main.handle_services", before=encode_cursor(services[1].date, services[1].id))
+        )
+        assert listed_service_ids(previous_page) == [services[3].id, services[2].id]
+
+        response = client.get(url_for("main.handle_services", after="not_a_cursor"))
+        assert response.status_code == 400
+
+        for service in services:
+            DB_ORM.session.delete(service)
+        DB_ORM.session.commit()
+
+
+def test_post_handle_services_success_filters(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+):
+    with app.app_context(), app.test_request_context():
+        services = [
+            Service(company_id=get_company_id(company_name), date=datetime(2021, 7, day), concert="Sans concert")
+            for company_name, day in (
+                (TEST_USER_CREDENTIALS['company'], 1),
+                (TEST_USER_CREDENTIALS['company'], 10),
+                (TEST_USER_CREDENTIALS['company'], 20),
+                (TEST_ADMIN_USER_CREDENTIALS['company'], 10),
+            )
+        ]
+        DB_ORM.session.add_all(services)
+        DB_ORM.session.commit()
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+
+        def listed_service_ids(response) -> List[int]:
+            page = response.get_data(as_text=True)
+            return [service.id for service in services if f'<tr id="{service.id}">' in page]
+
+        # The end date is inclusive
+        response = client.post(
+            url_for("main.handle_services"),
+            data={"start_date": "2021-07-05", "end_date": "2021-07-20"},
+        )
+        assert response.status_code == 200
+        # The services of other companies are never listed
+        assert listed_service_ids(response) == [services[1].id, services[2].id]
+
+        # Pagination links carry the filters as arguments
+        response = client.get(url_for("main.handle_services", end_date="2021-07-01"))
+        assert listed_service_ids(response) == [services[0].id]
+
+        response = client.post(url_for("main.handle_services"), data={"start_date": "01/07/2021"})
+        assert response.status_code == 400
+
+        for service in services:
+            DB_ORM.session.delete(service)
+        DB_ORM.session.commit()
+
+
+def test_service_load_profile_defers_product_blobs(app: Flask, service: Service):
+    with app.app_context():
+        DB_ORM.session.expunge_all()
+
+        listed_service = Service.query.options(Service.load_profile('list')).get(service.id)
+        unloaded_columns = inspect(listed_service).unloaded
+        assert {'all_products_list_by_name', 'all_products_timeline', 'concert_infos'} <= unloaded_columns
+        assert 'CA' not in unloaded_columns
+
+        # Deferred columns are still loaded on access
+        assert listed_service.all_products_timeline == TEST_SERVICE_TIMELINE
+
+
+def test_get_handle_service_success_cached_with_etag(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    service: Service,
+):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        service_url = url_for("main.handle_service", service_id=service.id)
+
+        response = client.get(service_url)
+
+        assert response.status_code == 200
+        assert ("service", service.id, 1) in SERVICE_PAGES_CACHE
+        etag, _ = response.get_etag()
+
+        response = client.get(service_url, headers={"If-None-Match": f'"{etag}"'})
+
+        assert response.status_code == 304
+        assert response.get_etag() == (etag, False)
+
+        # An edit bumps the version, invalidates the cached page and changes the ETag
+        response = client.post(service_url, data={"select_info": "liquid", "select_value": "20"})
+
+        assert response.status_code == 200
+        assert ("service", service.id, 1) not in SERVICE_PAGES_CACHE
+        assert ("service", service.id, 2) in SERVICE_PAGES_CACHE
+        assert response.get_etag()[0] != etag
+
+        response = client.get(service_url, headers={"If-None-Match": f'"{etag}"'})
+
+        assert response.status_code == 200
+        assert "20.0" in response.get_data(as_text=True)
+
+        client.delete(service_url)
+
+        assert ("service", service.id, 2) not in SERVICE_PAGES_CACHE
+        assert client.get(service_url).status_code == 404
+
+
+def test_get_handle_graph_success_flashes_on_each_render(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    service: Service,
+):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        service.top_liquids = None
+        DB_ORM.session.commit()
+
+        for _ in range(2):
+            response = client.get(url_for("main.handle_graph", service_id=service.id))
+
+            assert response.status_code == 200
+            assert "No graph generated for this service." in response.get_data(as_text=True)
+
+
+def test_get_service_chart_success_cached_and_redirects_stale_digest(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    service: Service,
+):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        CHARTS_CACHE.clear()
+        digest, _ = service_chart_digest(service, 'top_liquids')
+        chart_url = service_chart_url(service)
+        assert chart_url.endswith(f"/service/{service.id}/chart/top_liquids/{digest}.svg")
+
+        response = client.get(chart_url)
+
+        assert response.status_code == 200
+        assert response.data.startswith(b'<svg xmlns="http://www.w3.org/2000/svg"')
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == 365 * 24 * 3600
+        assert CHARTS_CACHE.get(digest) == response.get_data(as_text=True)
+
+        # New numbers, new chart at a new URL
+        service.liquid = 15
+        DB_ORM.session.commit()
+        new_chart_url = service_chart_url(service)
+        assert new_chart_url != chart_url
+
+        response = client.get(chart_url)
+
+        assert response.status_code == 302
+        assert response.location.endswith(new_chart_url)
+        assert "15.0 €" in client.get(new_chart_url).get_data(as_text=True)
+
+        response = client.get(
+            url_for("main.service_chart", service_id=service.id + 1000, chart_name='top_liquids', digest=digest)
+        )
+
+        assert response.status_code == 404
+
+
+def test_get_service_chart_success_sales_histograms_from_time_buckets(
+    app: Flask,
+    client: FlaskClient,
+    auth: AuthActions,
+    service: Service,
+):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        # No chart until the buckets of the service are built from its timeline
+        assert service.time_buckets is None
+        assert service_chart_url(service, 'sales_per_hour') == ""
+        assert backfill_timeline_columns() >= 1
+        DB_ORM.session.refresh(service)
+        assert service.time_buckets is not None
+        per_hour_url = service_chart_url(service, 'sales_per_hour')
+        assert per_hour_url != ""
+
+        response = client.get(per_hour_url)
+
+        assert response.status_code == 200
+        bars = response.get_data(as_text=True)
+        assert "<title>20h : 7.5</title>" in bars
+        assert "<title>22h : 0</title>" in bars
+        assert "<title>23h : 4</title>" in bars
+
+        response = client.get(service_chart_url(service, 'sales_per_15_minutes'))
+
+        assert response.status_code == 200
+        assert "<title>21:15 : 6.5</title>" in response.get_data(as_text=True)
+
+
+def test_get_services_heatmap_success(app: Flask, client: FlaskClient, auth: AuthActions, service: Service):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        # Services without time buckets count as no sales
+        response = client.get(url_for("main.services_heatmap", start_date="2022-01-01", end_date="2022-01-31"))
+
+        assert response.status_code == 200
+        assert "<title>Sam 20h : 0</title>" in response.get_data(as_text=True)
+
+        backfill_timeline_columns()
+        response = client.get(url_for("main.services_heatmap", start_date="2022-01-01", end_date="2022-01-31"))
+
+        assert response.status_code == 200
+        assert response.mimetype == "image/svg+xml"
+        heatmap = response.get_data(as_text=True)
+        # 2022-01-15 is a Saturday
+        assert "<title>Sam 20h : 7.5</title>" in heatmap
+        assert "<title>Sam 21h : 6.5</title>" in heatmap
+        assert "<title>Ven 20h : 0</title>" in heatmap
+
+        response = client.get(
+            url_for("main.services_heatmap", start_date="2022-01-01", end_date="2022-01-31"),
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+
+        assert response.status_code == 304
+
+        response = client.get(url_for("main.services_heatmap", start_date="2022-02-01"))
+
+        assert "<title>Sam 20h : 0</title>" in response.get_data(as_text=True)
+
+        assert client.get(url_for("main.services_heatmap", start_date="01/02/2022")).status_code == 400
+
+
+def test_post_import_services_success(app: Flask, client: FlaskClient, auth: AuthActions):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        services_payloads = [
+            {
+                "company": "Ignored Company",
+                "date": f"2021-05-{day:02}",
+                "CA": 18,
+                "solid": 4,
+                "liquid": 14,
+                "majoration": 0,
+                "top_liquids": json.dumps({"Blonde pinte": 2, "SOFT verse": 1}),
+                "all_products_list_by_name": TEST_SERVICE_PRODUCTS,
+                "all_products_timeline": TEST_SERVICE_TIMELINE,
+                "concert": "Sans concert",
+            }
+            for day in (3, 4, 10)
+        ]
+
+        response = client.post(
+            url_for("main.import_services_view"),
+            data="\n".join(json.dumps(payload) for payload in services_payloads[:2]),
+            content_type="application/x-ndjson",
+        )
+        assert response.status_code == 200
+        assert response.json == {"imported": 2, "errors": []}
+
+        response = client.post(
+            url_for("main.import_services_view"),
+            data=json.dumps(services_payloads[2:]),
+            content_type="application/json",
+        )
+        assert response.json == {"imported": 1, "errors": []}
+
+        services = Service.query.filter(
+            Service.date >= datetime(2021, 5, 1),
+            Service.date < datetime(2021, 6, 1),
+        ).order_by(Service.date).all()
+        assert [service.date.day for service in services] == [3, 4, 10]
+        assert {service.company_id for service in services} == {get_company_id()}
+        assert services[0].top_liquids == {"Blonde pinte": 2, "SOFT verse": 1}
+        assert services[0].all_products_timeline == TEST_SERVICE_TIMELINE
+        # Services without concert infos are imported as the ones without a concert
+        assert services[0].concert_infos["title"] == "Sans concert"
+        assert client.get(url_for("main.handle_service", service_id=services[0].id)).status_code == 200
+        assert TimelineIndex.from_bytes(services[0].timeline_index).revenue_between(
+            start=datetime(2022, 1, 15),
+            end=datetime(2022, 1, 16),
+        ) == 18
+        assert SalesLine.query.filter(SalesLine.service_id.in_([service.id for service in services])).count() == 12
+        assert ProductTotal.query.filter_by(service_id=services[2].id, product_name="Blonde pinte").one().revenue == 12
+        rollups_query = RevenueRollup.query.filter_by(company_id=get_company_id())
+        assert rollups_query.filter_by(period="month", period_start=datetime(2021, 5, 1)).one().CA == 54
+        assert rollups_query.filter_by(period="week", period_start=datetime(2021, 5, 3)).one().services_count == 2
+
+        for service in services:
+            delete_service_sales(service.id)
+            DB_ORM.session.delete(service)
+        DB_ORM.session.flush()
+        refresh_revenue_rollups(company_id=get_company_id(), service_date=datetime(2021, 5, 3))
+        refresh_revenue_rollups(company_id=get_company_id(), service_date=datetime(2021, 5, 10))
+        DB_ORM.session.commit()
+
+
+def test_post_import_services_error_invalid_rows(app: Flask, client: FlaskClient, auth: AuthActions):
+    with app.app_context(), app.test_request_context():
+        auth.login(
+            email=TEST_USER_CREDENTIALS['email'],
+            password=TEST_USER_CREDENTIALS['password'],
+        )
+        rows = [
+            '{"date": "2021-04-01", "CA": 1, "solid": 1, "liquid": 0, "majoration": 0}',
+            '{"date": "01/04/2021", "CA": 1, "solid": 1, "liquid": 0, "majoration": 0}',
+            '{"date": "2021-04-03", "CA": "1", "solid": 1, "liquid": 0, "majoration": 0}',
+            '{"date": "2021-04-04", "CA": 1}',
+            '{"date": "2021-04-05", "CA": 1, "solid": 1, "liquid": 0, "majoration": 0, "top_liquids": [1]}',
+            '{"date": "2021-04-06", ',
+            '{"date": "2021-04-07", "CA": 1, "solid": 1, "liquid": 0, "majoration": 0, "concert_infos": {"title": "A"}}',
+        ]
+
+        response = client.post(
+            url_for("main.import_services_view"),
+            data="\n".join(rows),
+            content_type="application/x-ndjson",
+        )
+
+        assert response.status_code == 400
+        assert response.json == {
+            "imported": 0,
+            "errors": [
+                {"row": 2, "error": "Wrong date format '01/04/2021', use : YEAR-MONTH-DAY"},
+                {"row": 3, "error": "CA must be a number"},
+                {"row": 4, "error": "Missing fields ['solid', 'liquid', 'majoration']"},
+                {"row": 5, "error": "top_liquids must be a JSON object"},
+                {"row": 6, "error": "Invalid JSON: Expecting property name enclosed in double quotes"},
+                {"row": 7, "error": "Missing concert_infos fields ['facebook', 'style', 'free', 'picture']"},
+            ],
+        }
+        # Valid rows are not imported either
+        assert Service.query.filter(Service.date == datetime(2021, 4, 1)).count() == 0
+
+        response = client.post(url_for("main.import_services_view"), data="date,CA", content_type="text/csv")
+        assert response.status_code == 400
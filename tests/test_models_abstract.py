@@ -1,10 +1,15 @@
 import json
-from datetime import date
+from datetime import date, datetime
 
 import pytest
+from flask import Flask
 from project.models.abstract import SerializableModel
+from project.models.service import Service
+from project.settings import DB_ORM
 from utils.errors.http_errors import SerializationError
 
+from .conftest import get_company_id
+
 
 def test_serializable_model_serialize_success():
     my_model = SerializableModel(
@@ -86,6 +91,52 @@ def test_serializable_model_serialize_success_with_arguments():
     assert expected_dict_result == dict_result
 
 
+def test_serializable_model_serialize_success_mapped_columns():
+    service = Service(
+        id=12,
+        company_id=1,
+        date=datetime(2022, 1, 15, 20),
+        CA=18.5,
+        top_liquids={"Blonde pinte": 2},
+        concert="Sans concert",
+        concert_infos={"title": "Sans concert"},
+    )
+
+    assert json.loads(service.serialize(foo="bar")) == {
+        "id": 12,
+        "company_id": 1,
+        "date": "2022-01-15 20:00:00",
+        "CA": 18.5,
+        "concert": "Sans concert",
+        "foo": "bar",
+    }
+    # The plan of a class is built once
+    assert Service.serialization_plan() is Service.serialization_plan()
+    assert Service.serialization_plan() is not SerializableModel.serialization_plan()
+
+
+def test_serializable_model_serialize_success_unloaded_columns(app: Flask):
+    with app.app_context():
+        service = Service(company_id=get_company_id(), date=datetime(2022, 1, 15), CA=18.5, liquid=14)
+        DB_ORM.session.add(service)
+        DB_ORM.session.commit()
+        service_id = service.id
+        DB_ORM.session.expunge_all()
+
+        service = Service.query.options(Service.load_profile('concert')).filter_by(id=service_id).one()
+
+        # Columns left out by the load profile are not loaded to be serialized
+        assert json.loads(service.serialize()) == {
+            "id": service_id,
+            "company_id": get_company_id(),
+            "date": "2022-01-15 00:00:00",
+        }
+        assert "CA" not in vars(service)
+
+        DB_ORM.session.delete(service)
+        DB_ORM.session.commit()
+
+
 # def test_serializable_model_serialize_error_unserializable_field():
 # FIXME : This error will never occurs, need to find a non value that cannot convert to string
 #     class MyFakeModelClass(SerializableModel):
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime
+
+import pytest
+from project.serializers import ModelSerializer
+
+
+class FooModel():
+    def __init__(self, **fields) -> None:
+        for field, value in fields.items():
+            setattr(self, field, value)
+
+
+def test_model_serializer_to_dict_success():
+    serializer = ModelSerializer(fields=("id", "date", "infos"), default_fields=("id", "date"))
+    foo = FooModel(id=1, date=datetime(2022, 1, 15, 20), infos={"title": "Foo"})
+
+    assert serializer.to_dict(foo) == {"id": 1, "date": datetime(2022, 1, 15, 20)}
+    assert serializer.to_dict(foo, ("infos",)) == {"infos": {"title": "Foo"}}
+    assert serializer.to_dicts([foo, foo], ("id",)) == [{"id": 1}, {"id": 1}]
+    assert ModelSerializer.dumps(serializer.to_dict(foo)) == b'{"id":1,"date":"2022-01-15T20:00:00"}'
+
+
+def test_model_serializer_select_fields_success():
+    serializer = ModelSerializer(fields=("id", "date", "infos"), default_fields=("id", "date"))
+
+    assert serializer.select_fields(None) == ("id", "date")
+    assert serializer.select_fields("infos, id,infos") == ("id", "infos")
+    # Any order of the same fields shares a single plan
+    plan = serializer._plan(serializer.select_fields("infos,id"))
+    assert serializer._plan(serializer.select_fields("id,infos")) is plan
+
+    with pytest.raises(ValueError):
+        serializer.select_fields("id,bar")
+
+
+def test_model_serializer_iter_json_chunks_success():
+    serializer = ModelSerializer(fields=("id", "date", "CA"))
+    batches = [
+        [FooModel(id=service_id, date=datetime(2022, 1, service_id), CA=float(service_id)) for service_id in batch_ids]
+        for batch_ids in ((1, 2), (), (3, 4), (5,))
+    ]
+    expected_dicts = [
+        {"id": service_id, "date": f"2022-01-{service_id:02}T00:00:00", "CA": float(service_id)}
+        for service_id in range(1, 6)
+    ]
+
+    chunks = list(serializer.iter_json_chunks(batches))
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert len(chunks) == 4
+    assert json.loads(b"".join(chunks)) == expected_dicts
+
+    chunks = list(serializer.iter_json_chunks(iter(batches), fields=("id",), ndjson=True))
+    assert len(chunks) == 4
+    assert [json.loads(line) for line in b"".join(chunks).splitlines()] == [
+        {"id": service_id} for service_id in range(1, 6)
+    ]
+
+
+def test_model_serializer_iter_json_chunks_success_no_instances():
+    serializer = ModelSerializer(fields=("id",))
+
+    assert b"".join(serializer.iter_json_chunks([])) == b"[]"
+    assert b"".join(serializer.iter_json_chunks([[]])) == b"[]"
+    assert b"".join(serializer.iter_json_chunks([], ndjson=True)) == b""
@@ -1,7 +1,9 @@
-from datetime import datetime
+from datetime import date, datetime
 from unittest.mock import MagicMock, NonCallableMagicMock, call, patch
 
 import pytest
+from flask import Flask
+from project.models.concert import Concert
 from project.models.product import Product
 from project.settings import (
     DB_ORM,
@@ -14,11 +16,15 @@ from project.synchers import (
     SOWPROG_URL,
     ProductSyncher,
     get_concert_infos_from_sowprog_api_with_date,
+    import_sowprog_season,
+    sowprog_syncher,
     unpack_and_check_sowprog_data
 )
 from requests import HTTPError
 from werkzeug.exceptions import Conflict, NotFound
 
+from .conftest import get_company_id
+
 # --------------------- #
 # Concert Syncher tests #
 # --------------------- #
@@ -197,6 +203,119 @@ def test_unpack_and_check_sowprog_data_error_too_many_concert_returned():
     assert error.description == "Too many data from SowProgAPI"
     assert error.code == 409
 
+
+@patch("project.synchers.get_concert_infos_from_sowprog_api_with_date")
+def test_sowprog_syncher_success_from_local_index(
+    mocked_get_concert_infos: MagicMock,
+    app: Flask,
+):
+    with app.app_context():
+        indexed_infos = {
+            'title': "Indexed_Title",
+            'facebook': "#",
+            'style': "rock",
+            'free': "false",
+            'picture': "#",
+        }
+        DB_ORM.session.add(
+            Concert(date=date(2021, 3, 12), name="Indexed_Title", infos=indexed_infos)
+        )
+        DB_ORM.session.commit()
+
+        concert_name, concert_infos, error = sowprog_syncher(
+            date_to_search=datetime(2021, 3, 12)
+        )
+
+        mocked_get_concert_infos.assert_not_called()
+        assert concert_name == "Indexed_Title"
+        assert concert_infos == indexed_infos
+        assert error is None
+
+        Concert.query.delete()
+        DB_ORM.session.commit()
+
+
+@patch("project.synchers.get_concert_infos_from_sowprog_api_with_date")
+def test_sowprog_syncher_success_not_indexed_yet(
+    mocked_get_concert_infos: MagicMock,
+    app: Flask,
+):
+    mocked_get_concert_infos.return_value = {"eventDescriptionSplitByDate": []}
+
+    with app.app_context():
+        concert_name, concert_infos, error = sowprog_syncher(
+            date_to_search=datetime(2021, 3, 13)
+        )
+
+        mocked_get_concert_infos.assert_called_once_with(datetime(2021, 3, 13))
+        assert concert_name == "Sans concert"
+        assert error is None
+
+        indexed_concert = Concert.query.filter_by(date=date(2021, 3, 13)).one()
+        assert indexed_concert.name == "Sans concert"
+        assert indexed_concert.infos == concert_infos
+
+        Concert.query.delete()
+        DB_ORM.session.commit()
+
+
+@patch("project.synchers.get_concert_infos_from_sowprog_api_with_date")
+def test_import_sowprog_season_success(
+    mocked_get_concert_infos: MagicMock,
+    app: Flask,
+):
+    def fake_sowprog_api(date_to_search: datetime):
+        if date_to_search.day == 2:
+            raise HTTPError("Sowprog is down")
+        if date_to_search.day == 3:
+            return {}
+        return {
+            "eventDescriptionSplitByDate": [
+                {
+                    "freeAdmission": "true",
+                    "event": {
+                        "title": f"Title_{date_to_search.day}",
+                        "eventStyle": {"label": "jazzapapa"},
+                    }
+                }
+            ]
+        }
+
+    mocked_get_concert_infos.side_effect = fake_sowprog_api
+
+    with app.app_context():
+        # Already indexed dates are overwritten by the import
+        DB_ORM.session.add(
+            Concert(date=date(2021, 4, 1), name="Outdated", infos={})
+        )
+        DB_ORM.session.commit()
+
+        imported_dates, failed_dates = import_sowprog_season(
+            start_date=date(2021, 4, 1),
+            end_date=date(2021, 4, 4),
+            max_workers=2,
+        )
+
+        assert mocked_get_concert_infos.call_count == 4
+        assert imported_dates == [date(2021, 4, 1), date(2021, 4, 4)]
+        assert failed_dates == {
+            date(2021, 4, 2): "Sowprog is down",
+            date(2021, 4, 3): "SowProgAPI failed to provide data",
+        }
+
+        indexed_concerts = Concert.query.order_by(Concert.date).all()
+        assert [concert.name for concert in indexed_concerts] == ["Title_1", "Title_4"]
+        assert indexed_concerts[0].infos == {
+            'title': "Title_1",
+            'facebook': "#",
+            'style': "jazzapapa",
+            'free': "true",
+            'picture': "#",
+        }
+
+        Concert.query.delete()
+        DB_ORM.session.commit()
+
 # --------------------- #
 # Product Syncher tests #
 # --------------------- #
@@ -222,7 +341,7 @@ def test_sync_products_success(
         ],
     ]
 
-    created_products, updated_products = ProductSyncher.sync_products()
+    created_products, updated_products = ProductSyncher.sync_products(company_id=1)
 
     mocked_get_remote_products.assert_called_once_with()
 
@@ -237,6 +356,7 @@ def test_sync_products_success(
 
     assert created_products == [remote_product]
     assert updated_products == []
+    assert remote_product.company_id == 1
 
 
 @patch("project.synchers.requests")
@@ -500,8 +620,9 @@ def test_get_remote_products_error_in_initial_request(
     assert expected_raise_for_status_calls == mocked_raise_for_status_method.call_args_list
 
 
-def test_batch_update_products_from_products_success():
+def test_batch_update_products_from_products_success(app: Flask):
     existing_product_1 = Product(
+        company_id=get_company_id(),
         uniq_id_product='existing_id_1',
         product_name='product_name_1',
         product_price=1.5,
@@ -517,6 +638,7 @@ def test_batch_update_products_from_products_success():
         removed=False,
     )
     existing_product_2 = Product(
+        company_id=get_company_id(),
         uniq_id_product='existing_id_2',
         product_name='product_name_2',
         product_price=1.5,
@@ -536,6 +658,7 @@ def test_batch_update_products_from_products_success():
     DB_ORM.session.commit()
 
     remote_product_1 = Product(  # Has changed
+        company_id=get_company_id(),
         uniq_id_product='existing_id_1',
         product_name='product_name_1',
         product_price=4,  # Changed
@@ -551,6 +674,7 @@ def test_batch_update_products_from_products_success():
         removed=False,
     )
     remote_product_2 = Product(  # Has not changed
+        company_id=get_company_id(),
         uniq_id_product='existing_id_2',
         product_name='product_name_2',
         product_price=1.5,
@@ -566,6 +690,7 @@ def test_batch_update_products_from_products_success():
         removed=False,
     )
     remote_product_3 = Product(  # Is new
+        company_id=get_company_id(),
         uniq_id_product='existing_id_3',
         product_name='product_name_3',
         product_price=1.5,
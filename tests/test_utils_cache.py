@@ -0,0 +1,151 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from utils.cache import BaseCache, FileSystemCache, LRUCache, TTLCache, build_cache
+
+
+def test_base_cache_error_abstract():
+    class IncompleteCache(BaseCache):
+        def get(self, key, default=None):
+            return default
+
+    with pytest.raises(TypeError):
+        BaseCache()
+    with pytest.raises(TypeError):
+        IncompleteCache()
+
+
+def test_lru_cache_get_set_success():
+    cache = LRUCache(maxsize=2)
+
+    cache.set("foo", 1)
+    cache.set("bar", 2)
+
+    assert cache.get("foo") == 1
+    assert cache.get("bar") == 2
+    assert cache.get("baz") is None
+    assert cache.get("baz", "default") == "default"
+    assert len(cache) == 2
+
+
+def test_lru_cache_set_success_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+
+    cache.set("foo", 1)
+    cache.set("bar", 2)
+    # Reading "foo" makes "bar" the least recently used entry
+    cache.get("foo")
+    cache.set("baz", 3)
+
+    assert "foo" in cache
+    assert "bar" not in cache
+    assert "baz" in cache
+    assert len(cache) == 2
+
+
+def test_lru_cache_delete_clear_success():
+    cache = LRUCache(maxsize=2)
+    cache.set("foo", 1)
+    cache.set("bar", 2)
+
+    cache.delete("foo")
+    cache.delete("not cached")
+
+    assert "foo" not in cache
+    assert len(cache) == 1
+
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_filesystem_cache_get_set_delete_success(tmp_path):
+    cache = FileSystemCache(directory=str(tmp_path), maxsize=2)
+
+    cache.set(("service", 1, 1), {"CA": 18})
+    cache.set(("service", 2, 1), {"CA": 20})
+
+    assert cache.get(("service", 1, 1)) == {"CA": 18}
+    assert cache.get(("service", 3, 1)) is None
+    # Entries are shared by every cache of the directory
+    assert FileSystemCache(directory=str(tmp_path)).get(("service", 2, 1)) == {"CA": 20}
+
+    cache.delete(("service", 1, 1))
+
+    assert ("service", 1, 1) not in cache
+    assert len(cache) == 1
+
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_filesystem_cache_set_success_evicts_oldest_entries(tmp_path):
+    cache = FileSystemCache(directory=str(tmp_path), maxsize=2)
+
+    for key in ("foo", "bar", "baz"):
+        cache.set(key, key)
+
+    assert len(cache) == 2
+    assert "baz" in cache
+
+
+def test_filesystem_cache_set_success_lists_entries_only_to_evict(tmp_path):
+    cache = FileSystemCache(directory=str(tmp_path), maxsize=3)
+    cache.set("foo", "foo")
+
+    with patch("utils.cache.os.listdir", wraps=os.listdir) as mocked_listdir:
+        cache.set("bar", "bar")
+        cache.set("bar", "bar")
+        cache.set("baz", "baz")
+
+        assert mocked_listdir.call_count == 0
+
+        cache.set("qux", "qux")
+
+        assert mocked_listdir.call_count == 1
+    assert len(cache) == 3
+
+
+def test_filesystem_cache_set_success_entry_removed_while_evicting(tmp_path):
+    cache = FileSystemCache(directory=str(tmp_path), maxsize=1)
+    cache.set("foo", "foo")
+    removed_path = cache._path("foo")
+    stat = os.stat
+
+    def stat_removed_entry(path, *args, **kwargs):
+        # Another process removes the entry between the listing and its stat
+        if path == removed_path:
+            os.remove(path)
+        return stat(path, *args, **kwargs)
+
+    with patch("utils.cache.os.stat", side_effect=stat_removed_entry):
+        cache.set("bar", "bar")
+
+    assert "bar" in cache
+    assert len(cache) == 1
+
+
+def test_build_cache_success(tmp_path):
+    assert isinstance(build_cache("memory", maxsize=2), LRUCache)
+    assert isinstance(build_cache("filesystem", maxsize=2, directory=str(tmp_path)), FileSystemCache)
+
+    with pytest.raises(ValueError):
+        build_cache("redis", maxsize=2)
+
+
+@patch("utils.cache.time.monotonic")
+def test_ttl_cache_get_success_drops_expired_entries(mocked_monotonic):
+    cache = TTLCache(maxsize=2, ttl=60)
+    mocked_monotonic.return_value = 1000
+    cache.set("foo", 1)
+
+    mocked_monotonic.return_value = 1059
+    assert cache.get("foo") == 1
+    assert "foo" in cache
+
+    mocked_monotonic.return_value = 1060
+    assert cache.get("foo", "default") == "default"
+    assert "foo" not in cache
+    assert len(cache) == 0
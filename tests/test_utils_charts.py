@@ -0,0 +1,80 @@
+from xml.etree import ElementTree
+
+from utils.charts import chart_digest, render_bar_chart_svg, render_heatmap_svg, render_pie_chart_svg
+
+SVG_NAMESPACE = "{http://www.w3.org/2000/svg}"
+
+
+def test_render_pie_chart_svg_success():
+    svg = render_pie_chart_svg(
+        {"Blonde pinte": 3, "SOFT <verse>": 1, "Not sold": 0},
+        title="LIQUIDES HT (TOP 5)",
+        center_label="12.0 €",
+    )
+
+    document = ElementTree.fromstring(svg)
+    assert document.get("viewBox") == "0 0 400 200"
+    assert len(document.findall(f"{SVG_NAMESPACE}path")) == 2
+    texts = ["".join(text.itertext()) for text in document.findall(f"{SVG_NAMESPACE}text")]
+    assert texts == [
+        "LIQUIDES HT (TOP 5)",
+        "■ Blonde pinte",
+        "3",
+        "■ SOFT <verse>",
+        "1",
+        "12.0 €",
+    ]
+    assert svg == render_pie_chart_svg(
+        {"Blonde pinte": 3, "SOFT <verse>": 1, "Not sold": 0},
+        title="LIQUIDES HT (TOP 5)",
+        center_label="12.0 €",
+    )
+
+
+def test_render_pie_chart_svg_success_single_and_no_value():
+    single = ElementTree.fromstring(render_pie_chart_svg({"Blonde pinte": 2}, title="Top"))
+    assert len(single.findall(f"{SVG_NAMESPACE}circle")) == 1
+    assert single.findall(f"{SVG_NAMESPACE}path") == []
+
+    empty = ElementTree.fromstring(render_pie_chart_svg({}, title="Top"))
+    assert ["".join(text.itertext()) for text in empty.findall(f"{SVG_NAMESPACE}text")] == ["Top"]
+
+
+def test_render_bar_chart_svg_success():
+    document = ElementTree.fromstring(render_bar_chart_svg(
+        [("20h", 7.5), ("21h", 0), ("22h", 15)],
+        title="CA HT PAR HEURE",
+        labels_every=2,
+    ))
+
+    bars = document.findall(f"{SVG_NAMESPACE}rect")
+    assert [bar.find(f"{SVG_NAMESPACE}title").text for bar in bars] == ["20h : 7.5", "21h : 0", "22h : 15"]
+    # The greatest value takes the whole height of the plot
+    assert [float(bar.get("height")) for bar in bars] == [75, 0, 150]
+    assert ["".join(text.itertext()) for text in document.findall(f"{SVG_NAMESPACE}text")] == [
+        "CA HT PAR HEURE",
+        "20h",
+        "22h",
+    ]
+
+
+def test_render_heatmap_svg_success():
+    document = ElementTree.fromstring(render_heatmap_svg(
+        rows=["Lun", "Mar"],
+        columns=["0h", "1h", "2h"],
+        values=[[0, 2, 4], [1, 0, 0]],
+        title="CA",
+    ))
+
+    cells = document.findall(f"{SVG_NAMESPACE}rect")
+    assert len(cells) == 6
+    assert [cell.get("fill-opacity") for cell in cells] == ["0.00", "0.50", "1.00", "0.25", "0.00", "0.00"]
+    assert cells[2].find(f"{SVG_NAMESPACE}title").text == "Lun 2h : 4"
+
+
+def test_chart_digest_success():
+    chart_arguments = {"values": [["Blonde pinte", 3], ["SOFT verse", 1]], "title": "Top"}
+
+    assert chart_digest(chart_arguments) == chart_digest(dict(reversed(list(chart_arguments.items()))))
+    assert chart_digest(chart_arguments) != chart_digest({**chart_arguments, "values": [["Blonde pinte", 3]]})
+    assert len(chart_digest(chart_arguments)) == 16
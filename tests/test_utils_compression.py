@@ -0,0 +1,27 @@
+import pytest
+from utils.compression import RAW_MARKER, ZLIB_MARKER, compress_json, decompress_json
+
+TIMELINE = {
+    f"2022-01-15 20:{minute:02}:00": [5.5, 2.0]
+    for minute in range(60)
+}
+
+
+def test_compress_json_success_compresses_above_threshold():
+    payload = compress_json(TIMELINE, threshold=1024)
+
+    assert payload[:1] == ZLIB_MARKER
+    assert len(payload) < len(str(TIMELINE))
+    assert decompress_json(payload) == TIMELINE
+
+
+def test_compress_json_success_keeps_small_payloads_raw():
+    payload = compress_json({"Frites": 1}, threshold=1024)
+
+    assert payload == RAW_MARKER + b'{"Frites":1}'
+    assert decompress_json(memoryview(payload)) == {"Frites": 1}
+
+
+def test_decompress_json_error_unknown_marker():
+    with pytest.raises(ValueError):
+        decompress_json(b'{"Frites":1}')
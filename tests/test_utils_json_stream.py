@@ -0,0 +1,81 @@
+from utils.json_stream import iter_json_array, iter_ndjson
+
+
+def chunked(payload: bytes, chunk_size: int):
+    return [payload[index:index + chunk_size] for index in range(0, len(payload), chunk_size)]
+
+
+def test_iter_ndjson_success_reports_invalid_lines():
+    lines = [b'{"CA": 1}\n', b'\n', b'{"CA": \n', b'[1, 2]\n', b'"\xff"\n']
+
+    assert list(iter_ndjson(lines)) == [
+        (1, {"CA": 1}, None),
+        (3, None, "Invalid JSON: Expecting value"),
+        (4, [1, 2], None),
+        (5, None, "The line is not UTF-8 encoded"),
+    ]
+
+
+def test_iter_json_array_success_values_across_chunks():
+    payload = ' [{"product": "Bière"}, 12345, "a, b",\n true ] '.encode()
+
+    # Every split of the values, including numbers and multi-byte characters, is read the same
+    for chunk_size in (1, 2, 3, 7, len(payload)):
+        assert list(iter_json_array(chunked(payload, chunk_size))) == [
+            (1, {"product": "Bière"}, None),
+            (2, 12345, None),
+            (3, "a, b", None),
+            (4, True, None),
+        ]
+
+
+def test_iter_json_array_success_numbers_and_escapes_across_chunks():
+    payload = b'[-1.5e3, "\\u00e9t\\u00e9", null, -Infinity]'
+
+    for chunk_size in range(1, len(payload) + 1):
+        assert list(iter_json_array(chunked(payload, chunk_size))) == [
+            (1, -1500.0, None),
+            (2, "été", None),
+            (3, None, None),
+            (4, float("-inf"), None),
+        ]
+
+
+def test_iter_json_array_success_empty_array():
+    assert list(iter_json_array([b"[", b" ]"])) == []
+
+
+def test_iter_json_array_error_not_an_array():
+    assert list(iter_json_array([b'{"CA": 1}'])) == [(0, None, "Expected a JSON array")]
+
+
+def test_iter_json_array_error_stops_at_syntax_error():
+    rows = list(iter_json_array(chunked(b'[{"CA": 1}, {"CA": 2', 4)))
+
+    assert rows[0] == (1, {"CA": 1}, None)
+    assert rows[1][:2] == (2, None)
+    assert rows[1][2].startswith("Invalid JSON")
+    assert len(rows) == 2
+
+
+def test_iter_json_array_error_missing_separator():
+    assert list(iter_json_array([b'[1 2]'])) == [
+        (1, 1, None),
+        (2, None, "Invalid JSON: expected ',' or ']' after a value of the array"),
+    ]
+
+
+def test_iter_json_array_error_reported_without_reading_the_rest():
+    read_chunks = []
+
+    def chunks():
+        yield b'[{"CA": 1}, {"CA": bad}'
+        for index in range(100):
+            read_chunks.append(index)
+            yield b', {"CA": 1}'
+        yield b']'
+
+    rows = list(iter_json_array(chunks()))
+
+    assert rows == [(1, {"CA": 1}, None), (2, None, "Invalid JSON: Expecting value")]
+    assert read_chunks == []
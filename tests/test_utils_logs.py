@@ -0,0 +1,64 @@
+import atexit
+import logging
+import threading
+from unittest.mock import MagicMock
+
+from utils.logs import LazyLogValue, LazyQueueHandler, start_queue_logging
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = []
+        self.threads = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+        self.threads.append(threading.current_thread())
+
+
+def test_lazy_log_value_success_not_computed_when_level_disabled():
+    logger = logging.getLogger("test_utils_logs.disabled")
+    logger.setLevel(logging.WARNING)
+    compute = MagicMock(return_value="payload")
+
+    logger.info("Added 1 service", extra={"service_data": LazyLogValue(compute)})
+    logger.debug("Data of the added service: %s", LazyLogValue(compute))
+
+    compute.assert_not_called()
+
+
+def test_lazy_log_value_success_computed_once():
+    compute = MagicMock(return_value=[1, 2])
+    lazy_value = LazyLogValue(compute)
+
+    assert str(lazy_value) == "[1, 2]"
+    assert repr(lazy_value) == "[1, 2]"
+    compute.assert_called_once_with()
+
+
+def test_start_queue_logging_success_emits_from_listener_thread():
+    logger = logging.getLogger("test_utils_logs.queue")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    former_handler = logging.NullHandler()
+    logger.addHandler(former_handler)
+    handler = RecordingHandler()
+
+    listener = start_queue_logging(logger, handler=handler)
+    # Already started on this logger
+    assert start_queue_logging(logger, handler=RecordingHandler()) is listener
+    assert [type(logger_handler) for logger_handler in logger.handlers] == [LazyQueueHandler]
+
+    logger.info("Updated %s products", 2, extra={"product_ids": LazyLogValue(lambda: [1, 2])})
+    logger.info("Ids of the updated products: %s", LazyLogValue(lambda: [1, 2]))
+    listener.stop()
+    atexit.unregister(listener.stop)
+
+    extra_record, argument_record = handler.records
+    assert extra_record.getMessage() == "Updated 2 products"
+    # Computed on the logging thread, the listener only gets the value
+    assert extra_record.product_ids == [1, 2]
+    assert argument_record.getMessage() == "Ids of the updated products: [1, 2]"
+    assert handler.threads[0] is not threading.current_thread()
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+import pytest
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def test_encode_decode_cursor_success():
+    cursor = encode_cursor(datetime(2022, 1, 15, 20, 30), 42)
+
+    assert cursor == "2022-01-15T20:30:00_42"
+    assert decode_cursor(cursor) == (datetime(2022, 1, 15, 20, 30), 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "42", "2022-01-15_foo", "not a date_42"])
+def test_decode_cursor_error_invalid_cursor(cursor: str):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,61 @@
+from datetime import date, datetime
+
+from flask import Flask
+from sqlalchemy import text
+from utils.partitions import (
+    add_months,
+    create_default_partition,
+    create_month_partitions,
+    detach_month_partition,
+    list_partitions,
+    month_partition_name
+)
+
+from .conftest import DB_ORM
+
+
+def test_add_months_success():
+    assert add_months(date(2022, 11, 1), 1) == date(2022, 12, 1)
+    assert add_months(date(2022, 12, 1), 1) == date(2023, 1, 1)
+    assert add_months(date(2022, 1, 1), -1) == date(2021, 12, 1)
+    assert month_partition_name("service", date(2022, 1, 1)) == "service_y2022m01"
+
+
+def test_create_month_partitions_success_moves_default_rows(app: Flask):
+    with app.app_context():
+        connection = DB_ORM.session.connection()
+        connection.execute(text("CREATE TABLE foo_event (id int, date timestamp) PARTITION BY RANGE (date)"))
+        create_default_partition(connection, "foo_event")
+        connection.execute(text(
+            "INSERT INTO foo_event VALUES (1, '2022-01-15 20:00'), (2, '2022-02-01 00:00'), (3, '2022-04-01')"
+        ))
+
+        created_partitions = create_month_partitions(
+            connection,
+            table_name="foo_event",
+            column_name="date",
+            first_month=date(2022, 1, 10),
+            last_month=date(2022, 2, 1),
+        )
+
+        assert created_partitions == ["foo_event_y2022m01", "foo_event_y2022m02"]
+        assert [name for name, _ in list_partitions(connection, "foo_event")] == [
+            "foo_event_default",
+            "foo_event_y2022m01",
+            "foo_event_y2022m02",
+        ]
+        assert connection.execute(text("SELECT id FROM foo_event_y2022m02")).scalars().all() == [2]
+        assert connection.execute(text("SELECT id FROM foo_event_default")).scalars().all() == [3]
+        # Existing partitions are skipped
+        assert create_month_partitions(
+            connection, "foo_event", "date", date(2022, 1, 1), date(2022, 3, 1),
+        ) == ["foo_event_y2022m03"]
+
+        assert detach_month_partition(connection, "foo_event", date(2022, 1, 1)) == "foo_event_y2022m01"
+
+        assert connection.execute(text("SELECT id FROM foo_event ORDER BY id")).scalars().all() == [2, 3]
+        assert connection.execute(text("SELECT date FROM foo_event_y2022m01")).scalars().all() == [
+            datetime(2022, 1, 15, 20),
+        ]
+
+        DB_ORM.session.rollback()
@@ -0,0 +1,42 @@
+import io
+from datetime import datetime
+
+import pyarrow.parquet
+from utils.table_stream import iter_csv_chunks, iter_parquet_chunks
+
+COLUMNS = (('id', 'int64'), ('date', 'timestamp'), ('CA', 'float64'), ('concert', 'string'))
+BATCHES = [
+    [(1, datetime(2022, 1, 15, 20), 18.5, 'Sans concert'), (2, datetime(2022, 1, 16), 4.0, None)],
+    [],
+    [(3, datetime(2022, 1, 17), 0.0, 'Jazz, "live"')],
+]
+
+
+def test_iter_csv_chunks_success_one_chunk_per_batch():
+    chunks = list(iter_csv_chunks(COLUMNS, BATCHES))
+
+    assert len(chunks) == 3
+    assert b"".join(chunks).decode().splitlines() == [
+        'id,date,CA,concert',
+        '1,2022-01-15 20:00:00,18.5,Sans concert',
+        '2,2022-01-16 00:00:00,4.0,',
+        '3,2022-01-17 00:00:00,0.0,"Jazz, ""live"""',
+    ]
+
+
+def test_iter_parquet_chunks_success_one_row_group_per_batch():
+    parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(b"".join(iter_parquet_chunks(COLUMNS, BATCHES))))
+
+    assert parquet_file.metadata.num_row_groups == 2
+    assert parquet_file.read().to_pylist() == [
+        {'id': 1, 'date': datetime(2022, 1, 15, 20), 'CA': 18.5, 'concert': 'Sans concert'},
+        {'id': 2, 'date': datetime(2022, 1, 16), 'CA': 4.0, 'concert': None},
+        {'id': 3, 'date': datetime(2022, 1, 17), 'CA': 0.0, 'concert': 'Jazz, "live"'},
+    ]
+
+
+def test_iter_parquet_chunks_success_no_rows():
+    parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(b"".join(iter_parquet_chunks(COLUMNS, []))))
+
+    assert parquet_file.read().num_rows == 0
+    assert parquet_file.schema_arrow.names == ['id', 'date', 'CA', 'concert']
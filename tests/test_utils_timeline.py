@@ -0,0 +1,134 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from utils.timeline import TimeBuckets, TimelineIndex, weekday_hour_heatmap
+
+TEST_TIMELINE = {
+    "2022-01-15 23:45:00": [4.0],
+    "2022-01-15 20:00:00": [5.5, 2.0],
+    "2022-01-15 21:15:00": [6.5],
+}
+
+
+def test_timeline_index_from_timeline_success():
+    timeline_index = TimelineIndex.from_timeline(TEST_TIMELINE)
+
+    assert len(timeline_index) == 3
+    assert list(timeline_index.timestamps) == [
+        np.datetime64("2022-01-15T20:00:00"),
+        np.datetime64("2022-01-15T21:15:00"),
+        np.datetime64("2022-01-15T23:45:00"),
+    ]
+    assert list(timeline_index.cumulative_amounts) == [0, 7.5, 14, 18]
+
+
+@pytest.mark.parametrize(
+    "start, end, expected_revenue",
+    [
+        (datetime(2022, 1, 15, 19), datetime(2022, 1, 16, 2), 18),
+        (datetime(2022, 1, 15, 19), datetime(2022, 1, 15, 22), 14),
+        (datetime(2022, 1, 15, 21), datetime(2022, 1, 15, 22), 6.5),
+        # Bounds are excluded
+        (datetime(2022, 1, 15, 20), datetime(2022, 1, 15, 23, 45), 6.5),
+        (datetime(2022, 1, 15, 22), datetime(2022, 1, 15, 23), 0),
+        (datetime(2022, 1, 16, 2), datetime(2022, 1, 15, 19), 0),
+    ]
+)
+def test_timeline_index_revenue_between_success(start: datetime, end: datetime, expected_revenue: float):
+    timeline_index = TimelineIndex.from_timeline(TEST_TIMELINE)
+
+    assert timeline_index.revenue_between(start=start, end=end) == expected_revenue
+
+
+def test_timeline_index_to_bytes_from_bytes_success():
+    timeline_index = TimelineIndex.from_timeline(TEST_TIMELINE)
+
+    raw_timeline_index = timeline_index.to_bytes()
+    loaded_timeline_index = TimelineIndex.from_bytes(raw_timeline_index)
+
+    assert len(raw_timeline_index) == 3 * 8 + 4 * 8
+    assert list(loaded_timeline_index.timestamps) == list(timeline_index.timestamps)
+    assert list(loaded_timeline_index.cumulative_amounts) == list(timeline_index.cumulative_amounts)
+
+
+def test_timeline_index_success_empty_timeline():
+    timeline_index = TimelineIndex.from_bytes(TimelineIndex.from_timeline({}).to_bytes())
+
+    assert len(timeline_index) == 0
+    assert timeline_index.revenue_between(
+        start=datetime(2022, 1, 15),
+        end=datetime(2022, 1, 16),
+    ) == 0
+
+
+def test_timeline_index_error_inconsistent_arrays():
+    with pytest.raises(ValueError) as excinfo:
+        TimelineIndex(
+            timestamps=np.array(["2022-01-15T20:00:00"], dtype="datetime64[s]"),
+            cumulative_amounts=np.array([1.0]),
+        )
+
+    assert "Expected 2 cumulative amounts, got 1" in str(excinfo.value)
+
+
+def test_time_buckets_from_timeline_index_success():
+    time_buckets = TimeBuckets.from_timeline_index(TimelineIndex.from_timeline(TEST_TIMELINE))
+
+    assert time_buckets.start == np.datetime64("2022-01-15T20:00:00").astype(np.int64)
+    assert time_buckets.per_15_minutes()[:2] == [
+        (datetime(2022, 1, 15, 20), 7.5),
+        (datetime(2022, 1, 15, 20, 15), 0),
+    ]
+    assert len(time_buckets.per_15_minutes()) == 16
+    assert time_buckets.per_hour() == [
+        (datetime(2022, 1, 15, 20), 7.5),
+        (datetime(2022, 1, 15, 21), 6.5),
+        (datetime(2022, 1, 15, 22), 0),
+        (datetime(2022, 1, 15, 23), 4),
+    ]
+
+
+def test_time_buckets_per_hour_success_start_within_an_hour():
+    time_buckets = TimeBuckets.from_timeline_index(TimelineIndex.from_timeline({
+        "2022-01-15 23:50:00": [4.0],
+        "2022-01-16 00:05:00": [1.0],
+        "2022-01-15 23:30:00": [2.0],
+    }))
+
+    assert time_buckets.per_hour() == [
+        (datetime(2022, 1, 15, 23), 6),
+        (datetime(2022, 1, 16, 0), 1),
+    ]
+
+
+def test_time_buckets_to_bytes_success():
+    time_buckets = TimeBuckets.from_timeline_index(TimelineIndex.from_timeline(TEST_TIMELINE))
+
+    raw_time_buckets = time_buckets.to_bytes()
+    loaded_time_buckets = TimeBuckets.from_bytes(raw_time_buckets)
+
+    assert len(raw_time_buckets) == 8 + 16 * 8
+    assert loaded_time_buckets.start == time_buckets.start
+    assert list(loaded_time_buckets.amounts) == list(time_buckets.amounts)
+
+
+def test_time_buckets_success_empty_timeline():
+    time_buckets = TimeBuckets.from_bytes(TimeBuckets.from_timeline_index(TimelineIndex.from_timeline({})).to_bytes())
+
+    assert time_buckets.per_15_minutes() == []
+    assert time_buckets.per_hour() == []
+
+
+def test_weekday_hour_heatmap_success():
+    saturday_buckets = TimeBuckets.from_timeline_index(TimelineIndex.from_timeline(TEST_TIMELINE))
+    sunday_buckets = TimeBuckets.from_timeline_index(TimelineIndex.from_timeline({"2022-01-16 20:10:00": [3.0]}))
+
+    heatmap = weekday_hour_heatmap(iter([saturday_buckets, saturday_buckets, sunday_buckets]))
+
+    assert heatmap.shape == (7, 24)
+    assert heatmap[5, 20] == 15
+    assert heatmap[5, 21] == 13
+    assert heatmap[5, 23] == 8
+    assert heatmap[6, 20] == 3
+    assert heatmap.sum() == 39
@@ -0,0 +1,25 @@
+from utils.utils import count_elements, list_to_element_counted_and_sorted_dict, top_k
+
+DRINKS = ["Pinte IPA", "Blonde pinte", "SOFT verse", "Blonde pinte", "Pinte IPA", "Blonde pinte", "SPRITZ"]
+
+
+def test_count_elements_success_from_generator():
+    counts = count_elements(drink for drink in DRINKS if drink != "SPRITZ")
+
+    assert counts == {"Pinte IPA": 2, "Blonde pinte": 3, "SOFT verse": 1}
+
+
+def test_top_k_success():
+    counts = count_elements(DRINKS)
+
+    # Equal counts keep the order they were first counted in
+    assert top_k(counts) == [("Blonde pinte", 3), ("Pinte IPA", 2), ("SOFT verse", 1), ("SPRITZ", 1)]
+    assert top_k(counts, 3) == [("Blonde pinte", 3), ("Pinte IPA", 2), ("SOFT verse", 1)]
+    assert top_k(counts, 10) == top_k(counts)
+    assert top_k({}, 5) == []
+
+
+def test_list_to_element_counted_and_sorted_dict_success():
+    result = list_to_element_counted_and_sorted_dict(DRINKS)
+
+    assert list(result.items()) == [("Blonde pinte", 3), ("Pinte IPA", 2), ("SOFT verse", 1), ("SPRITZ", 1)]
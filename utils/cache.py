@@ -0,0 +1,208 @@
+# cache.py
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+class BaseCache(ABC):
+    """
+        Interface of the cache backends, a mapping of hashable keys to picklable values.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def __contains__(self, key: Hashable) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class LRUCache(BaseCache):
+    """
+        In-process mapping keeping at most `maxsize` entries,
+        the least recently used entry is dropped first.
+        Safe to share between the threads of a worker.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class TTLCache(LRUCache):
+    """
+        LRUCache whose entries are also dropped `ttl` seconds after they were set,
+        for values that may be changed by other processes.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60) -> None:
+        super().__init__(maxsize=maxsize)
+        self.ttl = ttl
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        entry = super().get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self.delete(key)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        super().set(key, (time.monotonic() + self.ttl, value))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return BaseCache.__contains__(self, key)
+
+
+class FileSystemCache(BaseCache):
+    """
+        Cache storing one pickle file per entry in `directory`, shared by the processes of a host.
+        When more than `maxsize` entries are stored, the least recently written ones are dropped.
+        Entries written by other processes are counted at the next eviction, the directory may briefly hold more.
+    """
+    FILE_SUFFIX = ".cache"
+
+    def __init__(self, directory: str, maxsize: int = 1024) -> None:
+        self.directory = directory
+        self.maxsize = maxsize
+        # Entries counted when the directory was last listed plus the ones added since by this process,
+        # the directory is only listed again once it may hold more than `maxsize` entries
+        self._size: Optional[int] = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: Hashable) -> str:
+        key_digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, key_digest + self.FILE_SUFFIX)
+
+    def _entry_paths(self):
+        return [
+            os.path.join(self.directory, file_name)
+            for file_name in os.listdir(self.directory)
+            if file_name.endswith(self.FILE_SUFFIX)
+        ]
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        try:
+            with open(self._path(key), "rb") as entry_file:
+                return pickle.load(entry_file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        entry_path = self._path(key)
+        is_new_entry = not os.path.exists(entry_path)
+        # Written aside then renamed, so readers never see a partial entry
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(file_descriptor, "wb") as entry_file:
+            pickle.dump(value, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, entry_path)
+
+        if self._size is None:
+            self._size = len(self._entry_paths())
+        elif is_new_entry:
+            self._size += 1
+        if self._size > self.maxsize:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for entry_path in self._entry_paths():
+            try:
+                entries.append((os.stat(entry_path).st_mtime_ns, entry_path))
+            except OSError:
+                # Removed by another process since the listing
+                continue
+        entries.sort()
+        for _, entry_path in entries[:len(entries) - self.maxsize]:
+            self._remove(entry_path)
+        self._size = min(len(entries), self.maxsize)
+
+    def delete(self, key: Hashable) -> None:
+        if self._remove(self._path(key)) and self._size:
+            self._size -= 1
+
+    def clear(self) -> None:
+        for entry_path in self._entry_paths():
+            self._remove(entry_path)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entry_paths())
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+
+def build_cache(backend: str, maxsize: int, directory: Optional[str] = None) -> BaseCache:
+    """
+        Cache of the given backend: 'memory' (LRUCache, per process) or 'filesystem' (FileSystemCache)
+    """
+    if backend == "memory":
+        return LRUCache(maxsize=maxsize)
+    if backend == "filesystem":
+        if not directory:
+            raise ValueError("The filesystem cache backend needs a directory")
+        return FileSystemCache(directory=directory, maxsize=maxsize)
+    raise ValueError(f"Unknown cache backend {backend!r}, expected 'memory' or 'filesystem'")
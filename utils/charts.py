@@ -0,0 +1,187 @@
+# charts.py
+'''
+    Charts rendered as SVG documents, small enough to be served by the app itself.
+'''
+
+import hashlib
+import json
+import math
+from typing import Any, List, Mapping, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+# Part of the digest of every chart, to bump when the rendering changes so that charts get new URLs
+CHARTS_RENDERING_VERSION = 1
+# Colors of the slices, in the order of the values
+PIE_CHART_COLORS = ('#3e95cd', '#8e5ea2', '#3cba9f', '#e8c3b9', '#c45850', '#f4b400', '#5c6bc0', '#8d6e63')
+
+
+def _number(value: float) -> str:
+    # Coordinates with one decimal, without the trailing zeros, keep the document small
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def _point(center: Tuple[float, float], radius: float, angle: float) -> str:
+    return f"{_number(center[0] + radius * math.cos(angle))} {_number(center[1] + radius * math.sin(angle))}"
+
+
+def _svg_document(width: int, height: int, elements: List[str]) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}"'
+        f' viewBox="0 0 {width} {height}" font-family="sans-serif">'
+        + "".join(elements)
+        + '</svg>'
+    )
+
+
+def _donut_slice_path(center: Tuple[float, float], radius: float, inner_radius: float, start: float, end: float) -> str:
+    large_arc = 1 if end - start > math.pi else 0
+    return (
+        f"M{_point(center, radius, start)}"
+        f"A{_number(radius)} {_number(radius)} 0 {large_arc} 1 {_point(center, radius, end)}"
+        f"L{_point(center, inner_radius, end)}"
+        f"A{_number(inner_radius)} {_number(inner_radius)} 0 {large_arc} 0 {_point(center, inner_radius, start)}Z"
+    )
+
+
+def render_pie_chart_svg(
+    values: Mapping[str, float],
+    title: str,
+    center_label: str = "",
+    width: int = 400,
+    height: int = 200,
+) -> str:
+    '''
+        A donut chart of `values` (name: value), with its legend on the left,
+        each value written on its slice and `center_label` in the hole.
+        The same arguments always give the same document.
+    '''
+    slices = [(str(name), value) for name, value in values.items() if value > 0]
+    total = sum(value for _, value in slices)
+    center = (width * 0.7, height / 2 + 10)
+    radius = min(width * 0.3, height / 2 - 20) - 5
+    inner_radius = radius * 0.55
+
+    elements: List[str] = [
+        f'<text x="{_number(width / 2)}" y="16" font-size="13" font-weight="bold" text-anchor="middle">'
+        f'{escape(title)}</text>'
+    ]
+    start = -math.pi / 2
+    for index, (name, value) in enumerate(slices):
+        color = PIE_CHART_COLORS[index % len(PIE_CHART_COLORS)]
+        end = start + 2 * math.pi * value / total
+        if len(slices) == 1:
+            # An arc cannot start and end on the same point, a single slice is a ring
+            elements.append(
+                f'<circle cx="{_number(center[0])}" cy="{_number(center[1])}" r="{_number((radius + inner_radius) / 2)}"'
+                f' fill="none" stroke="{color}" stroke-width="{_number(radius - inner_radius)}"/>'
+            )
+        else:
+            elements.append(
+                f'<path d="{_donut_slice_path(center, radius, inner_radius, start, end)}" fill="{color}"/>'
+            )
+        elements.append(
+            f'<text x="{_number(10)}" y="{_number(45 + 20 * index)}" font-size="11">'
+            f'<tspan fill="{color}">&#9632;</tspan> {escape(name)}</text>'
+        )
+        label_position = _point(center, (radius + inner_radius) / 2, (start + end) / 2).split()
+        elements.append(
+            f'<text x="{label_position[0]}" y="{label_position[1]}" font-size="10" fill="#fff"'
+            f' text-anchor="middle" dominant-baseline="middle">{escape(_number(value))}</text>'
+        )
+        start = end
+
+    if center_label:
+        elements.append(
+            f'<text x="{_number(center[0])}" y="{_number(center[1])}" font-size="12"'
+            f' text-anchor="middle" dominant-baseline="middle">{escape(center_label)}</text>'
+        )
+
+    return _svg_document(width, height, elements)
+
+
+def render_bar_chart_svg(
+    bars: Sequence[Tuple[str, float]],
+    title: str,
+    width: int = 400,
+    height: int = 200,
+    labels_every: int = 1,
+) -> str:
+    '''
+        A histogram of `bars` (label, value) from left to right, one label under every `labels_every` bars.
+        Each bar tells its label and value when hovered.
+    '''
+    top, bottom, left = 30, 20, 10
+    max_value = max((value for _, value in bars), default=0) or 1
+    bar_width = (width - 2 * left) / max(len(bars), 1)
+    plot_height = height - top - bottom
+
+    elements: List[str] = [
+        f'<text x="{_number(width / 2)}" y="16" font-size="13" font-weight="bold" text-anchor="middle">'
+        f'{escape(title)}</text>',
+        f'<line x1="{left}" y1="{height - bottom}" x2="{width - left}" y2="{height - bottom}" stroke="#999"/>',
+    ]
+    for index, (label, value) in enumerate(bars):
+        bar_height = plot_height * max(value, 0) / max_value
+        x = left + index * bar_width
+        elements.append(
+            f'<rect x="{_number(x + bar_width * 0.1)}" y="{_number(height - bottom - bar_height)}"'
+            f' width="{_number(bar_width * 0.8)}" height="{_number(bar_height)}" fill="{PIE_CHART_COLORS[0]}">'
+            f'<title>{escape(label)} : {escape(_number(value))}</title></rect>'
+        )
+        if index % labels_every == 0:
+            elements.append(
+                f'<text x="{_number(x + bar_width / 2)}" y="{height - 5}" font-size="9" text-anchor="middle">'
+                f'{escape(label)}</text>'
+            )
+
+    return _svg_document(width, height, elements)
+
+
+def render_heatmap_svg(
+    rows: Sequence[str],
+    columns: Sequence[str],
+    values: Sequence[Sequence[float]],
+    title: str,
+    cell_size: int = 16,
+) -> str:
+    '''
+        A grid of `values[row][column]` from white (0) to the darkest color (the greatest value),
+        each cell tells its row, column and value when hovered.
+    '''
+    top, left = 40, 40
+    width = left + cell_size * len(columns) + 10
+    height = top + cell_size * len(rows) + 10
+    max_value = max((value for row_values in values for value in row_values), default=0) or 1
+
+    elements: List[str] = [
+        f'<text x="{_number(width / 2)}" y="16" font-size="13" font-weight="bold" text-anchor="middle">'
+        f'{escape(title)}</text>'
+    ]
+    for column_index, column in enumerate(columns):
+        elements.append(
+            f'<text x="{_number(left + cell_size * (column_index + 0.5))}" y="{top - 5}" font-size="8"'
+            f' text-anchor="middle">{escape(column)}</text>'
+        )
+    for row_index, (row, row_values) in enumerate(zip(rows, values)):
+        y = top + cell_size * row_index
+        elements.append(
+            f'<text x="{left - 5}" y="{_number(y + cell_size * 0.7)}" font-size="9" text-anchor="end">'
+            f'{escape(row)}</text>'
+        )
+        for column_index, (column, value) in enumerate(zip(columns, row_values)):
+            elements.append(
+                f'<rect x="{left + cell_size * column_index}" y="{y}" width="{cell_size}" height="{cell_size}"'
+                f' fill="{PIE_CHART_COLORS[0]}" fill-opacity="{max(value, 0) / max_value:.2f}"'
+                f' stroke="#eee"><title>{escape(row)} {escape(column)} : {escape(_number(value))}</title></rect>'
+            )
+
+    return _svg_document(width, height, elements)
+
+
+def chart_digest(chart_arguments: Any) -> str:
+    '''
+        Hash of the (JSON serializable) arguments of a chart, identifying the chart before it is rendered.
+        Part of the chart URL, the chart of other arguments gets another URL.
+    '''
+    payload = json.dumps([CHARTS_RENDERING_VERSION, chart_arguments], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
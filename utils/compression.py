@@ -0,0 +1,41 @@
+# compression.py
+
+import zlib
+from typing import Any
+
+import orjson
+
+# Payloads are prefixed by a marker byte telling how the JSON that follows is stored
+RAW_MARKER = b"j"
+ZLIB_MARKER = b"z"
+
+# Below this size, compressing costs more CPU than it saves bytes
+COMPRESSION_THRESHOLD = 1024
+COMPRESSION_LEVEL = 6
+
+
+def compress_json(
+    value: Any,
+    threshold: int = COMPRESSION_THRESHOLD,
+    level: int = COMPRESSION_LEVEL,
+) -> bytes:
+    '''
+        JSON encode `value`, compressed with zlib when the JSON is at least `threshold` bytes long
+    '''
+    json_value = orjson.dumps(value)
+    if len(json_value) < threshold:
+        return RAW_MARKER + json_value
+    return ZLIB_MARKER + zlib.compress(json_value, level)
+
+
+def decompress_json(payload: bytes) -> Any:
+    '''
+        Value of a payload written by `compress_json`
+    '''
+    payload = bytes(payload)
+    marker, json_value = payload[:1], payload[1:]
+    if marker == ZLIB_MARKER:
+        return orjson.loads(zlib.decompress(json_value))
+    if marker == RAW_MARKER:
+        return orjson.loads(json_value)
+    raise ValueError(f"Unknown compressed JSON marker {marker!r}")
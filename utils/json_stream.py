@@ -0,0 +1,139 @@
+# json_stream.py
+'''
+    Incremental readers of JSON documents made of many rows, eg: uploaded files of services.
+    Rows are decoded one at a time from the chunks of the stream, the whole document is never held in memory.
+    Both readers yield (row number, value, error) tuples, error is None or the message of an invalid row.
+'''
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+JSONRow = Tuple[int, Any, Optional[str]]
+
+NON_WHITESPACE = re.compile(r'\S')
+# What may follow the digits of a number, the number going on in the next chunks
+NUMBER_CONTINUATION = re.compile(r'(\.|[eE][-+]?)\Z')
+JSON_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+
+
+def iter_ndjson(lines: Iterable[bytes]) -> Iterator[JSONRow]:
+    '''
+        Rows of a newline delimited JSON stream, numbered by line. Blank lines are skipped,
+        an invalid line is reported and the reading goes on with the next one.
+    '''
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except json.JSONDecodeError as exc:
+            yield line_number, None, f"Invalid JSON: {exc.msg}"
+        except UnicodeDecodeError:
+            yield line_number, None, "The line is not UTF-8 encoded"
+
+
+class JSONArrayReader():
+    '''
+        Rows of a stream holding a single JSON array, numbered from 1.
+        The array cannot be read past a syntax error, it is reported as the error of the row and ends the rows.
+    '''
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+
+    def _fill(self) -> bool:
+        '''
+            Append the next chunk to the buffer, False once the stream is exhausted
+        '''
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._buffer += self._text_decoder.decode(b"", final=True)
+            return False
+        self._buffer = self._buffer[self._position:] + self._text_decoder.decode(chunk)
+        self._position = 0
+        return True
+
+    def _peek(self) -> Optional[str]:
+        '''
+            Next non whitespace character, left unread, None at the end of the stream
+        '''
+        while True:
+            match = NON_WHITESPACE.search(self._buffer, self._position)
+            if match is not None:
+                self._position = match.start()
+                return match.group()
+            self._position = len(self._buffer)
+            if not self._fill():
+                return None
+
+    def _is_truncated(self, exc: json.JSONDecodeError) -> bool:
+        '''
+            Whether the decoding error comes from the end of the buffer, the value may go on in the next chunks
+        '''
+        rest = self._buffer[exc.pos:]
+        if exc.msg == "Unterminated string starting at":
+            # No closing quote up to the end of the buffer
+            return True
+        if exc.msg == "Invalid \\uXXXX escape":
+            # The escape, 'u' and 4 hexadecimal digits, and the character after it are not all there yet
+            return len(rest) <= 5
+        # Nothing left, or the beginning of a literal or of a negative number
+        return any(literal.startswith(rest) for literal in JSON_LITERALS)
+
+    def _decode_value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as exc:
+                if self._is_truncated(exc) and self._fill():
+                    continue
+                raise
+            # A number ending the buffer may go on in the next chunks
+            if (end == len(self._buffer) or NUMBER_CONTINUATION.match(self._buffer, end)) and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def __iter__(self) -> Iterator[JSONRow]:
+        try:
+            if self._peek() != "[":
+                yield 0, None, "Expected a JSON array"
+                return
+            self._position += 1
+            if self._peek() == "]":
+                return
+
+            row_number = 0
+            while True:
+                row_number += 1
+                try:
+                    value = self._decode_value()
+                except json.JSONDecodeError as exc:
+                    yield row_number, None, f"Invalid JSON: {exc.msg}"
+                    return
+                yield row_number, value, None
+
+                separator = self._peek()
+                if separator == "]":
+                    self._position += 1
+                    break
+                if separator != ",":
+                    yield row_number + 1, None, "Invalid JSON: expected ',' or ']' after a value of the array"
+                    return
+                self._position += 1
+
+            if self._peek() is not None:
+                yield row_number + 1, None, "Invalid JSON: extra data after the array"
+        except UnicodeDecodeError:
+            yield 0, None, "The stream is not UTF-8 encoded"
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[JSONRow]:
+    return iter(JSONArrayReader(chunks))
@@ -0,0 +1,85 @@
+# logs.py
+'''
+    Logging off the request thread: records are put on a queue by the app logger's handler
+    and formatted and written by the thread of a QueueListener.
+'''
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Optional
+
+
+class LazyLogValue():
+    """
+        An argument or an `extra` value of a log record computed only if the record is emitted by a handler, eg:
+        `logger.debug("Added %s", LazyLogValue(service.serialize))` serializes nothing while DEBUG is disabled.
+        Detailed values are best logged at DEBUG as arguments: an `extra` is computed for every emitted record,
+        and only written by the formatters using it. The value is computed once, then kept.
+    """
+
+    _unset = object()
+
+    def __init__(self, compute: Callable[[], Any]) -> None:
+        self.compute = compute
+        self._value: Any = self._unset
+
+    @property
+    def value(self) -> Any:
+        if self._value is self._unset:
+            self._value = self.compute()
+        return self._value
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+        Puts the records on a queue, after computing their LazyLogValue arguments and extras.
+        They are computed here, on the thread that logged them, as they may read objects
+        (eg: models of the request's DB session) that must not be used from the listener's thread.
+    """
+
+    listener: QueueListener
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        for attribute, value in list(vars(record).items()):
+            if isinstance(value, LazyLogValue):
+                setattr(record, attribute, value.value)
+        return record
+
+
+def start_queue_logging(logger: logging.Logger, handler: logging.Handler) -> QueueListener:
+    '''
+        Replaces the handlers of `logger` by a LazyQueueHandler, `handler` writes the records from
+        the thread of the returned listener, stopped (flushing the queue) when the process exits.
+        Calling it again on the same logger returns the listener already started.
+    '''
+    queue_handler = _queue_handler(logger)
+    if queue_handler is not None:
+        return queue_handler.listener
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.listener = QueueListener(log_queue, handler, respect_handler_level=True)
+
+    for former_handler in list(logger.handlers):
+        logger.removeHandler(former_handler)
+    logger.addHandler(queue_handler)
+
+    queue_handler.listener.start()
+    atexit.register(queue_handler.listener.stop)
+    return queue_handler.listener
+
+
+def _queue_handler(logger: logging.Logger) -> Optional[LazyQueueHandler]:
+    for handler in logger.handlers:
+        if isinstance(handler, LazyQueueHandler):
+            return handler
+    return None
@@ -0,0 +1,110 @@
+# pagination.py
+
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+CURSOR_SEPARATOR = "_"
+
+
+class KeysetPage():
+    """
+        A page of rows sorted from newest to oldest on (date, id).
+        Neighbour pages are reached with the cursors of the first and last rows,
+        so every page costs an index range scan, however deep it is.
+    """
+
+    def __init__(
+        self,
+        items: List[Any],
+        has_prev: bool,
+        has_next: bool,
+        prev_cursor: Optional[str],
+        next_cursor: Optional[str],
+        estimated_total: Optional[int] = None,
+    ) -> None:
+        self.items = items
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+        self.estimated_total = estimated_total
+
+
+def encode_cursor(date: datetime, row_id: int) -> str:
+    return f"{date.isoformat()}{CURSOR_SEPARATOR}{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    '''
+        Raise ValueError when the cursor was not made by encode_cursor
+    '''
+    date, separator, row_id = cursor.rpartition(CURSOR_SEPARATOR)
+    if not separator:
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return datetime.fromisoformat(date), int(row_id)
+
+
+def paginate_by_keyset(
+    query: Query,
+    date_column: ColumnElement,
+    id_column: ColumnElement,
+    per_page: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> KeysetPage:
+    '''
+        Return the page of `query` following the `after` cursor, or preceding the `before` cursor,
+        or the first page when no cursor is given.
+    '''
+    sort_key = tuple_(date_column, id_column)
+
+    if before is not None:
+        # Walk backward from the cursor, then put the rows back in display order
+        rows = (
+            query.filter(sort_key > tuple_(*decode_cursor(before)))
+            .order_by(date_column.asc(), id_column.asc())
+            .limit(per_page + 1)
+            .all()
+        )
+        has_prev = len(rows) > per_page
+        has_next = True
+        items = list(reversed(rows[:per_page]))
+    else:
+        if after is not None:
+            query = query.filter(sort_key < tuple_(*decode_cursor(after)))
+        rows = (
+            query.order_by(date_column.desc(), id_column.desc())
+            .limit(per_page + 1)
+            .all()
+        )
+        has_prev = after is not None
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+
+    def item_cursor(item: Any) -> str:
+        return encode_cursor(getattr(item, date_column.key), getattr(item, id_column.key))
+
+    return KeysetPage(
+        items=items,
+        has_prev=has_prev and len(items) > 0,
+        has_next=has_next and len(items) > 0,
+        prev_cursor=item_cursor(items[0]) if items else None,
+        next_cursor=item_cursor(items[-1]) if items else None,
+    )
+
+
+def estimate_query_row_count(session: Session, query: Query) -> int:
+    '''
+        Row count of a filtered query estimated by the Postgres planner (EXPLAIN), without running it
+    '''
+    connection = session.connection()
+    compiled_statement = query.statement.compile(dialect=connection.dialect)
+    [[query_plan]] = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled_statement}",
+        compiled_statement.params,
+    ).one()
+    return int(query_plan["Plan"]["Plan Rows"])
@@ -0,0 +1,120 @@
+# partitions.py
+'''
+    Monthly range partitions of a PostgreSQL table partitioned by a date column,
+    eg: `CREATE TABLE service (...) PARTITION BY RANGE (date)`.
+    Rows out of every monthly partition land in the `<table>_default` partition.
+'''
+
+from datetime import date
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+LIST_PARTITIONS_QUERY = text(
+    """
+    SELECT partition.relname, pg_get_expr(partition.relpartbound, partition.oid)
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class partition ON partition.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table_name
+    ORDER BY partition.relname
+    """
+)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def default_partition_name(table_name: str) -> str:
+    return f"{table_name}_default"
+
+
+def month_partition_name(table_name: str, month: date) -> str:
+    return f"{table_name}_y{month.year:04}m{month.month:02}"
+
+
+def list_partitions(connection: Connection, table_name: str) -> List[Tuple[str, str]]:
+    '''
+        (name, bounds) of the partitions of a table, eg: ("service_y2022m01", "FOR VALUES FROM ... TO ...")
+    '''
+    return [tuple(row) for row in connection.execute(LIST_PARTITIONS_QUERY, {"table_name": table_name})]
+
+
+def create_default_partition(connection: Connection, table_name: str) -> None:
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {default_partition_name(table_name)} PARTITION OF {table_name} DEFAULT"
+    ))
+
+
+def create_month_partition(connection: Connection, table_name: str, column_name: str, month: date) -> bool:
+    '''
+        Create the partition of the month starting at `month`, returns False if it already exists.
+        Rows of that month stored in the default partition are moved to the new partition.
+    '''
+    partition_name = month_partition_name(table_name, month)
+    if connection.execute(text("SELECT to_regclass(:name)"), {"name": partition_name}).scalar() is not None:
+        return False
+
+    bounds = {"start": month, "end": add_months(month, 1)}
+    # Attaching a partition fails while the default partition holds rows of its range,
+    # they are moved to the partition before attaching it
+    connection.execute(text(
+        f"CREATE TABLE {partition_name} (LIKE {table_name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    connection.execute(
+        text(
+            f"""
+            WITH moved_rows AS (
+                DELETE FROM {default_partition_name(table_name)}
+                WHERE {column_name} >= :start AND {column_name} < :end
+                RETURNING *
+            )
+            INSERT INTO {partition_name} SELECT * FROM moved_rows
+            """
+        ),
+        bounds,
+    )
+    # Bounds are inlined, DDL statements take no parameters
+    connection.execute(text(
+        f"ALTER TABLE {table_name} ATTACH PARTITION {partition_name} "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    ))
+    return True
+
+
+def create_month_partitions(
+    connection: Connection,
+    table_name: str,
+    column_name: str,
+    first_month: date,
+    last_month: date,
+) -> List[str]:
+    '''
+        Create the missing partitions of the months from `first_month` to `last_month` (included),
+        returns the names of the created partitions.
+    '''
+    created_partitions = []
+    month = month_start(first_month)
+    while month <= last_month:
+        if create_month_partition(connection, table_name, column_name, month):
+            created_partitions.append(month_partition_name(table_name, month))
+        month = add_months(month, 1)
+    return created_partitions
+
+
+def detach_month_partition(connection: Connection, table_name: str, month: date) -> str:
+    '''
+        Detach the partition of a month, its rows are kept in a standalone table of the same name.
+        Only the catalog is updated, no row is read or written.
+        (DETACH ... CONCURRENTLY is not available to tables with a default partition)
+    '''
+    partition_name = month_partition_name(table_name, month)
+    connection.execute(text(f"ALTER TABLE {table_name} DETACH PARTITION {partition_name}"))
+    return partition_name
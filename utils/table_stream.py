@@ -0,0 +1,88 @@
+# table_stream.py
+'''
+    Encoders of rows streamed by batches (eg: from a server-side cursor) into CSV or Parquet,
+    yielding the bytes of each batch as soon as it is encoded so only one batch is ever held in memory.
+'''
+
+import csv
+import io
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+# (name, type) of the columns of a table, types are keys of PARQUET_TYPES
+TableColumns = Sequence[Tuple[str, str]]
+PARQUET_TYPES = ('int64', 'float64', 'string', 'timestamp')
+
+
+def iter_csv_chunks(columns: TableColumns, batches: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    '''
+        A header line, then the CSV lines of each batch of rows
+    '''
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunksSink(io.RawIOBase):
+    '''
+        Write only file keeping the written bytes until they are taken by `drain`
+    '''
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_parquet_chunks(columns: TableColumns, batches: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    '''
+        A Parquet file holding one row group per batch of rows
+    '''
+    # Only needed by the exports, not loaded with the app
+    import pyarrow
+    import pyarrow.parquet
+
+    types = {
+        'int64': pyarrow.int64(),
+        'float64': pyarrow.float64(),
+        'string': pyarrow.string(),
+        'timestamp': pyarrow.timestamp('us'),
+    }
+    schema = pyarrow.schema([(name, types[column_type]) for name, column_type in columns])
+    sink = _ChunksSink()
+    with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+        for batch in batches:
+            if not batch:
+                continue
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(
+                [
+                    pyarrow.array([row[index] for row in batch], type=schema.field(index).type)
+                    for index in range(len(columns))
+                ],
+                schema=schema,
+            ))
+            yield sink.drain()
+    # Footer of the file, written on close
+    yield sink.drain()
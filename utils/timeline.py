@@ -0,0 +1,176 @@
+# timeline.py
+
+from datetime import datetime
+from typing import Iterable, List, Mapping, Tuple
+
+import numpy as np
+
+TIMESTAMP_DTYPE = np.dtype('datetime64[s]')
+AMOUNT_DTYPE = np.dtype('float64')
+
+BUCKET_SECONDS = 15 * 60
+HOUR_SECONDS = 3600
+DAY_SECONDS = 24 * HOUR_SECONDS
+# 1970-01-01 was a Thursday, weekdays are numbered from Monday (0) as datetime.weekday does
+EPOCH_WEEKDAY = 3
+
+
+class TimelineIndex():
+    """
+        Sorted timestamps of a timeline and the prefix sums of their amounts.
+        `cumulative_amounts[i]` is the total of the i first timestamps, so it holds one more
+        value than `timestamps` and the revenue of any time window is a difference of two prefix sums.
+    """
+
+    def __init__(self, timestamps: np.ndarray, cumulative_amounts: np.ndarray) -> None:
+        if len(cumulative_amounts) != len(timestamps) + 1:
+            raise ValueError(
+                f"Expected {len(timestamps) + 1} cumulative amounts, got {len(cumulative_amounts)}"
+            )
+        self.timestamps = timestamps
+        self.cumulative_amounts = cumulative_amounts
+
+    @classmethod
+    def from_timeline(cls, timeline: Mapping[str, Iterable[float]]) -> "TimelineIndex":
+        '''
+            Build the index from a timeline {"ISO timestamp": [amount, ...]}
+        '''
+        timestamps = np.array(
+            [datetime.fromisoformat(timestamp) for timestamp in timeline.keys()],
+            dtype=TIMESTAMP_DTYPE,
+        )
+        amounts = np.array(
+            [sum(timestamp_amounts) for timestamp_amounts in timeline.values()],
+            dtype=AMOUNT_DTYPE,
+        )
+
+        sorting_order = np.argsort(timestamps, kind='stable')
+        cumulative_amounts = np.concatenate(
+            (
+                np.zeros(1, dtype=AMOUNT_DTYPE),
+                np.cumsum(amounts[sorting_order]),
+            )
+        )
+        return cls(timestamps[sorting_order], cumulative_amounts)
+
+    def revenue_between(self, start: datetime, end: datetime) -> float:
+        '''
+            Total of amounts strictly after `start` and strictly before `end`
+        '''
+        first_index = np.searchsorted(self.timestamps, np.datetime64(start, 's'), side='right')
+        last_index = np.searchsorted(self.timestamps, np.datetime64(end, 's'), side='left')
+        if last_index <= first_index:
+            return 0.0
+        return float(self.cumulative_amounts[last_index] - self.cumulative_amounts[first_index])
+
+    def to_bytes(self) -> bytes:
+        '''
+            Compact binary form, to be stored next to the timeline
+        '''
+        return (
+            self.timestamps.astype(TIMESTAMP_DTYPE).view(np.int64).tobytes()
+            + self.cumulative_amounts.astype(AMOUNT_DTYPE).tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, raw_index: bytes) -> "TimelineIndex":
+        # n timestamps (int64) followed by n + 1 cumulative amounts (float64)
+        timestamps_count = (len(raw_index) - AMOUNT_DTYPE.itemsize) // (
+            TIMESTAMP_DTYPE.itemsize + AMOUNT_DTYPE.itemsize
+        )
+        timestamps_size = timestamps_count * TIMESTAMP_DTYPE.itemsize
+        return cls(
+            np.frombuffer(raw_index[:timestamps_size], dtype=np.int64).view(TIMESTAMP_DTYPE),
+            np.frombuffer(raw_index[timestamps_size:], dtype=AMOUNT_DTYPE),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+class TimeBuckets():
+    """
+        Revenue of a timeline by 15 minutes, from the quarter of an hour of its first timestamp.
+        `amounts[i]` is the revenue of the i-th quarter of an hour after `start` (seconds since the epoch),
+        quarters of an hour without sales included, so a night of sales takes a few hundred bytes.
+    """
+
+    def __init__(self, start: int, amounts: np.ndarray) -> None:
+        if start % BUCKET_SECONDS:
+            raise ValueError(f"Expected a start on a quarter of an hour, got {start}")
+        self.start = start
+        self.amounts = amounts
+
+    @classmethod
+    def empty(cls) -> "TimeBuckets":
+        return cls(0, np.zeros(0, dtype=AMOUNT_DTYPE))
+
+    @classmethod
+    def from_timeline_index(cls, timeline_index: TimelineIndex) -> "TimeBuckets":
+        if len(timeline_index) == 0:
+            return cls.empty()
+
+        seconds = timeline_index.timestamps.astype(TIMESTAMP_DTYPE).view(np.int64)
+        start = int(seconds[0] - seconds[0] % BUCKET_SECONDS)
+        # Timestamps are sorted, the amount of each one is the difference of two prefix sums
+        amounts = np.bincount(
+            (seconds - start) // BUCKET_SECONDS,
+            weights=np.diff(timeline_index.cumulative_amounts),
+        )
+        return cls(start, amounts.astype(AMOUNT_DTYPE))
+
+    def bucket_starts(self) -> np.ndarray:
+        return self.start + BUCKET_SECONDS * np.arange(len(self.amounts), dtype=np.int64)
+
+    def per_15_minutes(self) -> List[Tuple[datetime, float]]:
+        return list(zip(self.bucket_starts().view(TIMESTAMP_DTYPE).tolist(), self.amounts.tolist()))
+
+    def per_hour(self) -> List[Tuple[datetime, float]]:
+        if len(self.amounts) == 0:
+            return []
+        buckets_per_hour = HOUR_SECONDS // BUCKET_SECONDS
+        hour_start = self.start - self.start % HOUR_SECONDS
+        # Padded with empty quarters of an hour up to whole hours, then summed by rows of an hour
+        leading_buckets = (self.start - hour_start) // BUCKET_SECONDS
+        trailing_buckets = -(leading_buckets + len(self.amounts)) % buckets_per_hour
+        hourly_amounts = np.concatenate((
+            np.zeros(leading_buckets, dtype=AMOUNT_DTYPE),
+            self.amounts,
+            np.zeros(trailing_buckets, dtype=AMOUNT_DTYPE),
+        )).reshape(-1, buckets_per_hour).sum(axis=1)
+        hour_starts = hour_start + HOUR_SECONDS * np.arange(len(hourly_amounts), dtype=np.int64)
+        return list(zip(hour_starts.view(TIMESTAMP_DTYPE).tolist(), hourly_amounts.tolist()))
+
+    def to_bytes(self) -> bytes:
+        '''
+            Compact binary form, the start (int64) followed by the amounts (float64)
+        '''
+        return np.int64(self.start).tobytes() + self.amounts.astype(AMOUNT_DTYPE).tobytes()
+
+    @classmethod
+    def from_bytes(cls, raw_buckets: bytes) -> "TimeBuckets":
+        start_size = np.dtype(np.int64).itemsize
+        return cls(
+            int(np.frombuffer(raw_buckets[:start_size], dtype=np.int64)[0]),
+            np.frombuffer(raw_buckets[start_size:], dtype=AMOUNT_DTYPE),
+        )
+
+
+def weekday_hour_heatmap(time_buckets: Iterable[TimeBuckets]) -> np.ndarray:
+    '''
+        Revenue of the buckets of many timelines by weekday (rows, from Monday) and hour of the day (columns)
+    '''
+    time_buckets = [buckets for buckets in time_buckets if len(buckets.amounts)]
+    heatmap = np.zeros((7, 24), dtype=AMOUNT_DTYPE)
+    if not time_buckets:
+        return heatmap
+
+    # Every bucket of every timeline at once
+    seconds = np.concatenate([buckets.bucket_starts() for buckets in time_buckets])
+    amounts = np.concatenate([buckets.amounts for buckets in time_buckets])
+    np.add.at(
+        heatmap,
+        ((seconds // DAY_SECONDS + EPOCH_WEEKDAY) % 7, seconds % DAY_SECONDS // HOUR_SECONDS),
+        amounts,
+    )
+    return heatmap
@@ -1,24 +1,35 @@
 # utils.py
 
-from typing import Dict, List
+import heapq
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Tuple, TypeVar
 
+Element = TypeVar('Element', bound=Hashable)
 
-def list_to_element_counted_and_sorted_dict(my_raw_list: List[str]) -> Dict:
+
+def count_elements(elements: Iterable[Element]) -> Counter:
+    '''
+      Counts the occurrences of each element in a single pass,
+      `elements` can be any iterable, eg: a generator, it is never turned into a list
+    '''
+    return Counter(elements)
+
+
+def top_k(counts: Mapping[Element, int], k: Optional[int] = None) -> List[Tuple[Element, int]]:
+    '''
+      (element, count) pairs from the greater count to the lower, the first counted first on equal counts.
+      Only the `k` greater ones if `k` is given, picked with a heap of size k instead of sorting every pair.
+    '''
+    if k is None:
+        return sorted(counts.items(), key=itemgetter(1), reverse=True)
+    return heapq.nlargest(k, counts.items(), key=itemgetter(1))
+
+
+def list_to_element_counted_and_sorted_dict(my_raw_list: Iterable[str]) -> Dict:
     '''
       Takes a list of element, counts each element and
       return a dict of key = element, value = number of occurence,
       sorted from greater occcurences to lower
     '''
-    my_counted_list = {
-        element: my_raw_list.count(element)
-        for element in my_raw_list
-    }
-    my_ordered_dict = {
-        key: value
-        for key, value in sorted(
-            my_counted_list.items(),
-            key=lambda item: item[1],
-            reverse=True
-        )
-    }
-    return my_ordered_dict
+    return dict(top_k(count_elements(my_raw_list)))